@@ -0,0 +1,27 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+from question.management.commands.reconcile_counters import answer_counters
+
+
+def count_comments(apps, schema_editor):
+    Answer = apps.get_model("answer", "Answer")
+    Answer.objects.update(**answer_counters(apps.get_model("comment", "Comment")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("answer", "0001_initial"),
+        ("comment", "0002_alter_field_answer_and_question"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="comment_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+from question import dedupe
+
+
+def dedupe_user_answers(apps, schema_editor):
+    dedupe.dedupe_ratings(
+        apps.get_model("answer", "UserAnswer"),
+        "answer",
+        apps.get_model("tag", "UserTag"),
+        lambda answer: answer.question_id,
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("answer", "0002_answer_comment_count"),
+        ("tag", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["question", "-is_accepted", "-vote", "-id"],
+                name="answer_question_vote_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["question", "-is_accepted", "-updated_at", "-id"],
+                name="answer_question_updated_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["question", "-is_accepted", "created_at", "id"],
+                name="answer_question_created_idx",
+            ),
+        ),
+        migrations.RunPython(
+            dedupe_user_answers, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AddConstraint(
+            model_name="useranswer",
+            constraint=models.UniqueConstraint(
+                fields=("user", "answer"), name="unique_user_answer"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.4 on 2026-10-18 14:02
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def copy_updated_at(apps, schema_editor):
+    Answer = apps.get_model("answer", "Answer")
+    Answer.objects.update(last_activity_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("answer", "0003_indexes_and_constraints"),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name="answer",
+            name="answer_question_updated_idx",
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_updated_at, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["question", "-is_accepted", "-last_activity_at", "-id"],
+                name="answer_question_activity_idx",
+            ),
+        ),
+    ]
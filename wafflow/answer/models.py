@@ -1,19 +1,65 @@
 from django.db import models
+from django.db.models import Prefetch, Q
 from django.contrib.auth.models import User
+from django.utils import timezone
 from question.models import Question
 
 
+class AnswerQuerySet(models.QuerySet):
+    def with_info(self, viewer=None):
+        """
+        Load the author with their profile and the viewer's rating along with
+        the answers, so that a page of AnswerInfoSerializer costs a fixed
+        number of queries regardless of its length.
+        """
+        if viewer is not None and viewer.is_authenticated:
+            viewer_user_answers = UserAnswer.objects.filter(user=viewer)
+        else:
+            viewer_user_answers = UserAnswer.objects.none()
+
+        return self.select_related("user__profile").prefetch_related(
+            Prefetch(
+                "user_answers",
+                queryset=viewer_user_answers,
+                to_attr="viewer_user_answers",
+            )
+        )
+
+
 class Answer(models.Model):
     content = models.CharField(max_length=5000)
     is_active = models.BooleanField(default=True)
     is_accepted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    last_activity_at = models.DateTimeField(default=timezone.now)
     question = models.ForeignKey(
         Question, related_name="answers", on_delete=models.CASCADE
     )
     user = models.ForeignKey(User, related_name="answers", on_delete=models.CASCADE)
     vote = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+
+    objects = AnswerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["question", "-is_accepted", "-vote", "-id"],
+                condition=Q(is_active=True),
+                name="answer_question_vote_idx",
+            ),
+            models.Index(
+                fields=["question", "-is_accepted", "-last_activity_at", "-id"],
+                condition=Q(is_active=True),
+                name="answer_question_activity_idx",
+            ),
+            models.Index(
+                fields=["question", "-is_accepted", "created_at", "id"],
+                condition=Q(is_active=True),
+                name="answer_question_created_idx",
+            ),
+        ]
 
 
 class UserAnswer(models.Model):
@@ -36,3 +82,10 @@ class UserAnswer(models.Model):
     answer = models.ForeignKey(
         Answer, related_name="user_answers", on_delete=models.CASCADE
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "answer"], name="unique_user_answer"
+            ),
+        ]
@@ -2,8 +2,9 @@ from rest_framework import serializers
 from answer.models import Answer, UserAnswer
 from django.contrib.auth.models import AnonymousUser
 
-from user.serializers import AuthorSerializer
+from user.author_cards import AuthorCardListSerializer, author_card
 from question.models import Question
+from question.serializers import EditSerializer
 
 
 class SimpleAnswerSerializer(serializers.ModelSerializer):
@@ -22,7 +23,7 @@ class AnswerSummarySerializer(SimpleAnswerSerializer):
 class AnswerInfoSerializer(SimpleAnswerSerializer):
     rating = serializers.SerializerMethodField()
     author = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
 
     class Meta(SimpleAnswerSerializer.Meta):
         fields = SimpleAnswerSerializer.Meta.fields + (
@@ -31,8 +32,13 @@ class AnswerInfoSerializer(SimpleAnswerSerializer):
             "rating",
             "author",
         )
+        list_serializer_class = AuthorCardListSerializer
 
     def get_rating(self, answer):
+        if hasattr(answer, "viewer_user_answers"):
+            viewer_user_answers = answer.viewer_user_answers
+            return viewer_user_answers[0].rating if viewer_user_answers else 0
+
         user = self.context["request"].user
         if isinstance(user, AnonymousUser):
             return 0
@@ -43,12 +49,7 @@ class AnswerInfoSerializer(SimpleAnswerSerializer):
         return user_answer.rating
 
     def get_author(self, answer):
-        user = answer.user
-
-        return AuthorSerializer(user).data
-
-    def get_comment_count(self, answer):
-        return answer.comments.filter(is_active=True).count()
+        return author_card(answer)
 
 
 class AnswerProduceSerializer(serializers.ModelSerializer):
@@ -60,11 +61,14 @@ class AnswerProduceSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context["request"].user
-        question = Question.objects.get(pk=validated_data.pop("question_id"))
+        question_id = validated_data.pop("question_id")
+        question = validated_data.pop("question", None)
+        if question is None:
+            question = Question.objects.get(pk=question_id)
         return Answer.objects.create(**validated_data, user=user, question=question)
 
 
-class AnswerEditSerializer(serializers.ModelSerializer):
+class AnswerEditSerializer(EditSerializer):
     class Meta:
         model = Answer
         fields = ("content",)
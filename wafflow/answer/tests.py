@@ -1,14 +1,22 @@
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
 from answer.models import Answer, UserAnswer
-from comment.models import Comment
-from question.models import Question
+from answer.serializers import AnswerEditSerializer
+from comment.models import Comment, UserComment
+from question.models import Question, QuestionTag, Tag
+from tag.models import UserTag
 from user.models import UserProfile
 
 import json
+from io import StringIO
 
 
 class UserQuestionTestSetting(TestCase):
@@ -37,6 +45,9 @@ class UserQuestionTestSetting(TestCase):
         )
         self.qwerty_token = "Token " + Token.objects.get(user=qwerty).key
 
+    def reconcile_counters(self):
+        call_command("reconcile_counters", stdout=StringIO())
+
     def check_db_count(self, **kwargs):
         answer_count = kwargs.get("answer_count", 0)
         question_count = kwargs.get("question_count", 1)
@@ -95,6 +106,7 @@ class MultipleAnswerSetUp(UserQuestionTestSetting):
             vote=self.ANSWER_COUNT + 1,
             is_active=False,
         )
+        self.reconcile_counters()
 
     def check_db_count(self, **kwargs):
         answer_count = kwargs.get("answer_count", self.WHOLE_ANSWER_COUNT)
@@ -156,6 +168,7 @@ class GetAnswerAnswerIdTestCase(GetAnswerInfoTestCase):
             answer=Answer.objects.get(content="1"),
             content="content",
         )
+        self.reconcile_counters()
 
     def test_get_answer_answer_id(self):
         answer = Answer.objects.get(content="1")
@@ -210,6 +223,7 @@ class GetAnswerAnswerIdTestCase(GetAnswerInfoTestCase):
                 answer=answer,
                 content="b" * (loop_count + 1),
             )
+        self.reconcile_counters()
 
         response = self.client.get(f"/api/answer/{answer.id}/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -228,6 +242,7 @@ class GetAnswerAnswerIdTestCase(GetAnswerInfoTestCase):
 
         comment.is_active = False
         comment.save()
+        self.reconcile_counters()
 
         response = self.client.get(f"/api/answer/{answer.id}/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -384,10 +399,12 @@ class GetAnswerUserUserIDTestCase(MultipleAnswerSetUp):
 
         answer_accepted = Answer.objects.get(vote=ACCEPTED_VOTE)
         answer_accepted.is_accepted = True
+        answer_accepted.last_activity_at = timezone.now()
         answer_accepted.save()
 
         answer_change_vote = Answer.objects.get(vote=CHANGE_VOTE)
         answer_change_vote.vote = 100
+        answer_change_vote.last_activity_at = timezone.now()
         answer_change_vote.save()
 
         response = self.client.get(
@@ -579,6 +596,7 @@ class GetAnswerQuestionQuestionIDTestCase(GetAnswerInfoTestCase, MultipleAnswerS
             comment = Comment.objects.create(
                 content="good", type=Comment.ANSWER, user=qwerty, answer=accepted_answer
             )
+        self.reconcile_counters()
 
         response = self.client.get(
             f"/api/answer/question/{question.id}/?sorted_by=votes&page=1",
@@ -636,10 +654,12 @@ class GetAnswerQuestionQuestionIDTestCase(GetAnswerInfoTestCase, MultipleAnswerS
 
         answer_accepted = Answer.objects.get(vote=ACCEPTED_VOTE)
         answer_accepted.is_accepted = True
+        answer_accepted.last_activity_at = timezone.now()
         answer_accepted.save()
 
         answer_change_vote = Answer.objects.get(vote=CHANGE_VOTE)
         answer_change_vote.vote = 100
+        answer_change_vote.last_activity_at = timezone.now()
         answer_change_vote.save()
 
         eldpswp99_profile = User.objects.get(username="eldpswp99").profile
@@ -654,6 +674,7 @@ class GetAnswerQuestionQuestionIDTestCase(GetAnswerInfoTestCase, MultipleAnswerS
             Comment.objects.create(
                 user=qwerty, answer=answer_accepted, content="b", type=Comment.ANSWER
             )
+        self.reconcile_counters()
 
         response = self.client.get(
             f"/api/answer/question/{question.id}/?sorted_by=activity&page=1",
@@ -745,6 +766,7 @@ class GetAnswerQuestionQuestionIDTestCase(GetAnswerInfoTestCase, MultipleAnswerS
         Comment.objects.create(
             user=qwerty, answer=answer, content="hello", type=Comment.ANSWER
         )
+        self.reconcile_counters()
 
         UserAnswer.objects.create(user=qwerty, answer=answer, rating=-1)
 
@@ -1017,6 +1039,22 @@ class PutAnswerTestCase(PostPutAnswerTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.check_db_count()
 
+    def test_put_answer_answer_id_keeps_concurrent_counters(self):
+        answer = Answer.objects.get(content="world")
+        # Written by other requests after the edit loaded the answer.
+        Answer.objects.filter(pk=answer.pk).update(
+            vote=F("vote") + 3, comment_count=F("comment_count") + 1
+        )
+
+        serializer = AnswerEditSerializer(answer, data={"content": "edited"})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        answer.refresh_from_db()
+        self.assertEqual(answer.content, "edited")
+        self.assertEqual(answer.vote, 5)
+        self.assertEqual(answer.comment_count, 1)
+
     def test_put_answer_answer_id_too_long_content(self):
         answer = Answer.objects.get(content="world")
 
@@ -1113,6 +1151,7 @@ class DeleteAnswerTestCase(UserQuestionTestSetting):
         eldpswp99 = User.objects.get(username="eldpswp99")
         question = Question.objects.get(title="Hello")
         Answer.objects.create(user=eldpswp99, question=question, content="world")
+        self.reconcile_counters()
 
     def test_delete_answer_answer_id_invalid_token(self):
         answer = Answer.objects.get(content="world")
@@ -1161,6 +1200,39 @@ class DeleteAnswerTestCase(UserQuestionTestSetting):
         self.assertEqual(answer.is_active, False)
         self.check_db_count(deleted_answer_count=1)
 
+    def delete_tagged_answer(self, post_count, other_question=False):
+        """
+        Delete an answer of qwerty under the tag "a", whose user tag holds
+        `post_count`, while qwerty asks another question under the tag or not.
+        """
+        qwerty = User.objects.get(username="qwerty")
+        tag = Tag.objects.create(name="a")
+        question = Question.objects.get(title="Hello")
+        QuestionTag.objects.create(question=question, tag=tag)
+        if other_question:
+            other = Question.objects.create(user=qwerty, title="Other", content="c")
+            QuestionTag.objects.create(question=other, tag=tag)
+        UserTag.objects.create(user=qwerty, tag=tag, score=4, post_count=post_count)
+        answer = Answer.objects.create(user=qwerty, question=question, content="a")
+
+        response = self.client.delete(
+            f"/api/answer/{answer.id}/",
+            HTTP_AUTHORIZATION=self.qwerty_token,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return UserTag.objects.filter(user=qwerty, tag=tag).first()
+
+    def test_delete_answer_answer_id_keeps_user_tag_with_posts(self):
+        # A counter that drifted below the two posts of the user.
+        user_tag = self.delete_tagged_answer(1, other_question=True)
+        self.assertEqual(user_tag.post_count, 1)
+        self.assertEqual(user_tag.score, 4)
+
+    def test_delete_answer_answer_id_drops_user_tag_without_posts(self):
+        # A counter that drifted above the one post of the user.
+        self.assertIsNone(self.delete_tagged_answer(3))
+
     def test_delete_answer_answer_id_deleted_answer(self):
         answer = Answer.objects.get(content="world")
         answer.is_active = False
@@ -1500,3 +1572,237 @@ class DeleteAcceptionTestCase(AnswerAcceptionTestCase):
         self.assertEqual(data["is_accepted"], False)
 
         self.check_reputation(eldpswp99_reputation=0, qwerty_reputation=108)
+
+
+class AnswerCounterTestCase(UserQuestionTestSetting):
+    client = Client()
+
+    def setUp(self):
+        self.set_up_user_question()
+
+    def test_answer_and_comment_counters(self):
+        question = Question.objects.get(title="Hello")
+
+        response = self.client.post(
+            f"/api/answer/question/{question.id}/",
+            {"content": "world"},
+            HTTP_AUTHORIZATION=self.qwerty_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        answer_id = response.json()["id"]
+
+        for loop_count in range(2):
+            response = self.client.post(
+                f"/api/comment/answer/{answer_id}/",
+                {"content": "comment"},
+                HTTP_AUTHORIZATION=self.eldpswp99_token,
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(
+            f"/api/comment/question/{question.id}/",
+            {"content": "comment"},
+            HTTP_AUTHORIZATION=self.qwerty_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        comment_id = response.json()["id"]
+
+        question.refresh_from_db()
+        answer = Answer.objects.get(id=answer_id)
+        self.assertEqual(question.answer_count, 1)
+        self.assertEqual(question.comment_count, 1)
+        self.assertEqual(answer.comment_count, 2)
+
+        response = self.client.delete(
+            f"/api/comment/{comment_id}/", HTTP_AUTHORIZATION=self.qwerty_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(
+            f"/api/comment/{comment_id}/", HTTP_AUTHORIZATION=self.qwerty_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.delete(
+            f"/api/answer/{answer_id}/", HTTP_AUTHORIZATION=self.qwerty_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        question.refresh_from_db()
+        self.assertEqual(question.answer_count, 0)
+        self.assertEqual(question.comment_count, 0)
+
+    def test_reconcile_counters(self):
+        question = Question.objects.get(title="Hello")
+        eldpswp99 = User.objects.get(username="eldpswp99")
+        answer = Answer.objects.create(user=eldpswp99, question=question, content="1")
+        Answer.objects.create(
+            user=eldpswp99, question=question, content="2", is_active=False
+        )
+        for is_active in (True, True, False):
+            Comment.objects.create(
+                user=eldpswp99,
+                type=Comment.ANSWER,
+                answer=answer,
+                content="comment",
+                is_active=is_active,
+            )
+        Question.objects.update(comment_count=7)
+
+        self.reconcile_counters()
+
+        question.refresh_from_db()
+        answer.refresh_from_db()
+        self.assertEqual(question.answer_count, 1)
+        self.assertEqual(question.comment_count, 0)
+        self.assertEqual(question.bookmark_count, 0)
+        self.assertEqual(answer.comment_count, 2)
+
+    def post_answer(self, question, token=None):
+        response = self.client.post(
+            f"/api/answer/question/{question.id}/",
+            {"content": "world"},
+            HTTP_AUTHORIZATION=token or self.qwerty_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_post_answer_query_count(self):
+        question = Question.objects.get(title="Hello")
+        last_activity_at = question.last_activity_at
+        QuestionTag.objects.create(question=question, tag=Tag.objects.create(name="a"))
+        with CaptureQueriesContext(connection) as queries:
+            self.post_answer(question)
+        query_count = len(queries)
+        question.refresh_from_db()
+        self.assertGreater(question.last_activity_at, last_activity_at)
+
+        for name in ("b", "c", "d", "e"):
+            QuestionTag.objects.create(
+                question=question, tag=Tag.objects.create(name=name)
+            )
+        asdf = User.objects.create_user(username="asdf", password="password")
+        UserProfile.objects.create(user=asdf, nickname="asdf")
+        token = "Token " + Token.objects.create(user=asdf).key
+        with CaptureQueriesContext(connection) as queries:
+            self.post_answer(question, token)
+        self.assertEqual(len(queries), query_count)
+        self.assertEqual(UserTag.objects.filter(user=asdf, post_count=1).count(), 5)
+
+        # Answering the same question again is no new post.
+        self.post_answer(question)
+        self.assertEqual(
+            UserTag.objects.get(user__username="qwerty", tag__name="a").post_count, 1
+        )
+
+
+class AnswerPageQueryCountTestCase(UserQuestionTestSetting):
+    client = Client()
+
+    def setUp(self):
+        self.set_up_user_question()
+        self.question = Question.objects.get(title="Hello")
+        self.qwerty = User.objects.get(username="qwerty")
+        self.eldpswp99 = User.objects.get(username="eldpswp99")
+
+    def add_answers(self, count):
+        for index in range(count):
+            answer = Answer.objects.create(
+                user=self.eldpswp99 if index % 2 else self.qwerty,
+                question=self.question,
+                content=f"answer{index}",
+            )
+            UserAnswer.objects.create(user=self.qwerty, answer=answer, rating=1)
+
+    def count_queries(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.json()["answers"]
+
+    def test_question_answers_query_count(self):
+        url = f"/api/answer/question/{self.question.id}/?sorted_by=votes&page=1"
+        self.add_answers(2)
+        anonymous, _ = self.count_queries(url)
+        authenticated, _ = self.count_queries(url, HTTP_AUTHORIZATION=self.qwerty_token)
+
+        self.add_answers(8)
+        self.assertEqual(self.count_queries(url)[0], anonymous)
+        query_count, answers = self.count_queries(
+            url, HTTP_AUTHORIZATION=self.qwerty_token
+        )
+        self.assertEqual(query_count, authenticated)
+        self.assertEqual(len(answers), 10)
+        self.assertTrue(all(answer["rating"] == 1 for answer in answers))
+        self.assertEqual(
+            {answer["author"]["nickname"] for answer in answers},
+            {"MyungHoon Park", "example"},
+        )
+
+    def test_user_answers_query_count(self):
+        url = f"/api/answer/user/{self.qwerty.id}/?sorted_by=votes&page=1"
+        self.add_answers(2)
+        query_count, _ = self.count_queries(url)
+
+        self.add_answers(8)
+        query_count_after, answers = self.count_queries(url)
+        self.assertEqual(query_count_after, query_count)
+        self.assertEqual({answer["title"] for answer in answers}, {"Hello"})
+
+
+class CommentPageQueryCountTestCase(UserQuestionTestSetting):
+    client = Client()
+
+    def setUp(self):
+        self.set_up_user_question()
+        self.question = Question.objects.get(title="Hello")
+        self.answer = Answer.objects.create(
+            user=User.objects.get(username="qwerty"),
+            question=self.question,
+            content="answer",
+        )
+
+    def add_comments(self, count, **target):
+        qwerty = User.objects.get(username="qwerty")
+        eldpswp99 = User.objects.get(username="eldpswp99")
+        for index in range(count):
+            comment = Comment.objects.create(
+                user=eldpswp99 if index % 2 else qwerty,
+                content=f"comment{index}",
+                **target,
+            )
+            UserComment.objects.create(user=qwerty, comment=comment, rating=-1)
+
+    def assert_fixed_query_count(self, url, **target):
+        self.add_comments(2, **target)
+        query_counts = []
+        for headers in ({}, {"HTTP_AUTHORIZATION": self.qwerty_token}):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url, **headers)
+            query_counts.append(len(queries))
+
+        self.add_comments(3, **target)
+        for headers, query_count in zip(
+            ({}, {"HTTP_AUTHORIZATION": self.qwerty_token}), query_counts
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(queries), query_count)
+        comments = response.json()["comments"]
+        self.assertEqual(len(comments), 5)
+        self.assertTrue(all(comment["rating"] == -1 for comment in comments))
+        self.assertEqual(
+            {comment["author"]["nickname"] for comment in comments},
+            {"MyungHoon Park", "example"},
+        )
+
+    def test_question_comments_query_count(self):
+        self.assert_fixed_query_count(
+            f"/api/comment/question/{self.question.id}/?page=1",
+            type=Comment.QUESTION,
+            question=self.question,
+        )
+
+    def test_answer_comments_query_count(self):
+        self.assert_fixed_query_count(
+            f"/api/comment/answer/{self.answer.id}/?page=1",
+            type=Comment.ANSWER,
+            answer=self.answer,
+        )
@@ -6,13 +6,20 @@ from django.http import HttpResponsePermanentRedirect
 from django.shortcuts import redirect
 from django.core.paginator import Paginator, EmptyPage
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
-from tag.serializers import TagUserSerializer
 from django.contrib.auth.models import User
 from tag.models import UserTag
-from question.models import Question, QuestionTag
+from tag.statistics import shift_post_counts, user_tag_posts_subquery
+from question.cache import cache_response, invalidate_responses, question_scope
+from question.conditional import answers_validators, conditional_response
+from question.models import Question, QuestionTag, increment_counter
+from question.views import add_next_cursor, paginate_by_cursor, valid_page_params
 from answer.models import Answer
 from answer.constants import *
+from user.author_cards import invalidate_author_cards
+from user.models import UserProfile
 from answer.serializers import (
     AnswerSummarySerializer,
     AnswerInfoSerializer,
@@ -46,14 +53,30 @@ class AnswerUserViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        answers_all = Answer.objects.filter(user=user, is_active=True)
+        answers_all = Answer.objects.select_related("question").filter(
+            user=user, is_active=True
+        )
         if sorted_by == VOTE:
             answers_all = answers_all.order_by("-vote")
         elif sorted_by == ACTIVITY:
-            answers_all = answers_all.order_by("-updated_at")
+            answers_all = answers_all.order_by("-last_activity_at")
         elif sorted_by == NEWEST:
             answers_all = answers_all.order_by("-created_at")
 
+        if "cursor" in request.query_params:
+            answers = paginate_by_cursor(request, answers_all, ANSWER_PER_PAGE)
+            if answers is None:
+                return Response(
+                    {"message": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                add_next_cursor(
+                    {"answers": AnswerSummarySerializer(answers, many=True).data},
+                    answers,
+                )
+            )
+
         page = request.query_params.get("page")
 
         if page is None:
@@ -76,6 +99,22 @@ class AnswerUserViewSet(viewsets.GenericViewSet):
         return Response({"answers": AnswerSummarySerializer(answers, many=True).data})
 
 
+def counts_as_post(user, question):
+    """
+    Whether `question` is among `user`'s posts under its tags, as counted by
+    UserTag.post_count: the user asked it or has an active answer on it.
+    """
+    return (
+        question.user_id == user.id
+        or Answer.objects.filter(question=question, user=user, is_active=True).exists()
+    )
+
+
+def valid_answer_params(request):
+    sorted_by = request.query_params.get("sorted_by")
+    return sorted_by in (VOTE, ACTIVITY, OLDEST) and valid_page_params(request)
+
+
 class AnswerQuestionViewSet(viewsets.GenericViewSet):
     queryset = Answer.objects.all()
 
@@ -90,6 +129,8 @@ class AnswerQuestionViewSet(viewsets.GenericViewSet):
         if self.action in ("make",):
             return AnswerProduceSerializer
 
+    @cache_response("answers", "question")
+    @conditional_response(answers_validators, valid_params=valid_answer_params)
     def retrieve(self, request, pk=None):
         try:
             question = Question.objects.get(pk=pk, is_active=True)
@@ -109,14 +150,30 @@ class AnswerQuestionViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        answers_all = Answer.objects.filter(question=question, is_active=True)
+        answers_all = Answer.objects.with_info(request.user).filter(
+            question=question, is_active=True
+        )
         if sorted_by == VOTE:
             answers_all = answers_all.order_by("-is_accepted", "-vote")
         elif sorted_by == ACTIVITY:
-            answers_all = answers_all.order_by("-is_accepted", "-updated_at")
+            answers_all = answers_all.order_by("-is_accepted", "-last_activity_at")
         elif sorted_by == OLDEST:
             answers_all = answers_all.order_by("-is_accepted", "created_at")
 
+        if "cursor" in request.query_params:
+            answers = paginate_by_cursor(request, answers_all, ANSWER_PER_PAGE)
+            if answers is None:
+                return Response(
+                    {"message": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                add_next_cursor(
+                    {"answers": self.get_serializer(answers, many=True).data},
+                    answers,
+                )
+            )
+
         page = request.query_params.get("page")
 
         if page is None:
@@ -141,22 +198,34 @@ class AnswerQuestionViewSet(viewsets.GenericViewSet):
     def make(self, request, pk=None):
         try:
             with transaction.atomic():
-                question = Question.objects.get(pk=pk, is_active=True)
+                # Locking the question serializes its answers, so that two
+                # first answers of a user cannot both count as new posts.
+                question = Question.objects.select_for_update().get(
+                    pk=pk, is_active=True
+                )
                 data = request.data.copy()
                 data["question_id"] = pk
                 serializer = self.get_serializer(data=data)
                 serializer.is_valid(raise_exception=True)
-                answer = serializer.save()
-                question_tags = QuestionTag.objects.filter(question=question)
-                for question_tag in question_tags:
-                    user_tag, created = UserTag.objects.get_or_create(
-                        user=request.user, tag=question_tag.tag
+                new_post = not counts_as_post(request.user, question)
+                answer = serializer.save(question=question)
+                increment_counter(
+                    question, "answer_count", last_activity_at=answer.created_at
+                )
+                if new_post:
+                    shift_post_counts(
+                        [request.user.id],
+                        QuestionTag.objects.filter(question=question).values_list(
+                            "tag_id", flat=True
+                        ),
+                        1,
                     )
         except (Question.DoesNotExist, ValueError):
             return Response(
                 {"message": "There is no question with the given id"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        invalidate_responses(question_scope(question.id))
 
         return Response(
             AnswerInfoSerializer(answer, context=self.get_serializer_context()).data,
@@ -209,7 +278,12 @@ class AnswerViewSet(viewsets.GenericViewSet):
         if content != "":
             serializer = self.get_serializer(answer, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            with transaction.atomic():
+                answer = serializer.save(last_activity_at=timezone.now())
+                Question.objects.filter(pk=answer.question_id).update(
+                    last_activity_at=answer.last_activity_at
+                )
+            invalidate_responses(question_scope(answer.question_id))
 
         return Response(
             AnswerInfoSerializer(answer, context=self.get_serializer_context()).data,
@@ -218,7 +292,7 @@ class AnswerViewSet(viewsets.GenericViewSet):
     def destroy(self, request, pk=None):
         try:
             with transaction.atomic():
-                answer = Answer.objects.get(pk=pk)
+                answer = Answer.objects.select_for_update().get(pk=pk)
                 if not answer.is_active:
                     return Response({}, status=status.HTTP_204_NO_CONTENT)
                 if request.user != answer.user or answer.is_accepted:
@@ -228,23 +302,30 @@ class AnswerViewSet(viewsets.GenericViewSet):
                     )
 
                 question = answer.question
-                question_tags = QuestionTag.objects.filter(question=question)
                 answer.is_active = False
-                answer.save()
-                for question_tag in question_tags:
-                    user_tag = UserTag.objects.get(
-                        user=request.user, tag=question_tag.tag
+                answer.save(update_fields=["is_active", "updated_at"])
+                # Updating the counter locks the question, as in make(),
+                # before counts_as_post() looks at the user's other answers.
+                increment_counter(question, "answer_count", -1)
+                user_tags = UserTag.objects.filter(
+                    user=request.user, tag__question_tags__question=question
+                )
+                if counts_as_post(request.user, question):
+                    user_tags.update(score=F("score") - answer.vote)
+                else:
+                    # Recount rather than decrement, so that a drifted counter
+                    # cannot drop the user tag of someone who still posts there.
+                    user_tags.update(
+                        post_count=user_tag_posts_subquery(),
+                        score=F("score") - answer.vote,
                     )
-                    if TagUserSerializer().get_posts(user_tag) == 0:
-                        user_tag.delete()
-                    else:
-                        user_tag.score -= answer.vote
-                        user_tag.save()
+                    user_tags.filter(post_count__lte=0).delete()
         except (Answer.DoesNotExist, ValueError):
             return Response(
                 {"message": "There is no answer with the given ID"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        invalidate_responses(question_scope(answer.question_id))
 
         return Response({})
 
@@ -270,18 +351,24 @@ class AnswerViewSet(viewsets.GenericViewSet):
             return self.delete_acception(request, answer)
 
     def set_acception(self, answer, is_accepted):
+        now = timezone.now()
         answer.is_accepted = is_accepted
-        answer.save()
+        answer.last_activity_at = now
+        answer.save(update_fields=["is_accepted", "last_activity_at"])
         question = answer.question
         question.has_accepted = is_accepted
-        question.save()
-
-        answer_user_profile = answer.user.profile
-        question_user_profile = question.user.profile
-        question_user_profile.reputation += 2 * (1 if is_accepted else -1)
-        answer_user_profile.reputation += 15 * (1 if is_accepted else -1)
-        answer_user_profile.save()
-        question_user_profile.save()
+        question.last_activity_at = now
+        question.save(update_fields=["has_accepted", "last_activity_at"])
+
+        sign = 1 if is_accepted else -1
+        UserProfile.objects.filter(user_id=question.user_id).update(
+            reputation=F("reputation") + 2 * sign, updated_at=now
+        )
+        UserProfile.objects.filter(user_id=answer.user_id).update(
+            reputation=F("reputation") + 15 * sign, updated_at=now
+        )
+        invalidate_author_cards(answer.user_id, question.user_id)
+        invalidate_responses(question_scope(question.id))
 
     def post_acception(self, request, answer):
         if answer.question.has_accepted:
@@ -1,25 +1,21 @@
 from rest_framework import serializers
 from question.models import UserQuestion
 from question.serializers import SimpleQuestionUserSerializer, QuestionTagSerializer
-from user.serializers import AuthorSerializer
+from user.author_cards import AuthorCardListSerializer, author_card
 
 
 class SimpleBookmarkSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     question_id = serializers.IntegerField(source="question.id", read_only=True)
-    bookmark_count = serializers.SerializerMethodField()
+    bookmark_count = serializers.IntegerField(
+        source="question.bookmark_count", read_only=True
+    )
     bookmarked = serializers.BooleanField(source="bookmark", read_only=True)
 
     class Meta:
         model = UserQuestion
         fields = ("user_id", "question_id", "bookmark_count", "bookmarked")
 
-    def get_bookmark_count(self, user_question):
-        question = user_question.question
-        return UserQuestion.objects.filter(
-            question=question, bookmark=True, question__is_active=True
-        ).count()
-
 
 class BookmarkQuestionSerializer(SimpleQuestionUserSerializer):
     tags = serializers.SerializerMethodField()
@@ -27,9 +23,10 @@ class BookmarkQuestionSerializer(SimpleQuestionUserSerializer):
 
     class Meta(SimpleQuestionUserSerializer.Meta):
         fields = SimpleQuestionUserSerializer.Meta.fields + ("tags", "author")
+        list_serializer_class = AuthorCardListSerializer
 
     def get_tags(self, question):
         return QuestionTagSerializer(question.question_tags, many=True).data
 
     def get_author(self, question):
-        return AuthorSerializer(question.user).data
+        return author_card(question)
@@ -1,5 +1,8 @@
 from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from django.utils import timezone
 
@@ -7,6 +10,7 @@ from bookmark.constants import *
 from answer.models import Answer
 from question.models import Question, UserQuestion, Tag, QuestionTag
 from answer.tests import UserQuestionTestSetting
+from user.models import UserProfile
 
 
 class BookmarkTestCase(UserQuestionTestSetting):
@@ -76,6 +80,7 @@ class PostBookmarkTestCase(BookmarkTestCase):
         user_question.bookmark = True
         user_question.bookmark_at = timezone.now()
         user_question.save()
+        self.reconcile_counters()
 
         response = self.client.post(
             f"/api/bookmark/question/{question.id}/",
@@ -184,6 +189,7 @@ class DeleteBookmarkTestCase(BookmarkTestCase):
         user_question.bookmark = True
         user_question.bookmark_at = timezone.now()
         user_question.save()
+        self.reconcile_counters()
 
     def test_delete_bookmark_question_question_id_invalid_token(self):
         question = Question.objects.get(title="Hello")
@@ -378,6 +384,7 @@ class GetBookmarkUserMeTestCase(UserQuestionTestSetting):
         question.save()
         tag = Tag.objects.create(name="django")
         QuestionTag.objects.create(question=question, tag=tag)
+        self.reconcile_counters()
 
     def test_get_bookmark_user_me_invalid_token(self):
         resopnse = self.client.get(f"/api/bookmark/user/me/?sorted_by=votes&page=1")
@@ -537,6 +544,7 @@ class GetBookmarkUserMeTestCase(UserQuestionTestSetting):
         CHANGE_QUESTION_VOTE = 38
         question = Question.objects.get(vote=CHANGE_QUESTION_VOTE)
         question.content = "changed"
+        question.last_activity_at = timezone.now()
         question.save()
 
         response = self.client.get(
@@ -595,6 +603,7 @@ class GetBookmarkUserMeTestCase(UserQuestionTestSetting):
         question = Question.objects.get(title="Hello")
         qwerty = User.objects.get(username="qwerty")
         self.bookmark(qwerty, question)
+        self.reconcile_counters()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         data = response.json()
         self.assertIsNotNone(data["questions"])
@@ -667,6 +676,7 @@ class GetBookmarkUserMeTestCase(UserQuestionTestSetting):
         question = Question.objects.get(title="Hello")
         qwerty = User.objects.get(username="qwerty")
         self.bookmark(qwerty, question)
+        self.reconcile_counters()
         response = self.client.get(
             f"/api/bookmark/user/me/?sorted_by=added&page=1",
             HTTP_AUTHORIZATION=self.qwerty_token,
@@ -706,3 +716,71 @@ class GetBookmarkUserMeTestCase(UserQuestionTestSetting):
             self.assert_equal_question(question, vote, view_count)
             view_count += 1
             vote -= 1
+
+    def test_get_bookmark_user_cursor_null_bookmark_at(self):
+        qwerty = User.objects.get(username="qwerty")
+        user_questions = UserQuestion.objects.filter(
+            user=qwerty, bookmark=True, question__is_active=True
+        )
+        legacy = list(user_questions.order_by("id").values_list("id", flat=True))
+        UserQuestion.objects.filter(id__in=legacy[::3]).update(bookmark_at=None)
+
+        question_ids = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(
+                f"/api/bookmark/user/{qwerty.id}/?sorted_by=added&cursor={cursor}"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.json()
+            question_ids += [question["id"] for question in data["questions"]]
+            cursor = data["next_cursor"]
+
+        self.assertEqual(
+            question_ids,
+            list(
+                user_questions.order_by(
+                    F("bookmark_at").desc(nulls_last=True), "-id"
+                ).values_list("question_id", flat=True)
+            ),
+        )
+        self.assertEqual(
+            set(question_ids[-len(legacy[::3]) :]),
+            set(
+                user_questions.filter(bookmark_at=None).values_list(
+                    "question_id", flat=True
+                )
+            ),
+        )
+
+    def test_get_bookmark_user_query_count(self):
+        eldpswp99 = User.objects.get(username="eldpswp99")
+        url = f"/api/bookmark/user/{eldpswp99.id}/?sorted_by=added&page=1"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["questions"]), 1)
+        query_count = len(queries)
+
+        # Each new bookmark has its own author and tags.
+        questions = Question.objects.filter(is_active=True, has_accepted=False)
+        for index, question in enumerate(questions[:BOOKMARK_PER_PAGE]):
+            author = User.objects.create(username=f"author{index}", password="pw")
+            UserProfile.objects.create(user=author, nickname=f"author{index}")
+            Question.objects.filter(pk=question.pk).update(user=author)
+            tag = Tag.objects.create(name=f"tag{index}")
+            QuestionTag.objects.create(question=question, tag=tag)
+            self.bookmark(eldpswp99, question)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["questions"]), BOOKMARK_PER_PAGE)
+        self.assertEqual(len(queries), query_count)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/bookmark/user/me/?sorted_by=added&page=1",
+                HTTP_AUTHORIZATION=self.eldpswp99_token,
+            )
+        self.assertEqual(len(response.json()["questions"]), BOOKMARK_PER_PAGE)
+        self.assertEqual(len(queries), query_count)
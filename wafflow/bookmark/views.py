@@ -4,8 +4,12 @@ from rest_framework.response import Response
 from django.utils import timezone
 from django.core.paginator import Paginator, EmptyPage
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Prefetch
 
-from question.models import UserQuestion, Question
+from question.cache import invalidate_responses, question_scope
+from question.models import UserQuestion, Question, QuestionTag, increment_counter
+from question.views import add_next_cursor, paginate_by_cursor
 from bookmark.serializers import SimpleBookmarkSerializer, BookmarkQuestionSerializer
 from bookmark.constants import *
 
@@ -25,19 +29,25 @@ class BookmarkQuestionViewSet(viewsets.GenericViewSet):
             )
 
         user = request.user
-        user_question, created = UserQuestion.objects.get_or_create(
-            user=user, question=question, defaults={"rating": 0}
-        )
-
-        if user_question.bookmark:
-            return Response(
-                {"message": "Validation Error: already bookmarked"},
-                status=status.HTTP_400_BAD_REQUEST,
+        with transaction.atomic():
+            user_question, created = UserQuestion.objects.get_or_create(
+                user=user, question=question, defaults={"rating": 0}
             )
+            user_question.question = question
 
-        user_question.bookmark = True
-        user_question.bookmark_at = timezone.now()
-        user_question.save()
+            bookmark_at = timezone.now()
+            bookmarked = UserQuestion.objects.filter(
+                pk=user_question.pk, bookmark=False
+            ).update(bookmark=True, bookmark_at=bookmark_at, updated_at=bookmark_at)
+            if not bookmarked:
+                return Response(
+                    {"message": "Validation Error: already bookmarked"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            user_question.bookmark = True
+            user_question.bookmark_at = bookmark_at
+            increment_counter(question, "bookmark_count")
+        invalidate_responses(question_scope(question.id))
 
         return Response(self.get_serializer(user_question).data)
 
@@ -51,19 +61,24 @@ class BookmarkQuestionViewSet(viewsets.GenericViewSet):
             )
 
         user = request.user
-        user_question, created = UserQuestion.objects.get_or_create(
-            user=user, question=question, defaults={"rating": 0}
-        )
-
-        if not user_question.bookmark:
-            return Response(
-                self.get_serializer(user_question).data,
-                status=status.HTTP_204_NO_CONTENT,
+        with transaction.atomic():
+            user_question, created = UserQuestion.objects.get_or_create(
+                user=user, question=question, defaults={"rating": 0}
             )
+            user_question.question = question
 
-        user_question.bookmark = False
-        user_question.bookmark_at = None
-        user_question.save()
+            unbookmarked = UserQuestion.objects.filter(
+                pk=user_question.pk, bookmark=True
+            ).update(bookmark=False, bookmark_at=None, updated_at=timezone.now())
+            if not unbookmarked:
+                return Response(
+                    self.get_serializer(user_question).data,
+                    status=status.HTTP_204_NO_CONTENT,
+                )
+            user_question.bookmark = False
+            user_question.bookmark_at = None
+            increment_counter(question, "bookmark_count", -1)
+        invalidate_responses(question_scope(question.id))
 
         return Response(self.get_serializer(user_question).data)
 
@@ -75,9 +90,9 @@ class BookmarkUserViewSet(viewsets.GenericViewSet):
     def sorted_by_queryset(self, user_questions, sorted_by):
         queryset = {
             VOTE: user_questions.order_by("-question__vote"),
-            ACTIVITY: user_questions.order_by("-question__updated_at"),
+            ACTIVITY: user_questions.order_by("-question__last_activity_at"),
             NEWEST: user_questions.order_by("-question__created_at"),
-            ADDED: user_questions.order_by("-bookmark_at"),
+            ADDED: user_questions.order_by(F("bookmark_at").desc(nulls_last=True)),
             VIEWS: user_questions.order_by("-question__view_count"),
         }
         return queryset.get(sorted_by)
@@ -100,19 +115,51 @@ class BookmarkUserViewSet(viewsets.GenericViewSet):
 
         sorted_by = request.query_params.get("sorted_by")
         page = request.query_params.get("page")
+        cursor_mode = "cursor" in request.query_params
 
-        if not (sorted_by in (VOTE, ACTIVITY, NEWEST, ADDED, VIEWS)) or page is None:
+        if not (sorted_by in (VOTE, ACTIVITY, NEWEST, ADDED, VIEWS)) or (
+            page is None and not cursor_mode
+        ):
             return Response(
                 {"message": "Invalid sorted_by or page"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        page = int(page)
-        user_questions_all = UserQuestion.objects.filter(
-            user=user, bookmark=True, question__is_active=True
+        user_questions_all = (
+            UserQuestion.objects.select_related("question__user__profile")
+            .prefetch_related(
+                Prefetch(
+                    "question__question_tags",
+                    queryset=QuestionTag.objects.select_related("tag"),
+                )
+            )
+            .filter(user=user, bookmark=True, question__is_active=True)
         )
 
         user_questions_all = self.sorted_by_queryset(user_questions_all, sorted_by)
+
+        if cursor_mode:
+            user_questions = paginate_by_cursor(
+                request, user_questions_all, BOOKMARK_PER_PAGE
+            )
+            if user_questions is None:
+                return Response(
+                    {"message": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            questions = [user_question.question for user_question in user_questions]
+            return Response(
+                add_next_cursor(
+                    {
+                        "questions": BookmarkQuestionSerializer(
+                            questions, many=True
+                        ).data
+                    },
+                    user_questions,
+                )
+            )
+
+        page = int(page)
         paginator = Paginator(user_questions_all, BOOKMARK_PER_PAGE)
 
         try:
@@ -0,0 +1,26 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+from question import dedupe
+
+
+def dedupe_user_comments(apps, schema_editor):
+    dedupe.dedupe_ratings(apps.get_model("comment", "UserComment"), "comment")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comment", "0002_alter_field_answer_and_question"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_user_comments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="usercomment",
+            constraint=models.UniqueConstraint(
+                fields=("user", "comment"), name="unique_user_comment"
+            ),
+        ),
+    ]
@@ -1,9 +1,32 @@
 from django.db import models
+from django.db.models import Prefetch
 from django.contrib.auth.models import User
 from question.models import Question
 from answer.models import Answer
 
 
+class CommentQuerySet(models.QuerySet):
+    def with_info(self, viewer=None):
+        """
+        Load the author with their profile and the viewer's rating along with
+        the comments, so that a page of CommentSerializer costs a fixed number
+        of queries. Comments embedded elsewhere can be loaded the same way
+        with Prefetch("comments", queryset=Comment.objects.with_info(viewer)).
+        """
+        if viewer is not None and viewer.is_authenticated:
+            viewer_user_comments = UserComment.objects.filter(user=viewer)
+        else:
+            viewer_user_comments = UserComment.objects.none()
+
+        return self.select_related("user__profile").prefetch_related(
+            Prefetch(
+                "user_comments",
+                queryset=viewer_user_comments,
+                to_attr="viewer_user_comments",
+            )
+        )
+
+
 class Comment(models.Model):
     QUESTION = "question"
     ANSWER = "answer"
@@ -22,6 +45,8 @@ class Comment(models.Model):
     answer = models.ForeignKey(Answer, related_name="comments", on_delete=models.CASCADE, null=True)
     vote = models.IntegerField(default=0)
 
+    objects = CommentQuerySet.as_manager()
+
 
 class UserComment(models.Model):
     INCREMENT = 1
@@ -37,3 +62,10 @@ class UserComment(models.Model):
     rating = models.IntegerField(choices=RATING_DEGREE)
     user = models.ForeignKey(User, related_name="user_comments", on_delete=models.CASCADE)
     comment = models.ForeignKey(Comment, related_name="user_comments", on_delete=models.CASCADE);
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "comment"], name="unique_user_comment"
+            ),
+        ]
@@ -4,7 +4,7 @@ from django.contrib.auth.models import AnonymousUser
 from answer.models import Answer
 from comment.models import Comment, UserComment
 from question.models import Question
-from user.serializers import AuthorSerializer
+from user.author_cards import AuthorCardListSerializer, author_card
 
 
 class SimpleCommentSerializer(serializers.ModelSerializer):
@@ -28,17 +28,21 @@ class CommentSerializer(SimpleCommentSerializer):
             "author",
             "rating",
         )
+        list_serializer_class = AuthorCardListSerializer
 
     def get_author(self, comment):
-        user = comment.user
-        return AuthorSerializer(user).data
+        return author_card(comment)
 
     def get_rating(self, comment):
+        if hasattr(comment, "viewer_user_comments"):
+            viewer_user_comments = comment.viewer_user_comments
+            return viewer_user_comments[0].rating if viewer_user_comments else 0
+
         user = None
         request = self.context.get("request")
         if request and hasattr(request, "user"):
             user = request.user
-        if isinstance(user, AnonymousUser):
+        if user is None or isinstance(user, AnonymousUser):
             return 0
         try:
             user_comment = comment.user_comments.get(user=user)
@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import F
 from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -11,11 +13,24 @@ from comment.serializers import (
     CommentsSerializer,
     CommentQuestionProduceSerializer,
 )
-from question.models import Question
-from question.views import paginate_objects
+from question.cache import (
+    answer_scope,
+    cache_response,
+    invalidate_responses,
+    question_scope,
+)
+from question.conditional import comments_validators, conditional_response
+from question.models import Question, increment_counter
+from question.views import add_next_cursor, paginate_objects, valid_page_params
 from comment.constants import *
 
 
+def comment_scopes(comment):
+    if comment.type == Comment.QUESTION:
+        return (question_scope(comment.question_id),)
+    return (answer_scope(comment.answer_id), question_scope(comment.answer.question_id))
+
+
 class CommentViewSet(viewsets.GenericViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
@@ -62,13 +77,15 @@ class CommentViewSet(viewsets.GenericViewSet):
             serializer = CommentEditSerializer(comment, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            invalidate_responses(*comment_scopes(comment))
         return Response(
             self.get_serializer(comment, context=self.get_serializer_context()).data,
         )
 
+    @transaction.atomic
     def destroy(self, request, pk=None):
         try:
-            comment = Comment.objects.get(pk=pk)
+            comment = Comment.objects.select_for_update().get(pk=pk)
         except (Comment.DoesNotExist, ValueError):
             return Response(
                 {"message": "There is no comment with the given ID"},
@@ -82,7 +99,16 @@ class CommentViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
         comment.is_active = False
-        comment.save()
+        comment.save(update_fields=["is_active", "updated_at"])
+        if comment.type == Comment.QUESTION:
+            Question.objects.filter(pk=comment.question_id).update(
+                comment_count=F("comment_count") - 1
+            )
+        else:
+            Answer.objects.filter(pk=comment.answer_id).update(
+                comment_count=F("comment_count") - 1
+            )
+        invalidate_responses(*comment_scopes(comment))
         return Response({})
 
 
@@ -101,6 +127,10 @@ class CommentAnswerViewSet(viewsets.GenericViewSet):
         if self.action in ("make",):
             return CommentAnswerProduceSerializer
 
+    @cache_response("comments", "answer")
+    @conditional_response(
+        comments_validators(Answer, "answer_id"), valid_params=valid_page_params
+    )
     def retrieve(self, request, pk=None):
         try:
             answer = Answer.objects.get(pk=pk, is_active=True)
@@ -109,7 +139,9 @@ class CommentAnswerViewSet(viewsets.GenericViewSet):
                 {"error": "There is no answer with the given ID"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        comments = Comment.objects.filter(answer=answer, is_active=True)
+        comments = Comment.objects.with_info(request.user).filter(
+            answer=answer, is_active=True
+        )
         paginate_comments = paginate_objects(request, comments, COMMENT_PER_PAGE)
         if paginate_comments is None:
             return Response(
@@ -117,24 +149,21 @@ class CommentAnswerViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if request.user.is_authenticated:
-            return Response(
-                {
-                    "comments": self.get_serializer(
-                        paginate_comments,
-                        many=True,
-                        context=self.get_serializer_context(),
-                    ).data
-                }
-            )
+            data = {
+                "comments": self.get_serializer(
+                    paginate_comments,
+                    many=True,
+                    context=self.get_serializer_context(),
+                ).data
+            }
         else:
-            return Response(
-                {
-                    "comments": self.get_serializer(
-                        paginate_comments,
-                        many=True,
-                    ).data
-                }
-            )
+            data = {
+                "comments": self.get_serializer(
+                    paginate_comments,
+                    many=True,
+                ).data
+            }
+        return Response(add_next_cursor(data, paginate_comments))
 
     def make(self, request, pk=None):
         try:
@@ -148,7 +177,17 @@ class CommentAnswerViewSet(viewsets.GenericViewSet):
         data["answer_id"] = pk
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
-        comment = serializer.save()
+        with transaction.atomic():
+            comment = serializer.save()
+            increment_counter(
+                answer, "comment_count", last_activity_at=comment.created_at
+            )
+            Question.objects.filter(pk=answer.question_id).update(
+                last_activity_at=comment.created_at
+            )
+        invalidate_responses(
+            answer_scope(answer.id), question_scope(answer.question_id)
+        )
 
         return Response(
             CommentSerializer(comment, context=self.get_serializer_context()).data,
@@ -171,6 +210,10 @@ class CommentQuestionViewSet(viewsets.GenericViewSet):
         if self.action in ("make",):
             return CommentQuestionProduceSerializer
 
+    @cache_response("comments", "question")
+    @conditional_response(
+        comments_validators(Question, "question_id"), valid_params=valid_page_params
+    )
     def retrieve(self, request, pk=None):
         try:
             question = Question.objects.get(pk=pk, is_active=True)
@@ -179,7 +222,9 @@ class CommentQuestionViewSet(viewsets.GenericViewSet):
                 {"error": "There is no question with the given ID"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        comments = Comment.objects.filter(question=question, is_active=True)
+        comments = Comment.objects.with_info(request.user).filter(
+            question=question, is_active=True
+        )
         paginate_comments = paginate_objects(request, comments, COMMENT_PER_PAGE)
         if paginate_comments is None:
             return Response(
@@ -187,24 +232,21 @@ class CommentQuestionViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if request.user.is_authenticated:
-            return Response(
-                {
-                    "comments": self.get_serializer(
-                        paginate_comments,
-                        many=True,
-                        context=self.get_serializer_context(),
-                    ).data
-                }
-            )
+            data = {
+                "comments": self.get_serializer(
+                    paginate_comments,
+                    many=True,
+                    context=self.get_serializer_context(),
+                ).data
+            }
         else:
-            return Response(
-                {
-                    "comments": self.get_serializer(
-                        paginate_comments,
-                        many=True,
-                    ).data
-                }
-            )
+            data = {
+                "comments": self.get_serializer(
+                    paginate_comments,
+                    many=True,
+                ).data
+            }
+        return Response(add_next_cursor(data, paginate_comments))
 
     def make(self, request, pk=None):
         try:
@@ -218,7 +260,12 @@ class CommentQuestionViewSet(viewsets.GenericViewSet):
         data["question_id"] = pk
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
-        comment = serializer.save()
+        with transaction.atomic():
+            comment = serializer.save()
+            increment_counter(
+                question, "comment_count", last_activity_at=comment.created_at
+            )
+        invalidate_responses(question_scope(question.id))
 
         return Response(
             CommentSerializer(comment, context=self.get_serializer_context()).data,
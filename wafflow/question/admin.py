@@ -2,6 +2,8 @@ from django.contrib import admin
 
 from .models import Question, UserQuestion, Tag, QuestionTag
 from answer.models import Answer
+from question.cache import invalidate_responses, question_scope
+from tag.statistics import shift_question_activity
 
 
 class UserQuestionInline(admin.TabularInline):
@@ -41,6 +43,15 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ["created_at", "has_accepted", "vote", "is_active"]
     search_fields = ["title", "content"]
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Leave the votes and counters other requests update alone.
+        obj.save(update_fields=[*form.changed_data, "updated_at"])
+        if "is_active" in form.changed_data:
+            shift_question_activity(obj, 1 if obj.is_active else -1)
+            invalidate_responses("tags", question_scope(obj.id))
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
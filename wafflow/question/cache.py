@@ -0,0 +1,124 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.response import Response
+
+RESPONSE_CACHE_PREFIX = "response"
+VALIDATOR_HEADERS = ("ETag",)
+
+
+def response_cache_timeout(endpoint):
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUTS", {}).get(endpoint, 0)
+
+
+def scope_version_key(scope):
+    return f"{RESPONSE_CACHE_PREFIX}:version:{scope}"
+
+
+def get_scope_version(scope):
+    key = scope_version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def response_cache_key(request, endpoint, scope):
+    query = sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+    )
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    version = get_scope_version(scope)
+    return f"{RESPONSE_CACHE_PREFIX}:{endpoint}:{scope}:{version}:anonymous:{digest}"
+
+
+def cached_response(request, data, headers):
+    """
+    Rebuild a cached response, answering conditional requests against the
+    validators stored with it instead of sending the body again.
+    """
+    response = get_conditional_response(request, etag=headers.get("ETag"))
+    if response is None:
+        response = Response(data)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def cache_response(endpoint, scope, on_hit=None):
+    """
+    Cache successful anonymous responses of a read view for the number of
+    seconds configured in RESPONSE_CACHE_TIMEOUTS[endpoint].
+
+    Entries are keyed on path and query parameters within `scope`, suffixed
+    with the view's pk when it has one, so invalidate_responses() can drop
+    every page of a question or answer at once. `on_hit` is called with the
+    request and pk when a cached response is served.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            timeout = response_cache_timeout(endpoint)
+            if not timeout or request.user.is_authenticated:
+                return view(self, request, *args, **kwargs)
+
+            pk = kwargs.get("pk")
+            key_scope = scope
+            if pk is not None:
+                try:
+                    key_scope = f"{scope}:{int(pk)}"
+                except ValueError:
+                    return view(self, request, *args, **kwargs)
+            key = response_cache_key(request, endpoint, key_scope)
+            cached = cache.get(key)
+            if cached is not None:
+                if on_hit is not None:
+                    on_hit(request, pk)
+                return cached_response(request, *cached)
+
+            response = view(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {
+                    header: response[header]
+                    for header in VALIDATOR_HEADERS
+                    if response.has_header(header)
+                }
+                cache.set(key, (response.data, headers), timeout)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def bump_scope_versions(scopes):
+    cache.set_many(
+        {scope_version_key(scope): uuid.uuid4().hex for scope in scopes}, None
+    )
+
+
+def invalidate_responses(*scopes):
+    """
+    Drop cached responses of the given scopes, e.g. "question:1" or "tags".
+    Inside a transaction the scopes are invalidated again on commit so that
+    readers racing the write cannot cache the old rows under the new version.
+    """
+    bump_scope_versions(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_scope_versions(scopes))
+
+
+def question_scope(question_id):
+    return f"question:{question_id}"
+
+
+def answer_scope(answer_id):
+    return f"answer:{answer_id}"
@@ -0,0 +1,146 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from answer.models import Answer, UserAnswer
+from comment.models import Comment, UserComment
+from question.models import Question, UserQuestion
+
+
+def make_etag(rows, viewer):
+    """
+    Build an ETag from fingerprint rows, covering every column so that vote
+    and counter changes that leave updated_at alone still change it.
+    """
+    viewer_id = viewer.id if viewer.is_authenticated else None
+    digest = hashlib.md5(repr((viewer_id, rows)).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def data_response(request, data):
+    """
+    Respond with `data`, or with 304 Not Modified when If-None-Match holds
+    its ETag, for views whose validators would cost as much as the body.
+    """
+    etag = make_etag(data, request.user)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(data)
+    response["ETag"] = etag
+    return response
+
+
+def fingerprint(queryset, viewer, viewer_state, *columns):
+    """
+    Return (pk, *columns) of every row in `queryset`. `viewer_state` is a
+    (queryset, field, column) triple naming the viewer's own row for each
+    post, whose `column` is appended for authenticated viewers.
+    """
+    if viewer.is_authenticated:
+        states, field, column = viewer_state
+        state = states.filter(user=viewer, **{field: OuterRef("pk")})
+        queryset = queryset.annotate(viewer_state=Subquery(state.values(column)[:1]))
+        columns += ("viewer_state",)
+    return list(queryset.order_by("pk").values_list("pk", *columns))
+
+
+def question_validators(request, pk):
+    questions = Question.objects.filter(pk=pk, is_active=True)
+    return fingerprint(
+        questions,
+        request.user,
+        (UserQuestion.objects.all(), "question", "updated_at"),
+        "updated_at",
+        "vote",
+        "answer_count",
+        "comment_count",
+        "bookmark_count",
+        "has_accepted",
+        "user__profile__updated_at",
+    )
+
+
+def answers_validators(request, pk):
+    if not Question.objects.filter(pk=pk, is_active=True).exists():
+        return []
+    answers = Answer.objects.filter(question_id=pk, is_active=True)
+    return [(int(pk), None)] + fingerprint(
+        answers,
+        request.user,
+        (UserAnswer.objects.all(), "answer", "updated_at"),
+        "updated_at",
+        "vote",
+        "comment_count",
+        "is_accepted",
+        "user__profile__updated_at",
+    )
+
+
+def comments_validators(parent_model, parent_field):
+    def validators(request, pk):
+        if not parent_model.objects.filter(pk=pk, is_active=True).exists():
+            return []
+        comments = Comment.objects.filter(is_active=True, **{parent_field: pk})
+        return [(int(pk), None)] + fingerprint(
+            comments,
+            request.user,
+            (UserComment.objects.all(), "comment", "rating"),
+            "updated_at",
+            "vote",
+            "user__profile__updated_at",
+        )
+
+    return validators
+
+
+def conditional_response(get_rows, on_not_modified=None, valid_params=None):
+    """
+    Answer GET requests carrying If-None-Match with 304 Not Modified before
+    the view builds its body.
+
+    `get_rows(request, pk)` returns fingerprint rows of everything the
+    response depends on, or an empty list when the view would not return
+    200. `valid_params(request)` tells whether the view accepts the query
+    parameters; when it does not, the view answers with its error instead.
+
+    No Last-Modified is sent: votes, counters and the viewer's own state
+    change responses without touching any single timestamp, so only the
+    ETag can tell a client that nothing changed.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            if valid_params is not None and not valid_params(request):
+                return view(self, request, *args, **kwargs)
+            pk = kwargs.get("pk")
+            try:
+                rows = get_rows(request, pk)
+            except ValueError:
+                rows = []
+            if not rows:
+                return view(self, request, *args, **kwargs)
+
+            etag = make_etag(rows, request.user)
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                if (
+                    on_not_modified is not None
+                    and response.status_code == status.HTTP_304_NOT_MODIFIED
+                ):
+                    on_not_modified(request, pk)
+            else:
+                response = view(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+
+            response["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
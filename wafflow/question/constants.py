@@ -5,6 +5,10 @@ NEWEST = "newest"
 RECENT_ACTIVITY = "recent_activity"
 MOST_VOTES = "most_votes"
 MOST_FREQUENT = "most_frequent"
+RELEVANCE = "relevance"
+
+ALL_TAGS = "all"
+ANY_TAGS = "any"
 
 VOTES = "votes"
 ACTIVITY = "activity"
@@ -13,3 +17,6 @@ VIEWS = "views"
 
 QUESTION_PER_PAGE = 30
 CONTENT_FOR_TAG_SEARCH = 180
+
+SEARCH_CONFIG = "english"
+SEARCH_HEADLINE_MAX_WORDS = 35
@@ -0,0 +1,125 @@
+"""
+Merge the duplicate rows that the unique constraints of the 0006
+(question), 0002 (tag), 0003 (answer) and 0003 (comment) migrations forbid.
+
+The functions take the model classes to work on, so that the migrations
+can pass their historical models; they only use the fields those models
+have at that point.
+"""
+
+from django.db.models import Count, F
+
+
+def duplicate_groups(queryset, *fields):
+    """
+    Yield the rows of `queryset` that share values of `fields` with another
+    row, one list per group ordered by id.
+    """
+    groups = (
+        queryset.order_by()
+        .values(*fields)
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for group in groups:
+        values = {field: group[field] for field in fields}
+        yield list(queryset.filter(**values).order_by("id"))
+
+
+def merge_user_tags(UserTag, keeper, duplicates):
+    UserTag.objects.filter(id=keeper.id).update(
+        score=F("score") + sum(user_tag.score for user_tag in duplicates)
+    )
+    UserTag.objects.filter(id__in=[user_tag.id for user_tag in duplicates]).delete()
+
+
+def dedupe_tags(Tag, QuestionTag, UserTag):
+    """
+    Merge tags sharing a name into the oldest one, together with the
+    QuestionTag and UserTag rows that then point to the same pair.
+    """
+    removed = 0
+    for tags in duplicate_groups(Tag.objects.all(), "name"):
+        keeper, duplicates = tags[0], tags[1:]
+        QuestionTag.objects.filter(tag__in=duplicates).update(tag=keeper)
+        # UserTag(user, tag) may already be unique, so merge the rows of a
+        # user into the keeper's before repointing the rest.
+        for user_tag in UserTag.objects.filter(tag__in=duplicates).order_by("id"):
+            existing = UserTag.objects.filter(
+                user_id=user_tag.user_id, tag=keeper
+            ).first()
+            if existing is None:
+                UserTag.objects.filter(id=user_tag.id).update(tag=keeper)
+            else:
+                merge_user_tags(UserTag, existing, [user_tag])
+        Tag.objects.filter(id__in=[tag.id for tag in duplicates]).delete()
+        removed += len(duplicates)
+
+    for question_tags in duplicate_groups(QuestionTag.objects.all(), "question", "tag"):
+        QuestionTag.objects.filter(
+            id__in=[question_tag.id for question_tag in question_tags[1:]]
+        ).delete()
+    return removed
+
+
+def dedupe_user_tags(UserTag):
+    """Merge the UserTag rows of each user and tag, summing their scores."""
+    removed = 0
+    for user_tags in duplicate_groups(UserTag.objects.all(), "user", "tag"):
+        merge_user_tags(UserTag, user_tags[0], user_tags[1:])
+        removed += len(user_tags) - 1
+    return removed
+
+
+def dedupe_ratings(UserRating, post_field, UserTag=None, question_id_of=None):
+    """
+    Keep the latest rating row of each user and post. The ratings of the
+    removed rows were already applied to the post, so they are taken back
+    out of its vote and, when `UserTag` is given, out of its author's scores
+    for the tags of the question `question_id_of(post)`.
+
+    Returns the keepers whose duplicates were removed.
+    """
+    keepers = []
+    user_ratings = UserRating.objects.select_related(post_field)
+    for rows in duplicate_groups(user_ratings, "user", post_field):
+        keeper, duplicates = rows[-1], rows[:-1]
+        post = getattr(keeper, post_field)
+        rating_diff = sum(row.rating for row in duplicates)
+        if rating_diff:
+            type(post).objects.filter(pk=post.pk).update(vote=F("vote") - rating_diff)
+            if UserTag is not None:
+                UserTag.objects.filter(
+                    user_id=post.user_id,
+                    tag__question_tags__question_id=question_id_of(post),
+                ).update(score=F("score") - rating_diff)
+        UserRating.objects.filter(id__in=[row.id for row in duplicates]).delete()
+        keeper.duplicates = duplicates
+        keepers.append(keeper)
+    return keepers
+
+
+def dedupe_user_questions(UserQuestion, Question, UserTag):
+    """
+    Keep the latest UserQuestion of each user and question, carrying over a
+    bookmark of the removed rows, and recount the bookmarks of the questions.
+    """
+    keepers = dedupe_ratings(
+        UserQuestion, "question", UserTag, lambda question: question.id
+    )
+    for keeper in keepers:
+        bookmarked = [row for row in keeper.duplicates if row.bookmark]
+        if bookmarked and not keeper.bookmark:
+            UserQuestion.objects.filter(id=keeper.id).update(
+                bookmark=True,
+                bookmark_at=max(
+                    (row.bookmark_at for row in bookmarked if row.bookmark_at),
+                    default=None,
+                ),
+            )
+    for question_id in {keeper.question_id for keeper in keepers}:
+        Question.objects.filter(id=question_id).update(
+            bookmark_count=UserQuestion.objects.filter(
+                question_id=question_id, bookmark=True
+            ).count()
+        )
@@ -0,0 +1,210 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from answer.models import Answer
+from question.models import Question
+from user.authentication import invalidate_tokens
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every /api/ endpoint through the test client against the current "
+        "database and write p50/p95 latency and SQL query counts as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--user", help="Username of the viewer for authenticated requests"
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the response cache enabled instead of measuring the views",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+
+        question = (
+            Question.objects.filter(is_active=True)
+            .order_by("-answer_count", "-id")
+            .first()
+        )
+        if question is None:
+            raise CommandError("There are no questions, run seed_data first")
+        answer = (
+            Answer.objects.filter(question=question, is_active=True)
+            .order_by("-comment_count", "-id")
+            .first()
+        )
+        viewer = self.get_viewer(options["user"], question, answer)
+        token, created = Token.objects.get_or_create(user=viewer)
+        try:
+            report = self.run(question, answer, viewer, token, options)
+        finally:
+            # Leave no credential behind for a viewer that had none.
+            if created:
+                key = token.key
+                token.delete()
+                invalidate_tokens(key)
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+            output.write("\n")
+        self.stdout.write(f"Wrote {options['output']}")
+
+    def run(self, question, answer, viewer, token, options):
+        client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+        anonymous = Client()
+        report = {"iterations": options["iterations"], "endpoints": {}}
+
+        settings = {} if options["cache"] else {"RESPONSE_CACHE_TIMEOUTS": {}}
+        with override_settings(**settings):
+            for name, method, path, data, viewer_client in self.scenarios(
+                question, answer, viewer, client, anonymous
+            ):
+                report["endpoints"][name] = self.measure(
+                    viewer_client, method, path, data, options
+                )
+                self.stdout.write(f"{name}: {report['endpoints'][name]}")
+        return report
+
+    def get_viewer(self, username, question, answer):
+        if username is not None:
+            try:
+                return User.objects.get(username=username, is_active=True)
+            except User.DoesNotExist:
+                raise CommandError(f"There is no active user {username}")
+        # Rating needs someone who wrote neither the question nor the answer.
+        authors = [question.user_id] + ([answer.user_id] if answer else [])
+        viewer = (
+            User.objects.filter(is_active=True, profile__isnull=False)
+            .exclude(pk__in=authors)
+            .order_by("id")
+            .first()
+        )
+        if viewer is None:
+            raise CommandError("There is no user to authenticate as")
+        return viewer
+
+    def scenarios(self, question, answer, viewer, client, anonymous):
+        """Yield (name, method, path, data, client) for every endpoint."""
+        author_id = question.user_id
+        tag = question.question_tags.values_list("tag__name", flat=True).first()
+        keyword = question.title.split()[0] if question.title.split() else ""
+
+        reads = [
+            ("question.list", "question/tagged/?sorted_by=newest&page=1"),
+            (
+                "question.tagged",
+                f"question/tagged/?tags={tag or ''}&sorted_by=most_votes&page=1",
+            ),
+            (
+                "question.unanswered",
+                "question/tagged/?filter_by=no_answer&sorted_by=newest&page=1",
+            ),
+            (
+                "question.search",
+                f"question/search/keywords/?keywords={keyword}&sorted_by=relevance"
+                "&headline=true&page=1",
+            ),
+            ("question.detail", f"question/{question.id}/"),
+            ("question.user", f"question/user/{author_id}/?sorted_by=votes&page=1"),
+            (
+                "answer.question",
+                f"answer/question/{question.id}/?sorted_by=votes&page=1",
+            ),
+            ("answer.user", f"answer/user/{author_id}/?sorted_by=votes&page=1"),
+            ("comment.question", f"comment/question/{question.id}/?page=1"),
+            ("tag.list", "tags/?sorted_by=popular&page=1"),
+            ("tag.user", f"tag/user/{author_id}/?sorted_by=votes&page=1"),
+            ("user.list", "users/?sorted_by=reputation&page=1"),
+            ("user.detail", f"user/{author_id}/"),
+            ("bookmark.user", f"bookmark/user/{viewer.id}/?sorted_by=added&page=1"),
+        ]
+        if answer is not None:
+            reads.append(("comment.answer", f"comment/answer/{answer.id}/?page=1"))
+
+        for name, path in reads:
+            yield f"GET {name}", "get", f"/api/{path}", None, anonymous
+            yield f"GET {name} (authenticated)", "get", f"/api/{path}", None, client
+
+        writes = [
+            (
+                "question.create",
+                "post",
+                "question/",
+                {"title": "benchmark", "content": "benchmark", "tags": [tag or "tag"]},
+            ),
+            (
+                "answer.create",
+                "post",
+                f"answer/question/{question.id}/",
+                {"content": "benchmark"},
+            ),
+            (
+                "comment.create",
+                "post",
+                f"comment/question/{question.id}/",
+                {"content": "benchmark"},
+            ),
+            ("rate.question", "put", f"rate/question/{question.id}/", {"rating": 1}),
+            ("bookmark.create", "post", f"bookmark/question/{question.id}/", {}),
+        ]
+        if answer is not None:
+            writes.append(
+                ("rate.answer", "put", f"rate/answer/{answer.id}/", {"rating": 1})
+            )
+        for name, method, path, data in writes:
+            yield f"{method.upper()} {name}", method, f"/api/{path}", data, client
+
+    def measure(self, client, method, path, data, options):
+        """
+        Request `path` repeatedly, rolling back every request so that writes
+        measure the same state each time.
+        """
+        timings = []
+        query_counts = []
+        status_codes = set()
+        for iteration in range(options["warmup"] + options["iterations"]):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    if data is None:
+                        response = getattr(client, method)(path)
+                    else:
+                        response = getattr(client, method)(
+                            path, json.dumps(data), content_type="application/json"
+                        )
+                    elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+            if iteration < options["warmup"]:
+                continue
+            timings.append(elapsed * 1000)
+            query_counts.append(len(queries))
+            status_codes.add(response.status_code)
+
+        return {
+            "path": path,
+            "status": sorted(status_codes),
+            "p50_ms": round(percentile(timings, 0.5), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "queries": max(query_counts),
+        }
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from answer.models import Answer
+from question.management.commands.reconcile_counters import (
+    answer_counters,
+    question_counters,
+    user_tag_counters,
+)
+from question.models import Question, QuestionTag
+from tag.models import TagStatistics, UserTag
+
+
+def tag_statistics_counters():
+    counted = (
+        QuestionTag.objects.filter(question__is_active=True, tag=OuterRef("tag"))
+        .order_by()
+        .values("tag")
+        .annotate(count=Count("question", distinct=True))
+        .values("count")
+    )
+    return {
+        "question_count": Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the denormalized counters against the rows they count and "
+        "fail when any of them drifted"
+    )
+
+    def handle(self, *args, **options):
+        checks = (
+            (Question, question_counters()),
+            (Answer, answer_counters()),
+            (UserTag, user_tag_counters()),
+            (TagStatistics, tag_statistics_counters()),
+        )
+        inconsistent = 0
+        for model, counters in checks:
+            for field, expected in counters.items():
+                mismatched = (
+                    model.objects.annotate(expected=expected)
+                    .exclude(**{field: F("expected")})
+                    .count()
+                )
+                self.stdout.write(
+                    f"{model._meta.label}.{field}: {mismatched} mismatched"
+                )
+                inconsistent += mismatched
+
+        if inconsistent:
+            raise CommandError(
+                f"{inconsistent} counters are inconsistent, run reconcile_counters "
+                "and rebuild_tag_statistics"
+            )
@@ -0,0 +1,62 @@
+import io
+import os
+import pstats
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from wafflow.middleware import profile_files, sign_profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "List the request profiles in PROFILING_DIR, summarise one of them, "
+        "or print a token that triggers profiling"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Profile to summarise")
+        parser.add_argument(
+            "--sort", default="cumulative", help="pstats sort key of the summary"
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--sign",
+            action="store_true",
+            help="Print a token for the X-Profile header or profile parameter",
+        )
+
+    def handle(self, *args, **options):
+        if options["sign"]:
+            self.stdout.write(sign_profile_token())
+        elif options["name"]:
+            self.summarise(options["name"], options["sort"], options["limit"])
+        else:
+            self.list_profiles(options["limit"])
+
+    def list_profiles(self, limit):
+        paths = profile_files(settings.PROFILING_DIR)
+        if not paths:
+            self.stdout.write(f"No profiles in {settings.PROFILING_DIR}")
+            return
+        for path in paths[:limit]:
+            stats = pstats.Stats(path)
+            modified = datetime.fromtimestamp(os.path.getmtime(path))
+            self.stdout.write(
+                f"{os.path.basename(path)}  {modified:%Y-%m-%d %H:%M:%S}  "
+                f"{os.path.getsize(path)} bytes  {stats.total_calls} calls  "
+                f"{stats.total_tt * 1000:.2f} ms"
+            )
+
+    def summarise(self, name, sort, limit):
+        path = os.path.join(settings.PROFILING_DIR, os.path.basename(name))
+        if not os.path.exists(path):
+            raise CommandError(f"There is no profile {name}")
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        try:
+            stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        except KeyError:
+            raise CommandError(f"Invalid sort key {sort}")
+        self.stdout.write(output.getvalue())
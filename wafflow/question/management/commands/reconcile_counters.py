@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from answer.models import Answer
+from comment.models import Comment
+from question.models import Question, UserQuestion, count_subquery
+from tag.models import UserTag
+from tag.statistics import user_tag_posts_subquery
+
+
+def question_counters(Answer=Answer, Comment=Comment, UserQuestion=UserQuestion):
+    """
+    The counters of each question; the migrations that add them pass their
+    historical models.
+    """
+    return {
+        "answer_count": count_subquery(
+            Answer.objects.filter(is_active=True), "question"
+        ),
+        "comment_count": count_subquery(
+            Comment.objects.filter(is_active=True), "question"
+        ),
+        "bookmark_count": count_subquery(
+            UserQuestion.objects.filter(bookmark=True), "question"
+        ),
+    }
+
+
+def answer_counters(Comment=Comment):
+    return {
+        "comment_count": count_subquery(
+            Comment.objects.filter(is_active=True), "answer"
+        ),
+    }
+
+
+def user_tag_counters():
+    return {"post_count": user_tag_posts_subquery()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized answer, comment and bookmark counters and "
+        "the post counts of user tags"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        questions = self.reconcile(
+            Question.objects.all(), batch_size, **question_counters()
+        )
+        answers = self.reconcile(Answer.objects.all(), batch_size, **answer_counters())
+        user_tags = self.reconcile(
+            UserTag.objects.all(), batch_size, **user_tag_counters()
+        )
+
+        self.stdout.write(
+            f"Reconciled counters of {questions} questions, {answers} answers "
+            f"and {user_tags} user tags"
+        )
+
+    def reconcile(self, queryset, batch_size, **counters):
+        last_id = queryset.aggregate(last_id=Max("id"))["last_id"] or 0
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            updated += queryset.filter(id__gte=start, id__lt=start + batch_size).update(
+                **counters
+            )
+        return updated
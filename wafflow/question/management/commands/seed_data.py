@@ -0,0 +1,286 @@
+import random
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from answer.models import Answer, UserAnswer
+from comment.models import Comment, UserComment
+from question.models import Question, QuestionTag, Tag, UserQuestion
+from tag.models import UserTag
+from user.models import UserProfile
+
+WORDS = (
+    "python django react javascript github docker query index cache server "
+    "client token thread request response model view template deploy test "
+    "error memory database table column migration async schema router style "
+    "build package module import function class object string list dict"
+).split()
+
+
+def power_law_weights(count, exponent):
+    """Zipf weights: the item of rank r is drawn with probability ~ 1 / r**s."""
+    return [1 / rank**exponent for rank in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users, questions, answers, comments, tags and votes with "
+        "power-law tag popularity, heavy-tailed answer counts and hot questions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--questions", type=int, default=5000)
+        parser.add_argument("--answers", type=int, default=15000)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument("--tags", type=int, default=300)
+        parser.add_argument("--votes", type=int, default=50000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+
+        with transaction.atomic():
+            users = self.seed_users(options["users"])
+            tags = self.seed_tags(options["tags"])
+            questions = self.seed_questions(users, tags, options["questions"])
+            answers = self.seed_answers(users, questions, options["answers"])
+            comments = self.seed_comments(
+                users, questions, answers, options["comments"]
+            )
+            votes = self.seed_votes(users, questions, answers, comments, options)
+            self.seed_user_tags(questions, answers)
+            self.save_posts(questions, answers, comments)
+
+        call_command("reconcile_counters", stdout=self.stdout)
+        call_command("rebuild_tag_statistics", stdout=self.stdout)
+        self.stdout.write(
+            f"Seeded {len(users)} users, {len(tags)} tags, {len(questions)} "
+            f"questions, {len(answers)} answers, {len(comments)} comments and "
+            f"{sum(len(ratings) for ratings in votes.values())} votes"
+        )
+
+    def bulk_create(self, model, objects, **kwargs):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size, **kwargs)
+
+    def text(self, words):
+        return " ".join(self.random.choices(WORDS, k=words))
+
+    def past(self, days=365):
+        return self.now - timedelta(seconds=self.random.uniform(0, days * 86400))
+
+    def since(self, moment):
+        return moment + self.random.uniform(0, 1) * (self.now - moment)
+
+    def seed_users(self, count):
+        prefix = uuid.uuid4().hex[:6]
+        password = make_password("password")
+        users = self.bulk_create(
+            User,
+            [
+                User(username=f"seed_{prefix}_{index}", password=password)
+                for index in range(count)
+            ],
+        )
+        self.bulk_create(
+            UserProfile,
+            [
+                UserProfile(
+                    user=user,
+                    nickname=f"{prefix}{index}",
+                    reputation=int(self.random.paretovariate(1.5)) - 1,
+                )
+                for index, user in enumerate(users)
+            ],
+        )
+        # A few users write most of the posts.
+        self.user_weights = power_law_weights(len(users), 1.0)
+        return users
+
+    def seed_tags(self, count):
+        names = [f"{WORDS[index % len(WORDS)]}-{index}" for index in range(count)]
+        self.bulk_create(Tag, [Tag(name=name) for name in names], ignore_conflicts=True)
+        tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+        return [tags[name] for name in names]
+
+    def pick_user(self, users):
+        return self.random.choices(users, weights=self.user_weights)[0]
+
+    def seed_questions(self, users, tags, count):
+        questions = self.bulk_create(
+            Question,
+            [
+                Question(
+                    user=self.pick_user(users),
+                    title=self.text(8),
+                    content=self.text(60),
+                )
+                for _ in range(count)
+            ],
+        )
+        # Hotness drives answers, comments, votes and views, so a small share
+        # of questions attracts most of the activity.
+        self.hotness = {
+            question.id: self.random.paretovariate(1.2) for question in questions
+        }
+
+        tag_weights = power_law_weights(len(tags), 1.1)
+        question_tags = []
+        self.question_tags = defaultdict(set)
+        for question in questions:
+            for tag in self.random.choices(
+                tags, weights=tag_weights, k=self.random.randint(1, 5)
+            ):
+                if tag.id not in self.question_tags[question.id]:
+                    self.question_tags[question.id].add(tag.id)
+                    question_tags.append(QuestionTag(question=question, tag=tag))
+        self.bulk_create(QuestionTag, question_tags)
+        return questions
+
+    def seed_answers(self, users, questions, count):
+        if not questions:
+            return []
+        weights = [self.hotness[question.id] for question in questions]
+        answers = self.bulk_create(
+            Answer,
+            [
+                Answer(
+                    user=self.pick_user(users),
+                    question=question,
+                    content=self.text(40),
+                )
+                for question in self.random.choices(questions, weights=weights, k=count)
+            ],
+        )
+
+        answers_by_question = defaultdict(list)
+        for answer in answers:
+            answers_by_question[answer.question_id].append(answer)
+        for question in questions:
+            question_answers = answers_by_question[question.id]
+            if question_answers and self.random.random() < 0.3:
+                self.random.choice(question_answers).is_accepted = True
+                question.has_accepted = True
+        return answers
+
+    def seed_comments(self, users, questions, answers, count):
+        if not questions:
+            return []
+        comments = []
+        question_weights = [self.hotness[question.id] for question in questions]
+        answer_weights = [self.hotness[answer.question_id] for answer in answers]
+        for _ in range(count):
+            if answers and self.random.random() < 0.5:
+                answer = self.random.choices(answers, weights=answer_weights)[0]
+                comment = Comment(type=Comment.ANSWER, answer=answer)
+            else:
+                question = self.random.choices(questions, weights=question_weights)[0]
+                comment = Comment(type=Comment.QUESTION, question=question)
+            comment.user = self.pick_user(users)
+            comment.content = self.text(12)
+            comments.append(comment)
+        return self.bulk_create(Comment, comments)
+
+    def question_id(self, post):
+        if isinstance(post, Question):
+            return post.id
+        if isinstance(post, Comment) and post.question_id is None:
+            return post.answer.question_id
+        return post.question_id
+
+    def seed_votes(self, users, questions, answers, comments, options):
+        """
+        Spread votes over posts by hotness, one rating per user and post, and
+        return {rating model: [ratings]}.
+        """
+        posts = (
+            [(UserQuestion, "question", question) for question in questions]
+            + [(UserAnswer, "answer", answer) for answer in answers]
+            + [(UserComment, "comment", comment) for comment in comments]
+        )
+        votes = {UserQuestion: [], UserAnswer: [], UserComment: []}
+        if not posts or not users:
+            return votes
+
+        weights = [self.hotness[self.question_id(post)] for _, _, post in posts]
+        voted = set()
+        for model, field, post in self.random.choices(
+            posts, weights=weights, k=options["votes"]
+        ):
+            user = self.random.choice(users)
+            if user.id == post.user_id or (model, user.id, post.id) in voted:
+                continue
+            voted.add((model, user.id, post.id))
+            rating = 1 if self.random.random() < 0.8 else -1
+            vote = model(user=user, rating=rating, **{field: post})
+            if model is UserQuestion and self.random.random() < 0.05:
+                vote.bookmark = True
+                vote.bookmark_at = self.past(30)
+            votes[model].append(vote)
+            post.vote += rating
+
+        for model, ratings in votes.items():
+            self.bulk_create(model, ratings)
+        return votes
+
+    def seed_user_tags(self, questions, answers):
+        scores = defaultdict(int)
+        posted_questions = defaultdict(set)
+        for post in questions + answers:
+            question_id = self.question_id(post)
+            for tag_id in self.question_tags[question_id]:
+                scores[(post.user_id, tag_id)] += post.vote
+                posted_questions[(post.user_id, tag_id)].add(question_id)
+        self.bulk_create(
+            UserTag,
+            [
+                UserTag(
+                    user_id=user_id,
+                    tag_id=tag_id,
+                    score=score,
+                    post_count=len(posted_questions[(user_id, tag_id)]),
+                )
+                for (user_id, tag_id), score in scores.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    def save_posts(self, questions, answers, comments):
+        for question in questions:
+            question.view_count = int(self.hotness[question.id] * 10)
+            question.created_at = self.past()
+            question.updated_at = question.created_at
+            question.last_activity_at = question.created_at
+        for answer in answers:
+            answer.created_at = self.since(answer.question.created_at)
+            answer.updated_at = answer.created_at
+            answer.last_activity_at = answer.created_at
+
+        Question.objects.bulk_update(
+            questions,
+            [
+                "vote",
+                "view_count",
+                "has_accepted",
+                "created_at",
+                "updated_at",
+                "last_activity_at",
+            ],
+            batch_size=self.batch_size,
+        )
+        Answer.objects.bulk_update(
+            answers,
+            ["vote", "is_accepted", "created_at", "updated_at", "last_activity_at"],
+            batch_size=self.batch_size,
+        )
+        Comment.objects.bulk_update(comments, ["vote"], batch_size=self.batch_size)
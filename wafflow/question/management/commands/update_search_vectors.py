@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from question.models import Question, question_search_vector
+
+
+class Command(BaseCommand):
+    help = "Populate the full-text search vector of existing questions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every question instead of only the missing vectors",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        questions = Question.objects.all()
+        if not options["all"]:
+            questions = questions.filter(search_vector__isnull=True)
+
+        last_id = questions.aggregate(last_id=Max("id"))["last_id"] or 0
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            updated += questions.filter(
+                id__gte=start, id__lt=start + batch_size
+            ).update(search_vector=question_search_vector())
+
+        self.stdout.write(f"Updated search vectors of {updated} questions")
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION question_question_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER question_question_search_vector_insert
+    BEFORE INSERT ON question_question
+    FOR EACH ROW EXECUTE PROCEDURE question_question_search_vector_update();
+
+CREATE TRIGGER question_question_search_vector_update
+    BEFORE UPDATE ON question_question
+    FOR EACH ROW
+    WHEN (
+        OLD.title IS DISTINCT FROM NEW.title
+        OR OLD.content IS DISTINCT FROM NEW.content
+        OR NEW.search_vector IS NULL
+    )
+    EXECUTE PROCEDURE question_question_search_vector_update();
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS question_question_search_vector_update ON question_question;
+DROP TRIGGER IF EXISTS question_question_search_vector_insert ON question_question;
+DROP FUNCTION IF EXISTS question_question_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("question", "0003_tag_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="question_qu_search__f59160_gin"
+            ),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+from question.management.commands.reconcile_counters import question_counters
+
+
+def count_posts(apps, schema_editor):
+    Question = apps.get_model("question", "Question")
+    Question.objects.update(
+        **question_counters(
+            apps.get_model("answer", "Answer"),
+            apps.get_model("comment", "Comment"),
+            apps.get_model("question", "UserQuestion"),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("question", "0004_question_search_vector"),
+        ("answer", "0001_initial"),
+        ("comment", "0002_alter_field_answer_and_question"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="answer_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="bookmark_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="comment_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
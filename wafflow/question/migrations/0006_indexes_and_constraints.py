@@ -0,0 +1,123 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+from question import dedupe
+
+
+def dedupe_tags(apps, schema_editor):
+    dedupe.dedupe_tags(
+        apps.get_model("question", "Tag"),
+        apps.get_model("question", "QuestionTag"),
+        apps.get_model("tag", "UserTag"),
+    )
+
+
+def dedupe_user_questions(apps, schema_editor):
+    dedupe.dedupe_user_questions(
+        apps.get_model("question", "UserQuestion"),
+        apps.get_model("question", "Question"),
+        apps.get_model("tag", "UserTag"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("question", "0005_question_counters"),
+        ("tag", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["-created_at", "-id"],
+                name="question_active_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["-updated_at", "-id"],
+                name="question_active_updated_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["-vote", "-id"],
+                name="question_active_vote_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["-view_count", "-id"],
+                name="question_active_views_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["user", "-created_at", "-id"],
+                name="question_user_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["user", "-updated_at", "-id"],
+                name="question_user_updated_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["user", "-vote", "-id"],
+                name="question_user_vote_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["user", "-view_count", "-id"],
+                name="question_user_views_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="userquestion",
+            index=models.Index(
+                condition=models.Q(bookmark=True),
+                fields=["user", "-bookmark_at", "-id"],
+                name="userquestion_bookmark_idx",
+            ),
+        ),
+        migrations.RunPython(dedupe_tags, migrations.RunPython.noop, atomic=True),
+        migrations.AddConstraint(
+            model_name="tag",
+            constraint=models.UniqueConstraint(
+                fields=("name",), name="unique_tag_name"
+            ),
+        ),
+        migrations.RunPython(
+            dedupe_user_questions, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AddConstraint(
+            model_name="userquestion",
+            constraint=models.UniqueConstraint(
+                fields=("user", "question"), name="unique_user_question"
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.1.4 on 2026-10-18 14:02
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def copy_updated_at(apps, schema_editor):
+    Question = apps.get_model("question", "Question")
+    Question.objects.update(last_activity_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("question", "0006_indexes_and_constraints"),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name="question",
+            name="question_active_updated_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="question",
+            name="question_user_updated_idx",
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_updated_at, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["-last_activity_at", "-id"],
+                name="question_active_activity_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="question",
+            index=models.Index(
+                condition=models.Q(is_active=True),
+                fields=["user", "-last_activity_at", "-id"],
+                name="question_user_activity_idx",
+            ),
+        ),
+    ]
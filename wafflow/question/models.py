@@ -1,5 +1,107 @@
 from django.db import models
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+
+from question.constants import SEARCH_CONFIG, SEARCH_HEADLINE_MAX_WORDS
+
+
+def count_subquery(queryset, field, outer_field="pk"):
+    counted = (
+        queryset.filter(**{field: OuterRef(outer_field)})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def increment_counter(instance, field, amount=1, **values):
+    """
+    Atomically add `amount` to a denormalized counter column, mirroring the
+    change on the in-memory instance. Columns in `values` are set in the same
+    statement.
+    """
+    type(instance).objects.filter(pk=instance.pk).update(
+        **{field: F(field) + amount}, **values
+    )
+    setattr(instance, field, getattr(instance, field) + amount)
+    for name, value in values.items():
+        setattr(instance, name, value)
+
+
+def question_search_vector():
+    return SearchVector("title", weight="A", config=SEARCH_CONFIG) + SearchVector(
+        "content", weight="B", config=SEARCH_CONFIG
+    )
+
+
+class QuestionQuerySet(models.QuerySet):
+    def search(self, keywords, headline=False):
+        """
+        Match keywords against the weighted title/content search vector and
+        annotate each question with its relevance as `rank`.
+
+        ts_rank() returns a real, which Python reads back as a double; the rank
+        is cast to double precision so that a cursor holding it compares equal
+        to the rows it came from.
+        """
+        query = SearchQuery(keywords, config=SEARCH_CONFIG)
+        questions = self.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+        if headline:
+            questions = questions.annotate(
+                headline=SearchHeadline(
+                    "content",
+                    query,
+                    config=SEARCH_CONFIG,
+                    max_words=SEARCH_HEADLINE_MAX_WORDS,
+                )
+            )
+        return questions
+
+    def with_list_summary(self, viewer=None):
+        """
+        Load the author, tags and the viewer's rating/bookmark along with the
+        questions, so that serializing a page costs a fixed number of queries
+        regardless of its length.
+        """
+        if viewer is not None and viewer.is_authenticated:
+            viewer_user_questions = UserQuestion.objects.filter(user=viewer)
+        else:
+            viewer_user_questions = UserQuestion.objects.none()
+
+        return self.select_related("user__profile").prefetch_related(
+            Prefetch(
+                "question_tags",
+                queryset=QuestionTag.objects.select_related("tag"),
+            ),
+            Prefetch(
+                "user_questions",
+                queryset=viewer_user_questions,
+                to_attr="viewer_user_questions",
+            ),
+        )
 
 
 class Question(models.Model):
@@ -11,7 +113,61 @@ class Question(models.Model):
     has_accepted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Only moved by edits, answers, comments and acceptance, unlike
+    # updated_at which every full save of the row touches.
+    last_activity_at = models.DateTimeField(default=timezone.now)
     vote = models.IntegerField(default=0)
+    answer_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    bookmark_count = models.IntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = QuestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(is_active=True),
+                name="question_active_created_idx",
+            ),
+            models.Index(
+                fields=["-last_activity_at", "-id"],
+                condition=Q(is_active=True),
+                name="question_active_activity_idx",
+            ),
+            models.Index(
+                fields=["-vote", "-id"],
+                condition=Q(is_active=True),
+                name="question_active_vote_idx",
+            ),
+            models.Index(
+                fields=["-view_count", "-id"],
+                condition=Q(is_active=True),
+                name="question_active_views_idx",
+            ),
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=Q(is_active=True),
+                name="question_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "-last_activity_at", "-id"],
+                condition=Q(is_active=True),
+                name="question_user_activity_idx",
+            ),
+            models.Index(
+                fields=["user", "-vote", "-id"],
+                condition=Q(is_active=True),
+                name="question_user_vote_idx",
+            ),
+            models.Index(
+                fields=["user", "-view_count", "-id"],
+                condition=Q(is_active=True),
+                name="question_user_views_idx",
+            ),
+        ]
 
 
 class UserQuestion(models.Model):
@@ -37,11 +193,30 @@ class UserQuestion(models.Model):
     )
     bookmark_at = models.DateTimeField(null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "question"], name="unique_user_question"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-bookmark_at", "-id"],
+                condition=Q(bookmark=True),
+                name="userquestion_bookmark_idx",
+            ),
+        ]
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=20)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name"], name="unique_tag_name"),
+        ]
+
 
 class QuestionTag(models.Model):
     question = models.ForeignKey(
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from user.serializers import AuthorSerializer
+from user.author_cards import AuthorCardListSerializer, author_card
 from question.models import Question, QuestionTag, UserQuestion
 from question.constants import CONTENT_FOR_TAG_SEARCH
 
@@ -22,8 +22,8 @@ class SimpleQuestionSerializer(serializers.ModelSerializer):
 
 
 class SimpleQuestionUserSerializer(SimpleQuestionSerializer):
-    answer_count = serializers.SerializerMethodField()
-    bookmark_count = serializers.SerializerMethodField()
+    answer_count = serializers.IntegerField(read_only=True)
+    bookmark_count = serializers.IntegerField(read_only=True)
 
     class Meta(SimpleQuestionSerializer.Meta):
         fields = SimpleQuestionSerializer.Meta.fields + (
@@ -31,12 +31,6 @@ class SimpleQuestionUserSerializer(SimpleQuestionSerializer):
             "bookmark_count",
         )
 
-    def get_answer_count(self, question):
-        return question.answers.filter(is_active=True).count()
-
-    def get_bookmark_count(self, question):
-        return question.user_questions.filter(bookmark=True).count()
-
 
 class QuestionsUserSerializer(SimpleQuestionUserSerializer):
     questions = serializers.SerializerMethodField()
@@ -45,13 +39,13 @@ class QuestionsUserSerializer(SimpleQuestionUserSerializer):
         fields = ("questions",)
 
     def get_questions(self, questions):
-        return QuestionInfoSerializer(questions, many=True).data
+        return QuestionInfoSerializer(questions, many=True, context=self.context).data
 
 
 class QuestionSerializer(SimpleQuestionUserSerializer):
     author = serializers.SerializerMethodField()
     bookmarked = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
     rating = serializers.SerializerMethodField()
     tags = serializers.SerializerMethodField()
 
@@ -63,33 +57,34 @@ class QuestionSerializer(SimpleQuestionUserSerializer):
             "rating",
             "tags",
         )
+        list_serializer_class = AuthorCardListSerializer
 
     def get_author(self, question):
-        user = question.user
-        return AuthorSerializer(user).data
+        return author_card(question)
+
+    def get_user_question(self, question):
+        if hasattr(question, "viewer_user_questions"):
+            viewer_user_questions = question.viewer_user_questions
+            return viewer_user_questions[0] if viewer_user_questions else None
 
-    def get_bookmarked(self, question):
         user = None
         request = self.context.get("request")
         if request and hasattr(request, "user"):
             user = request.user
         try:
-            user_question = question.user_questions.get(user=user)
+            return question.user_questions.get(user=user)
         except UserQuestion.DoesNotExist:
+            return None
+
+    def get_bookmarked(self, question):
+        user_question = self.get_user_question(question)
+        if user_question is None:
             return False
         return user_question.bookmark
 
-    def get_comment_count(self, question):
-        return question.comments.filter(is_active=True).count()
-
     def get_rating(self, question):
-        user = None
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-        try:
-            user_question = question.user_questions.get(user=user)
-        except UserQuestion.DoesNotExist:
+        user_question = self.get_user_question(question)
+        if user_question is None:
             return 0
         return user_question.rating
 
@@ -119,7 +114,31 @@ class QuestionsTagSearchSerializer(SimpleQuestionTagSearchSerializer):
         fields = ("questions",)
 
     def get_questions(self, questions):
-        return SimpleQuestionTagSearchSerializer(questions, many=True).data
+        return SimpleQuestionTagSearchSerializer(
+            questions, many=True, context=self.context
+        ).data
+
+
+class SimpleQuestionKeywordsSearchSerializer(SimpleQuestionTagSearchSerializer):
+    headline = serializers.SerializerMethodField()
+
+    class Meta(SimpleQuestionTagSearchSerializer.Meta):
+        fields = SimpleQuestionTagSearchSerializer.Meta.fields + ("headline",)
+
+    def get_headline(self, question):
+        return getattr(question, "headline", None)
+
+
+class QuestionsKeywordsSearchSerializer(SimpleQuestionKeywordsSearchSerializer):
+    questions = serializers.SerializerMethodField()
+
+    class Meta(SimpleQuestionKeywordsSearchSerializer.Meta):
+        fields = ("questions",)
+
+    def get_questions(self, questions):
+        return SimpleQuestionKeywordsSearchSerializer(
+            questions, many=True, context=self.context
+        ).data
 
 
 class QuestionProduceSerializer(serializers.ModelSerializer):
@@ -135,7 +154,21 @@ class QuestionProduceSerializer(serializers.ModelSerializer):
         return Question.objects.create(**validated_data, user=user)
 
 
-class QuestionEditSerializer(serializers.ModelSerializer):
+class EditSerializer(serializers.ModelSerializer):
+    """
+    Saves an edit by updating only the edited columns, the ones passed to
+    save() and updated_at. Writing the whole row would put back the votes and
+    counters other requests have since changed with F() expressions.
+    """
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+class QuestionEditSerializer(EditSerializer):
     class Meta:
         model = Question
         fields = (
@@ -1,15 +1,29 @@
 from django.contrib.auth.models import User
-from django.db import transaction
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.authtoken.models import Token
 from rest_framework import status
 
 from answer.models import Answer, UserAnswer
 from comment.models import Comment
+from question.dedupe import dedupe_tags, dedupe_user_questions, dedupe_user_tags
 from question.models import Question, UserQuestion, Tag, QuestionTag
+from question.serializers import QuestionEditSerializer
+from question.view_counts import view_counts
+from tag.models import UserTag
 from user.models import UserProfile
 
 import json
+import tempfile
+import time
+from io import StringIO
 
 
 class QuestionTestSetting(TestCase):
@@ -83,6 +97,9 @@ class QuestionTestSetting(TestCase):
             content="I don't know3",
         )
 
+    def reconcile_counters(self):
+        call_command("reconcile_counters", stdout=StringIO())
+
     def check_db_count(self, **kwargs):
         user_count = kwargs.get("user_count", 3)
         user_profile_count = kwargs.get("user_profile_count", 3)
@@ -176,6 +193,7 @@ class GetQuestionQuestionIdTestCase(QuestionInfoTestCase):
                 question=question,
                 content="b" * (loop_count + 1),
             )
+        self.reconcile_counters()
 
         response = self.client.get(f"/api/question/{question.id}/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -192,6 +210,7 @@ class GetQuestionQuestionIdTestCase(QuestionInfoTestCase):
 
         comment.is_active = False
         comment.save()
+        self.reconcile_counters()
 
         response = self.client.get(f"/api/question/{question.id}/")
         data = response.json()
@@ -244,6 +263,28 @@ class GetQuestionQuestionIdTestCase(QuestionInfoTestCase):
         self.assertEqual(UserQuestion.objects.all().count(), 2)
         self.check_db_count(user_question_count=2)
 
+    @override_settings(QUESTION_VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_get_question_question_id_buffered_view_count(self):
+        question = Question.objects.get(title="hello1")
+        updated_at = question.updated_at
+
+        for view_count in range(1, 4):
+            response = self.client.get(f"/api/question/{question.id}/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["view_count"], view_count)
+
+        question.refresh_from_db()
+        self.assertEqual(question.view_count, 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(view_counts.flush(), 0)
+
+        question.refresh_from_db()
+        self.assertEqual(question.view_count, 3)
+        self.assertEqual(question.updated_at, updated_at)
+
 
 class GetQuestionUserUserIDTestCase(QuestionInfoTestCase):
     client = Client()
@@ -290,11 +331,11 @@ class GetQuestionUserUserIDTestCase(QuestionInfoTestCase):
             self.assertEqual(data["questions"][0]["vote"], data["questions"][1]["vote"])
             question1 = data["questions"][0]
 
-            for question in data["questions"]:
+            for position, question in enumerate(data["questions"]):
                 self.assert_in_question_info(question)
                 self.assertEqual(question["vote"], 0)
                 question_change_vote = Question.objects.get(id=question["id"])
-                question_change_vote.vote = question["id"]
+                question_change_vote.vote = position
                 question_change_vote.save()
 
             response = self.client.get(
@@ -323,6 +364,7 @@ class GetQuestionUserUserIDTestCase(QuestionInfoTestCase):
 
             question_change_acivity = Question.objects.get(id=question2["id"])
             question_change_acivity.vote = 333
+            question_change_acivity.last_activity_at = timezone.now()
             question_change_acivity.save()
 
             response = self.client.get(
@@ -451,11 +493,11 @@ class GetQuestionTagsCase(QuestionInfoTestCase):
             self.assertEqual(data["questions"][0]["vote"], data["questions"][1]["vote"])
             question1 = data["questions"][0]
 
-            for question in data["questions"]:
+            for position, question in enumerate(data["questions"]):
                 self.assert_in_question_info(question)
                 self.assertEqual(question["vote"], 0)
                 question_change_vote = Question.objects.get(id=question["id"])
-                question_change_vote.vote = question["id"]
+                question_change_vote.vote = position
                 question_change_vote.save()
 
             response = self.client.get(
@@ -502,6 +544,7 @@ class GetQuestionTagsCase(QuestionInfoTestCase):
 
             question_change_acivity = Question.objects.get(id=question2["id"])
             question_change_acivity.vote = 333
+            question_change_acivity.last_activity_at = timezone.now()
             question_change_acivity.save()
 
             response = self.client.get(
@@ -541,6 +584,7 @@ class GetQuestionTagsCase(QuestionInfoTestCase):
                 question=question,
                 user=self.kyh1,
             )
+            self.reconcile_counters()
             answer_count += 1
 
         response = self.client.get(
@@ -586,6 +630,159 @@ class GetQuestionTagsCase(QuestionInfoTestCase):
             if data.get("questions"):
                 self.assertEqual(len(data["questions"]), 1)
 
+    def test_get_question_tags_query_count(self):
+        question2 = Question.objects.get(title="hello2")
+        UserQuestion.objects.create(
+            rating=1, bookmark=True, question=question2, user=self.kyh1
+        )
+        for loop_count in range(3):
+            Answer.objects.create(content="I know", question=question2, user=self.kyh3)
+            Comment.objects.create(
+                user=self.kyh3,
+                type=Comment.QUESTION,
+                question=question2,
+                content="b" * (loop_count + 1),
+            )
+        self.reconcile_counters()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f"/api/question/tagged/?tags=&sorted_by=newest&page=1",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                f"/api/question/tagged/?tags=&sorted_by=newest&page=1",
+                HTTP_AUTHORIZATION=self.kyh1_token,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(len(data["questions"]), 3)
+        question = next(
+            question for question in data["questions"] if question["id"] == question2.id
+        )
+        self.assert_in_question_info(question)
+        self.assertEqual(question["answer_count"], 3)
+        self.assertEqual(question["comment_count"], 3)
+        self.assertEqual(question["bookmark_count"], 1)
+        self.assertEqual(question["bookmarked"], True)
+        self.assertEqual(question["rating"], 1)
+        self.assertEqual(len(question["tags"]), 3)
+        self.assertEqual(question["author"]["nickname"], "yh2")
+
+    def test_get_question_tags_cursor(self):
+        for loop_count in range(40):
+            Question.objects.create(
+                user=self.kyh3,
+                title=f"bulk{loop_count}",
+                content="I don't know",
+                vote=loop_count % 4,
+            )
+
+        question_ids = []
+        cursor = ""
+        with CaptureQueriesContext(connection) as queries:
+            while cursor is not None:
+                response = self.client.get(
+                    f"/api/question/tagged/?tags=&sorted_by=most_votes&cursor={cursor}",
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                data = response.json()
+                self.assertLessEqual(len(data["questions"]), 30)
+                question_ids += [question["id"] for question in data["questions"]]
+                cursor = data["next_cursor"]
+
+        self.assertFalse(
+            any("COUNT(*)" in query["sql"] for query in queries.captured_queries)
+        )
+        self.assertEqual(
+            question_ids,
+            list(
+                Question.objects.filter(is_active=True)
+                .order_by("-vote", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=&sorted_by=most_votes&cursor=invalid",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=&sorted_by=newest&cursor=",
+        )
+        cursor = response.json()["next_cursor"]
+        response = self.client.get(
+            f"/api/question/tagged/?tags=&sorted_by=most_votes&cursor={cursor}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_question_tags_match(self):
+        question1 = Question.objects.get(title="hello1")
+        question2 = Question.objects.get(title="hello2")
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=python+react&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [question2.id, question1.id],
+        )
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github+python&match=all&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]], [question1.id]
+        )
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github+typescript&match=all&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["questions"], [])
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github&match=some&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_question_tags_user(self):
+        question1 = Question.objects.get(title="hello1")
+        question2 = Question.objects.get(title="hello2")
+        for loop_count in range(2):
+            Answer.objects.create(content="I know", question=question2, user=self.kyh1)
+        Answer.objects.create(
+            content="I know", question=question2, user=self.kyh3, is_active=False
+        )
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github&user={self.kyh1.id}&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [question2.id, question1.id],
+        )
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github&user={self.kyh3.id}&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["questions"], [])
+
+        response = self.client.get(
+            f"/api/question/tagged/?tags=github&user=-1&sorted_by=newest&page=1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class GetQuestionSearchKeywordsCase(QuestionInfoTestCase):
     client = Client()
@@ -689,11 +886,11 @@ class GetQuestionSearchKeywordsCase(QuestionInfoTestCase):
             self.assertEqual(data["questions"][0]["vote"], data["questions"][1]["vote"])
             question1 = data["questions"][0]
 
-            for question in data["questions"]:
+            for position, question in enumerate(data["questions"]):
                 self.assert_in_question_info(question)
                 self.assertEqual(question["vote"], 0)
                 question_change_vote = Question.objects.get(id=question["id"])
-                question_change_vote.vote = question["id"]
+                question_change_vote.vote = position
                 question_change_vote.save()
 
             response = self.client.get(
@@ -742,6 +939,7 @@ class GetQuestionSearchKeywordsCase(QuestionInfoTestCase):
 
             question_change_acivity = Question.objects.get(id=question2["id"])
             question_change_acivity.vote = 333
+            question_change_acivity.last_activity_at = timezone.now()
             question_change_acivity.save()
 
             response = self.client.get(
@@ -784,6 +982,7 @@ class GetQuestionSearchKeywordsCase(QuestionInfoTestCase):
                 question=question,
                 user=self.kyh1,
             )
+            self.reconcile_counters()
             answer_count += 1
 
             response = self.client.get(
@@ -830,6 +1029,144 @@ class GetQuestionSearchKeywordsCase(QuestionInfoTestCase):
                 self.assertEqual(len(data["questions"]), 1)
 
 
+class GetQuestionFullTextSearchCase(QuestionInfoTestCase):
+    client = Client()
+
+    def setUp(self):
+        self.set_up_users()
+        self.title_question = Question.objects.create(
+            user=self.kyh1,
+            title="How do I migrate postgres tables",
+            content="I am stuck",
+        )
+        self.content_question = Question.objects.create(
+            user=self.kyh2,
+            title="Database question",
+            content="My postgres server refuses to start after the upgrade",
+        )
+        Question.objects.create(
+            user=self.kyh3,
+            title="Unrelated",
+            content="Nothing about databases here",
+        )
+
+    def search(self, keywords, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return self.client.get(
+            f"/api/question/search/keywords/?keywords={keywords}&page=1&{query}"
+        )
+
+    def test_get_question_keywords_ranked_by_relevance(self):
+        response = self.search("postgres", sorted_by="relevance")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.title_question.id, self.content_question.id],
+        )
+        for question in data["questions"]:
+            self.assert_in_question_info(question)
+            self.assertIsNone(question["headline"])
+
+    def test_get_question_keywords_relevance_cursor(self):
+        for loop_count in range(36):
+            Question.objects.create(
+                user=self.kyh3,
+                title="postgres " * (loop_count % 3 + 1),
+                content="tied ranks",
+            )
+
+        question_ids = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(
+                "/api/question/search/keywords/?keywords=postgres"
+                f"&sorted_by=relevance&cursor={cursor}"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.json()
+            question_ids += [question["id"] for question in data["questions"]]
+            cursor = data["next_cursor"]
+
+        self.assertEqual(
+            question_ids,
+            list(
+                Question.objects.search("postgres")
+                .order_by("-rank", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+        self.assertEqual(len(question_ids), 38)
+
+    def test_get_question_keywords_stemmed_and_combined(self):
+        response = self.search("servers+starting", sorted_by="newest")
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.content_question.id],
+        )
+
+        response = self.search("postgres+migrate", sorted_by="newest")
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.title_question.id],
+        )
+
+    def test_get_question_keywords_headline(self):
+        response = self.search("server", sorted_by="relevance", headline="true")
+        data = response.json()
+        self.assertEqual(len(data["questions"]), 1)
+        self.assertIn("<b>server</b>", data["questions"][0]["headline"])
+
+    def test_get_question_keywords_filter_by_no_answer(self):
+        Answer.objects.create(
+            content="Check the logs", question=self.content_question, user=self.kyh1
+        )
+        self.reconcile_counters()
+        response = self.search("postgres", sorted_by="relevance", filter_by="no_answer")
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.title_question.id],
+        )
+
+    def test_get_question_keywords_after_edit(self):
+        self.content_question.content = "My mysql server refuses to start"
+        self.content_question.save()
+
+        response = self.search("postgres", sorted_by="relevance")
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.title_question.id],
+        )
+
+    def test_update_search_vectors_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(
+                "ALTER TABLE question_question "
+                "DISABLE TRIGGER question_question_search_vector_update"
+            )
+            Question.objects.update(search_vector=None)
+            cursor.execute(
+                "ALTER TABLE question_question "
+                "ENABLE TRIGGER question_question_search_vector_update"
+            )
+        response = self.search("postgres", sorted_by="relevance")
+        self.assertEqual(response.json()["questions"], [])
+
+        call_command("update_search_vectors", "--batch-size", "2", stdout=StringIO())
+
+        response = self.search("postgres", sorted_by="relevance")
+        data = response.json()
+        self.assertEqual(
+            [question["id"] for question in data["questions"]],
+            [self.title_question.id, self.content_question.id],
+        )
+
+
 class PostQuestionTestCase(QuestionInfoTestCase):
     client = Client()
 
@@ -949,6 +1286,27 @@ class PutQuestionTestCase(QuestionInfoTestCase):
         self.set_up_users()
         self.set_up_questions()
 
+    def test_put_question_keeps_concurrent_counters(self):
+        question = Question.objects.first()
+        # Written by other requests after the edit loaded the question.
+        Question.objects.filter(pk=question.pk).update(
+            vote=F("vote") + 3, answer_count=F("answer_count") + 1
+        )
+
+        serializer = QuestionEditSerializer(
+            question, data={"title": "edited"}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save(last_activity_at=timezone.now())
+
+        self.assertEqual(len(queries), 1)
+        edited = Question.objects.get(pk=question.pk)
+        self.assertEqual(edited.title, "edited")
+        self.assertEqual(edited.vote, question.vote + 3)
+        self.assertEqual(edited.answer_count, question.answer_count + 1)
+        self.assertEqual(edited.last_activity_at, question.last_activity_at)
+
     def test_put_question_invalid_request(self):
         response = self.client.put(
             f"/api/question/-1/",
@@ -1084,3 +1442,426 @@ class PutQuestionTestCase(QuestionInfoTestCase):
             [data["title"], data["content"]], ["hello4", "I don't know4"]
         )
         self.check_db_count()
+
+
+@override_settings(
+    RESPONSE_CACHE_TIMEOUTS={"question": 60, "answers": 60, "comments": 60, "tags": 60}
+)
+class ResponseCacheTestCase(QuestionInfoTestCase):
+    client = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.set_up_users()
+        self.set_up_questions()
+
+    def test_cache_question_anonymous(self):
+        question = Question.objects.get(title="hello2")
+
+        response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(cached_response.json(), response.json())
+        self.assertEqual(len(queries), 1)
+
+        question.refresh_from_db()
+        self.assertEqual(question.view_count, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/question/{question.id}/", HTTP_AUTHORIZATION=self.kyh1_token
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(queries), 1)
+
+    def test_cache_question_invalidated_by_rate(self):
+        question = Question.objects.get(title="hello2")
+
+        response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(response.json()["vote"], 0)
+
+        response = self.client.put(
+            f"/api/rate/question/{question.id}/",
+            json.dumps({"rating": 1}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(response.json()["vote"], 1)
+
+    def test_cache_answers_and_comments_invalidated_by_writes(self):
+        question = Question.objects.get(title="hello2")
+
+        response = self.client.get(
+            f"/api/answer/question/{question.id}/?sorted_by=votes&page=1"
+        )
+        self.assertEqual(len(response.json()["answers"]), 0)
+        response = self.client.get(f"/api/comment/question/{question.id}/?page=1")
+        self.assertEqual(len(response.json()["comments"]), 0)
+
+        response = self.client.post(
+            f"/api/answer/question/{question.id}/",
+            json.dumps({"content": "world"}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        answer_id = response.json()["id"]
+        response = self.client.post(
+            f"/api/comment/question/{question.id}/",
+            json.dumps({"content": "comment"}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            f"/api/answer/question/{question.id}/?sorted_by=votes&page=1"
+        )
+        answers = response.json()["answers"]
+        self.assertEqual(len(answers), 1)
+        self.assertEqual(answers[0]["comment_count"], 0)
+        response = self.client.get(f"/api/comment/question/{question.id}/?page=1")
+        self.assertEqual(len(response.json()["comments"]), 1)
+        response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(response.json()["comment_count"], 1)
+
+        response = self.client.get(f"/api/comment/answer/{answer_id}/?page=1")
+        self.assertEqual(len(response.json()["comments"]), 0)
+        response = self.client.post(
+            f"/api/comment/answer/{answer_id}/",
+            json.dumps({"content": "comment"}),
+            HTTP_AUTHORIZATION=self.kyh2_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(f"/api/comment/answer/{answer_id}/?page=1")
+        self.assertEqual(len(response.json()["comments"]), 1)
+        response = self.client.get(
+            f"/api/answer/question/{question.id}/?sorted_by=votes&page=1"
+        )
+        self.assertEqual(response.json()["answers"][0]["comment_count"], 1)
+
+    def test_cache_tags_invalidated_by_question(self):
+        response = self.client.get("/api/tags/?sorted_by=name&page=1")
+        self.assertEqual(len(response.json()["tags"]), 5)
+
+        response = self.client.post(
+            "/api/question/",
+            json.dumps(
+                {"title": "hello4", "content": "I don't know4", "tags": ["rust"]}
+            ),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get("/api/tags/?sorted_by=name&page=1")
+        self.assertEqual(len(response.json()["tags"]), 6)
+
+
+class ConditionalGetTestCase(QuestionInfoTestCase):
+    client = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.set_up_users()
+        self.set_up_questions()
+
+    def test_get_question_conditional(self):
+        question = Question.objects.get(title="hello2")
+
+        response = self.client.get(f"/api/question/{question.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/question/{question.id}/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(len(queries), 2)
+
+        # Votes and counters touch no timestamp, so dates never validate.
+        response = self.client.get(
+            f"/api/question/{question.id}/",
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        question.refresh_from_db()
+        self.assertEqual(question.view_count, 3)
+
+        response = self.client.get(
+            f"/api/question/{question.id}/",
+            HTTP_IF_NONE_MATCH=etag,
+            HTTP_AUTHORIZATION=self.kyh1_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_etag = response["ETag"]
+
+        self.client.put(
+            f"/api/rate/question/{question.id}/",
+            json.dumps({"rating": 1}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+
+        response = self.client.get(
+            f"/api/question/{question.id}/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["vote"], 1)
+
+        response = self.client.get(
+            f"/api/question/{question.id}/",
+            HTTP_IF_NONE_MATCH=user_etag,
+            HTTP_AUTHORIZATION=self.kyh1_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["rating"], 1)
+
+        response = self.client.get("/api/question/99999/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUTS={"question": 60})
+    def test_get_question_conditional_cached(self):
+        question = Question.objects.get(title="hello2")
+
+        response = self.client.get(f"/api/question/{question.id}/")
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/question/{question.id}/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 1)
+
+    def test_get_answers_and_comments_conditional(self):
+        question = Question.objects.get(title="hello2")
+        urls = (
+            f"/api/answer/question/{question.id}/?sorted_by=votes&page=1",
+            f"/api/comment/question/{question.id}/?page=1",
+        )
+        etags = [self.client.get(url)["ETag"] for url in urls]
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        invalid_urls = (
+            f"/api/answer/question/{question.id}/?sorted_by=invalid&page=1",
+            f"/api/answer/question/{question.id}/?sorted_by=votes&page=0",
+            f"/api/comment/question/{question.id}/?cursor=invalid",
+        )
+        for url, etag in zip(invalid_urls, etags + etags[1:]):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            f"/api/answer/question/{question.id}/",
+            json.dumps({"content": "world"}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        answer_id = response.json()["id"]
+        self.client.post(
+            f"/api/comment/question/{question.id}/",
+            json.dumps({"content": "comment"}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        url = f"/api/comment/answer/{answer_id}/?page=1"
+        etag = self.client.get(url)["ETag"]
+        self.client.post(
+            f"/api/comment/answer/{answer_id}/",
+            json.dumps({"content": "comment"}),
+            HTTP_AUTHORIZATION=self.kyh2_token,
+            content_type="application/json",
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["comments"]), 1)
+
+
+class LastActivityTestCase(QuestionTestSetting):
+    client = Client()
+
+    def setUp(self):
+        self.set_up_users()
+        self.old = Question.objects.create(user=self.kyh1, title="old", content="old")
+        self.new = Question.objects.create(user=self.kyh1, title="new", content="new")
+
+    def get_recent_activity(self):
+        response = self.client.get(
+            "/api/question/tagged/?sorted_by=recent_activity&page=1"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [question["id"] for question in response.json()["questions"]]
+
+    def test_votes_and_views_leave_activity_alone(self):
+        response = self.client.put(
+            f"/api/rate/question/{self.old.id}/",
+            {"rating": 1},
+            HTTP_AUTHORIZATION=self.kyh2_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.get(f"/api/question/{self.old.id}/")
+        self.assertEqual(self.get_recent_activity(), [self.new.id, self.old.id])
+
+    def test_comments_and_answers_are_activity(self):
+        response = self.client.post(
+            f"/api/comment/question/{self.old.id}/",
+            {"content": "comment"},
+            HTTP_AUTHORIZATION=self.kyh2_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.get_recent_activity(), [self.old.id, self.new.id])
+
+        response = self.client.post(
+            f"/api/answer/question/{self.new.id}/",
+            {"content": "answer"},
+            HTTP_AUTHORIZATION=self.kyh2_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.get_recent_activity(), [self.new.id, self.old.id])
+
+
+class DedupeTestCase(QuestionTestSetting):
+    CONSTRAINTS = (
+        ("question_tag", "unique_tag_name", "name"),
+        ("question_userquestion", "unique_user_question", "user_id, question_id"),
+        ("tag_usertag", "unique_user_tag", "user_id, tag_id"),
+    )
+
+    def setUp(self):
+        self.set_up_users()
+        self.set_up_questions()
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            for table, constraint, columns in self.CONSTRAINTS:
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+
+    def add_constraints(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            for table, constraint, columns in self.CONSTRAINTS:
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+                    f"UNIQUE ({columns})"
+                )
+
+    def test_dedupe(self):
+        question = Question.objects.get(title="hello2")
+        github = Tag.objects.get(name="github")
+        UserTag.objects.create(user=self.kyh2, tag=github, score=2)
+        duplicate_github = Tag.objects.create(name="github")
+        QuestionTag.objects.create(question=question, tag=duplicate_github)
+        UserTag.objects.create(user=self.kyh2, tag=duplicate_github, score=1)
+
+        UserQuestion.objects.create(
+            user=self.kyh1, question=question, rating=1, bookmark=True
+        )
+        UserQuestion.objects.create(user=self.kyh1, question=question, rating=1)
+        question.vote = 2
+        question.save()
+        self.reconcile_counters()
+
+        self.assertEqual(dedupe_tags(Tag, QuestionTag, UserTag), 1)
+        dedupe_user_questions(UserQuestion, Question, UserTag)
+        self.assertEqual(dedupe_user_tags(UserTag), 0)
+        self.add_constraints()
+
+        self.assertEqual(Tag.objects.filter(name="github").count(), 1)
+        self.assertEqual(QuestionTag.objects.filter(question=question).count(), 3)
+        user_tag = UserTag.objects.get(user=self.kyh2, tag=github)
+        self.assertEqual(user_tag.score, 2)
+
+        user_question = UserQuestion.objects.get(user=self.kyh1, question=question)
+        self.assertEqual(user_question.rating, 1)
+        self.assertTrue(user_question.bookmark)
+        question.refresh_from_db()
+        self.assertEqual(question.vote, 1)
+        self.assertEqual(question.bookmark_count, 1)
+
+
+class CheckCountersTestCase(QuestionTestSetting):
+    def setUp(self):
+        self.set_up_users()
+        self.set_up_questions()
+        call_command("rebuild_tag_statistics", stdout=StringIO())
+        self.reconcile_counters()
+
+    def test_check_counters(self):
+        stdout = StringIO()
+        call_command("check_counters", stdout=stdout)
+        self.assertIn("question.Question.answer_count: 0 mismatched", stdout.getvalue())
+
+        Question.objects.filter(title="hello1").update(answer_count=5)
+        stdout = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("check_counters", stdout=stdout)
+        self.assertIn("question.Question.answer_count: 1 mismatched", stdout.getvalue())
+
+        self.reconcile_counters()
+        call_command("check_counters", stdout=StringIO())
+
+
+class BenchmarkTestCase(TestCase):
+    def test_seed_data_and_benchmark(self):
+        call_command(
+            "seed_data",
+            users=20,
+            questions=30,
+            answers=60,
+            comments=60,
+            tags=10,
+            votes=200,
+            seed=1,
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Question.objects.count(), 30)
+        self.assertEqual(Answer.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 60)
+        for question in Question.objects.all()[:5]:
+            self.assertEqual(
+                question.vote,
+                sum(question.user_questions.values_list("rating", flat=True)),
+            )
+            self.assertEqual(question.answer_count, question.answers.count())
+        self.assertFalse(
+            Answer.objects.filter(created_at__lt=F("question__created_at")).exists()
+        )
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "benchmark_endpoints",
+                iterations=2,
+                warmup=0,
+                output=output.name,
+                stdout=StringIO(),
+            )
+            report = json.load(output)
+
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(report["iterations"], 2)
+        for name, endpoint in report["endpoints"].items():
+            self.assertIn(endpoint["status"][0], (200, 201), name)
+            self.assertGreater(endpoint["queries"], 0, name)
+            self.assertLessEqual(endpoint["p50_ms"], endpoint["p95_ms"], name)
+        self.assertIn("GET question.detail", report["endpoints"])
+        self.assertIn("PUT rate.question", report["endpoints"])
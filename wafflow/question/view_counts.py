@@ -0,0 +1,119 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+
+from question.models import Question
+
+logger = logging.getLogger(__name__)
+
+DRAIN_FLUSH = "flush"
+DRAIN_DISCARD = "discard"
+
+
+class ViewCountBuffer:
+    """
+    Collects question views in process memory and writes them back as
+    batched `view_count = view_count + n` updates, so reading a question
+    does not rewrite its row.
+
+    QUESTION_VIEW_COUNT_FLUSH_INTERVAL is the number of seconds between
+    background flushes; zero or less writes every view through immediately.
+    QUESTION_VIEW_COUNT_DRAIN decides whether pending views are flushed or
+    discarded when the process exits.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.thread = None
+        self.stopped = threading.Event()
+
+    @property
+    def interval(self):
+        return getattr(settings, "QUESTION_VIEW_COUNT_FLUSH_INTERVAL", 10)
+
+    @property
+    def drain(self):
+        return getattr(settings, "QUESTION_VIEW_COUNT_DRAIN", DRAIN_FLUSH)
+
+    def add(self, question_id):
+        """
+        Record a view and return the number of views of the question that
+        had not been written when it was loaded, including this one.
+        """
+        with self.lock:
+            pending = self.counts.get(question_id, 0) + 1
+            self.counts[question_id] = pending
+
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self.start()
+        return pending
+
+    def flush(self):
+        """
+        Write the buffered views with one UPDATE per distinct increment and
+        return the number of questions touched.
+        """
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        if not counts:
+            return 0
+
+        question_ids_by_amount = defaultdict(list)
+        for question_id, amount in counts.items():
+            question_ids_by_amount[amount].append(question_id)
+
+        try:
+            for amount, question_ids in question_ids_by_amount.items():
+                Question.objects.filter(pk__in=question_ids).update(
+                    view_count=F("view_count") + amount
+                )
+        except Exception:
+            self.restore(counts)
+            raise
+        return len(counts)
+
+    def restore(self, counts):
+        with self.lock:
+            for question_id, amount in counts.items():
+                self.counts[question_id] = self.counts.get(question_id, 0) + amount
+
+    def start(self):
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(
+                target=self.run, name="question-view-counts", daemon=True
+            )
+            self.thread.start()
+        atexit.register(self.shutdown)
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Failed to flush question view counts")
+        finally:
+            connection.close()
+
+    def shutdown(self):
+        self.stopped.set()
+        if self.drain == DRAIN_FLUSH:
+            self.flush()
+        else:
+            with self.lock:
+                self.counts = {}
+
+
+view_counts = ViewCountBuffer()
@@ -1,17 +1,33 @@
-import operator
+import base64
+import binascii
+import json
+from datetime import datetime
 from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.paginator import Paginator, EmptyPage
 from django.db import transaction
-from django.db.models import Q
-from functools import reduce
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Q,
+    prefetch_related_objects,
+)
+from django.db.models.expressions import OrderBy
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from answer.models import Answer
 from question.constants import *
-from tag.models import UserTag
-from question.models import Question, Tag, QuestionTag
+from tag.attach import attach_tags
+from question.models import Question, QuestionTag
+from question.cache import cache_response, invalidate_responses, question_scope
+from question.conditional import conditional_response, question_validators
+from question.view_counts import view_counts
 from question.serializers import (
     QuestionSerializer,
     QuestionEditSerializer,
@@ -19,9 +35,14 @@ from question.serializers import (
     QuestionProduceSerializer,
     QuestionsUserSerializer,
     QuestionsTagSearchSerializer,
+    QuestionsKeywordsSearchSerializer,
 )
 
 
+def record_view(request, pk):
+    view_counts.add(int(pk))
+
+
 class QuestionViewSet(viewsets.GenericViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
@@ -45,7 +66,6 @@ class QuestionViewSet(viewsets.GenericViewSet):
             return QuestionInfoSerializer
 
     def create(self, request):
-        user = request.user
         data = request.data.copy()
 
         with transaction.atomic():
@@ -53,14 +73,9 @@ class QuestionViewSet(viewsets.GenericViewSet):
             question_serializer.is_valid(raise_exception=True)
             question = question_serializer.save()
 
-            tags = data.get("tags")
-            if tags:
-                for tag in tags:
-                    tag, created = Tag.objects.get_or_create(name=tag)
-                    QuestionTag.objects.create(question=question, tag=tag)
-                    user_tag, created = UserTag.objects.get_or_create(
-                        tag=tag, user=user
-                    )
+            attach_tags(question, data.get("tags"))
+        invalidate_responses("tags")
+        prefetch_related_objects([question], "question_tags__tag")
 
         return Response(
             QuestionInfoSerializer(
@@ -69,6 +84,8 @@ class QuestionViewSet(viewsets.GenericViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @cache_response("question", "question", on_hit=record_view)
+    @conditional_response(question_validators, on_not_modified=record_view)
     def retrieve(self, request, pk=None):
         try:
             question = Question.objects.get(pk=pk, is_active=True)
@@ -77,8 +94,7 @@ class QuestionViewSet(viewsets.GenericViewSet):
                 {"error": "There is no question with the given ID"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        question.view_count += 1
-        question.save()
+        question.view_count += view_counts.add(question.pk)
         if request.user.is_authenticated:
             return Response(
                 self.get_serializer(
@@ -113,7 +129,8 @@ class QuestionViewSet(viewsets.GenericViewSet):
 
         serializer = self.get_serializer(question, data=data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(last_activity_at=timezone.now())
+        invalidate_responses(question_scope(question.id))
 
         return Response(
             QuestionInfoSerializer(question, context=self.get_serializer_context()).data
@@ -123,36 +140,37 @@ class QuestionViewSet(viewsets.GenericViewSet):
     def tagged(self, request):
         tags = request.query_params.get("tags")
         user_id = request.query_params.get("user")
-        tags = tags.split(" ") if tags else None
-        if not tags:
-            questions = Question.objects.filter(is_active=True)
-        else:
-            tags = Tag.objects.filter(name__in=tags).all()
-            question_tags = [tag.question_tags.all() for tag in tags]
-            questions_id = list(
-                set(
-                    [
-                        question.question_id
-                        for question_tag in question_tags
-                        for question in question_tag
-                    ]
-                )
+        match = request.query_params.get("match", ANY_TAGS)
+        if match not in (ALL_TAGS, ANY_TAGS):
+            return Response(
+                {"error": "Invalid match."}, status=status.HTTP_400_BAD_REQUEST
             )
-            if user_id is None:
-                questions = Question.objects.filter(
-                    is_active=True, id__in=questions_id
-                ).all()
-            else:
-                try:
-                    user = User.objects.get(pk=int(user_id), is_active=True)
-                except (User.DoesNotExist, ValueError):
-                    return Response(
-                        {"error": "There is no user with the given id"},
-                        status=status.HTTP_404_NOT_FOUND,
+
+        questions = Question.objects.with_list_summary(request.user).filter(
+            is_active=True
+        )
+        tags = set(tags.split()) if tags else None
+        if tags:
+            questions = filter_tagged_questions(questions, tags, match)
+
+        if user_id is not None:
+            try:
+                user = User.objects.get(pk=int(user_id), is_active=True)
+            except (User.DoesNotExist, ValueError):
+                return Response(
+                    {"error": "There is no user with the given id"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            questions = questions.filter(
+                Q(user=user)
+                | Q(
+                    Exists(
+                        Answer.objects.filter(
+                            question=OuterRef("pk"), user=user, is_active=True
+                        )
                     )
-                questions = Question.objects.filter(
-                    is_active=True, id__in=questions_id
-                ).filter(Q(user=user) | Q(answers__user=user, answers__is_active=True))
+                )
+            )
 
         filtered_questions = filter_questions(request, questions)
         if filtered_questions is None:
@@ -172,40 +190,39 @@ class QuestionViewSet(viewsets.GenericViewSet):
                 {"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST
             )
         return Response(
-            self.get_serializer(
-                paginated_questions, context=self.get_serializer_context()
-            ).data
+            add_next_cursor(
+                self.get_serializer(
+                    paginated_questions, context=self.get_serializer_context()
+                ).data,
+                paginated_questions,
+            )
         )
 
 
 class QuestionKeywordsViewSet(viewsets.GenericViewSet):
     queryset = Question.objects.all()
-    serializer_class = QuestionsTagSearchSerializer
+    serializer_class = QuestionsKeywordsSearchSerializer
 
     def list(self, request):
         keywords = request.query_params.get("keywords")
-        filter_by = request.query_params.get("filter_by")
+        headline = request.query_params.get("headline") in ("true", "True", "TRUE")
 
-        keywords = keywords.split(" ") if keywords else None
-        if not keywords:
-            questions = Question.objects.filter(is_active=True)
-        else:
-            questions = Question.objects.filter(
-                reduce(
-                    operator.and_,
-                    (
-                        Q(content__icontains=keyword, is_active=True)
-                        for keyword in keywords
-                    ),
-                )
-            )
+        keywords = keywords.strip() if keywords else None
+        questions = Question.objects.with_list_summary(request.user).filter(
+            is_active=True
+        )
+        if keywords:
+            questions = questions.search(keywords, headline=headline)
 
         filtered_questions = filter_questions(request, questions)
         if filtered_questions is None:
             return Response(
                 {"error": "Invalid filter_by."}, status=status.HTTP_400_BAD_REQUEST
             )
-        sorted_questions = sort_questions(request, filtered_questions)
+        if keywords and request.query_params.get("sorted_by") == RELEVANCE:
+            sorted_questions = filtered_questions.order_by("-rank", "-id")
+        else:
+            sorted_questions = sort_questions(request, filtered_questions)
         if sorted_questions is None:
             return Response(
                 {"error": "Invalid sorted_by."}, status=status.HTTP_400_BAD_REQUEST
@@ -218,9 +235,12 @@ class QuestionKeywordsViewSet(viewsets.GenericViewSet):
                 {"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST
             )
         return Response(
-            self.get_serializer(
-                paginated_questions, context=self.get_serializer_context()
-            ).data
+            add_next_cursor(
+                self.get_serializer(
+                    paginated_questions, context=self.get_serializer_context()
+                ).data,
+                paginated_questions,
+            )
         )
 
 
@@ -239,7 +259,9 @@ class QuestionUserViewSet(viewsets.GenericViewSet):
                 {"message": "There is no user with the given ID"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        questions = Question.objects.filter(user=user, is_active=True)
+        questions = Question.objects.with_list_summary(request.user).filter(
+            user=user, is_active=True
+        )
 
         sorted_user_questions = sort_user_questions(request, questions)
         if sorted_user_questions is None:
@@ -254,10 +276,28 @@ class QuestionUserViewSet(viewsets.GenericViewSet):
                 {"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST
             )
         return Response(
-            self.get_serializer(
-                paginated_questions, context=self.get_serializer_context()
-            ).data
+            add_next_cursor(
+                self.get_serializer(
+                    paginated_questions, context=self.get_serializer_context()
+                ).data,
+                paginated_questions,
+            )
+        )
+
+
+def filter_tagged_questions(questions, tags, match):
+    if match == ALL_TAGS:
+        tagged_with_all = (
+            QuestionTag.objects.filter(tag__name__in=tags)
+            .values("question")
+            .annotate(tag_count=Count("tag", distinct=True))
+            .filter(tag_count=len(tags))
+            .values("question")
         )
+        return questions.filter(id__in=tagged_with_all)
+    return questions.filter(
+        Exists(QuestionTag.objects.filter(question=OuterRef("pk"), tag__name__in=tags))
+    )
 
 
 def sort_questions(request, questions):
@@ -267,7 +307,7 @@ def sort_questions(request, questions):
     if sorted_by == NEWEST:
         questions = questions.order_by("-created_at")
     elif sorted_by == RECENT_ACTIVITY:
-        questions = questions.order_by("-updated_at")
+        questions = questions.order_by("-last_activity_at")
     elif sorted_by == MOST_VOTES:
         questions = questions.order_by("-vote")
     elif sorted_by == MOST_FREQUENT:
@@ -282,7 +322,7 @@ def sort_user_questions(request, questions):
     if sorted_by == VOTES:
         questions = questions.order_by("-vote")
     elif sorted_by == ACTIVITY:
-        questions = questions.order_by("-updated_at")
+        questions = questions.order_by("-last_activity_at")
     elif sorted_by == NEWEST:
         questions = questions.order_by("-created_at")
     elif sorted_by == VIEWS:
@@ -290,7 +330,162 @@ def sort_user_questions(request, questions):
     return questions
 
 
+class CursorPage(list):
+    def __init__(self, objects, next_cursor):
+        super().__init__(objects)
+        self.next_cursor = next_cursor
+
+
+def get_cursor_ordering(objects):
+    ordering = []
+    for field in objects.query.order_by:
+        if isinstance(field, OrderBy):
+            field = ("-" if field.descending else "") + field.expression.name
+        if field.lstrip("-") not in ("id", "pk"):
+            ordering.append(field)
+    descending = bool(ordering) and ordering[-1].startswith("-")
+    ordering.append("-pk" if descending else "pk")
+    return ordering
+
+
+def is_nullable(model, field):
+    """
+    Whether `field`, a lookup path from `model`, can be NULL, either as a
+    column or through a nullable or reverse relation on the way to it.
+    """
+    for name in field.split("__"):
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # The primary key and annotations are never NULL here.
+            return False
+        if model_field.null:
+            return True
+        model = model_field.related_model
+    return False
+
+
+def order_by_cursor(objects, ordering):
+    """Order `objects` by `ordering`, with NULLs last in either direction."""
+    expressions = []
+    for field in ordering:
+        name = field.lstrip("-")
+        if is_nullable(objects.model, name):
+            expression = F(name)
+            expressions.append(
+                expression.desc(nulls_last=True)
+                if field.startswith("-")
+                else expression.asc(nulls_last=True)
+            )
+        else:
+            expressions.append(field)
+    return objects.order_by(*expressions)
+
+
+def get_cursor_value(obj, field):
+    value = obj
+    for attribute in field.lstrip("-").split("__"):
+        value = getattr(value, attribute, None)
+        if value is None:
+            return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(ordering, values):
+    cursor = json.dumps({"ordering": ordering, "values": values})
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+def decode_cursor(cursor, ordering=None):
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = cursor["values"]
+        if ordering is None:
+            ordering = cursor["ordering"]
+        if cursor["ordering"] != ordering or len(values) != len(ordering):
+            return None
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+    return values
+
+
+def filter_after_cursor(objects, ordering, values):
+    """
+    Keep the rows that come after `values` in `ordering`, where NULLs sort
+    last: a NULL is only followed by other NULLs, and a value by NULLs too.
+    """
+    after = Q()
+    same = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        if value is None:
+            equal = Q(**{f"{name}__isnull": True})
+        else:
+            lookup = "lt" if field.startswith("-") else "gt"
+            greater = Q(**{f"{name}__{lookup}": value})
+            if is_nullable(objects.model, name):
+                greater |= Q(**{f"{name}__isnull": True})
+            after |= same & greater
+            equal = Q(**{name: value})
+        same &= equal
+    return objects.filter(after)
+
+
+def paginate_by_cursor(request, objects, object_per_page):
+    """
+    Keyset pagination on the queryset's current ordering, with the primary key
+    as a tie-breaker. Unlike page numbers this never counts the whole queryset
+    nor skips rows with OFFSET, so deep pages cost the same as the first one.
+    """
+    ordering = get_cursor_ordering(objects)
+    objects = order_by_cursor(objects, ordering)
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        values = decode_cursor(cursor, ordering)
+        if values is None:
+            return None
+        try:
+            objects = filter_after_cursor(objects, ordering, values)
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    objects = list(objects[: object_per_page + 1])
+    next_cursor = None
+    if len(objects) > object_per_page:
+        objects = objects[:object_per_page]
+        next_cursor = encode_cursor(
+            ordering, [get_cursor_value(objects[-1], field) for field in ordering]
+        )
+    return CursorPage(objects, next_cursor)
+
+
+def add_next_cursor(data, objects):
+    if isinstance(objects, CursorPage):
+        data["next_cursor"] = objects.next_cursor
+    return data
+
+
+def valid_page_params(request):
+    """
+    Whether the request names a well-formed cursor or page number, so that
+    conditional_response leaves malformed ones to the view.
+    """
+    cursor = request.query_params.get("cursor")
+    if cursor is not None:
+        return cursor == "" or decode_cursor(cursor) is not None
+    try:
+        return int(request.query_params.get("page")) >= 1
+    except (ValueError, TypeError):
+        return False
+
+
 def paginate_objects(request, objects, object_per_page):
+    if "cursor" in request.query_params:
+        return paginate_by_cursor(request, objects, object_per_page)
+
     page = request.query_params.get("page")
     try:
         page = int(page)
@@ -316,6 +511,6 @@ def filter_questions(request, questions):
         return None
 
     if filter_by == NO_ANSWER:
-        return questions.filter(answers__isnull=True)
+        return questions.filter(answer_count=0)
     if filter_by == NO_ACCEPTED_ANSWER:
         return questions.filter(has_accepted=False)
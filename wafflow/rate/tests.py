@@ -1,3 +1,171 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework import status
 
-# Create your tests here.
+from answer.models import Answer, UserAnswer
+from comment.models import Comment, UserComment
+from question.models import Question, UserQuestion, Tag, QuestionTag
+from tag.models import UserTag
+from user.models import UserProfile
+
+
+class RateTestSetting(TestCase):
+    client = Client()
+
+    def setUp(self):
+        self.kyh1 = User.objects.create(
+            username="kyh1",
+            email="kyh1@wafflow.com",
+            password="password",
+        )
+        UserProfile.objects.create(user=self.kyh1, nickname="yh1")
+        self.kyh1_token = "Token " + Token.objects.create(user=self.kyh1).key
+
+        self.kyh2 = User.objects.create(
+            username="kyh2",
+            email="kyh2@wafflow.com",
+            password="password",
+        )
+        UserProfile.objects.create(user=self.kyh2, nickname="yh2")
+        self.kyh2_token = "Token " + Token.objects.create(user=self.kyh2).key
+
+        self.question = Question.objects.create(
+            user=self.kyh1,
+            title="hello1",
+            content="I don't know1",
+        )
+        for tag in ("github", "python", "django"):
+            tag = Tag.objects.create(name=tag)
+            QuestionTag.objects.create(question=self.question, tag=tag)
+            UserTag.objects.create(user=self.kyh1, tag=tag)
+            UserTag.objects.create(user=self.kyh2, tag=tag)
+
+        self.answer = Answer.objects.create(
+            user=self.kyh2, question=self.question, content="answer"
+        )
+        self.comment = Comment.objects.create(
+            user=self.kyh2,
+            type=Comment.QUESTION,
+            question=self.question,
+            content="comment",
+        )
+
+    def rate(self, url, rating, token=None):
+        return self.client.put(
+            url,
+            data={"rating": rating},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=token or self.kyh2_token,
+        )
+
+    def assert_scores(self, user, score):
+        for user_tag in UserTag.objects.filter(user=user):
+            self.assertEqual(user_tag.score, score)
+
+
+class RateQuestionTestCase(RateTestSetting):
+    def test_rate_question(self):
+        url = f"/api/rate/question/{self.question.id}/"
+
+        response = self.rate(url, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["vote"], 1)
+        self.assertEqual(data["rating"], 1)
+        self.assert_scores(self.kyh1, 1)
+        self.assert_scores(self.kyh2, 0)
+
+        response = self.rate(url, -1)
+        self.assertEqual(response.json()["vote"], -1)
+        self.assert_scores(self.kyh1, -1)
+
+        response = self.rate(url, -1)
+        self.assertEqual(response.json()["vote"], -1)
+        self.assert_scores(self.kyh1, -1)
+
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.vote, -1)
+        self.assertEqual(UserQuestion.objects.get(user=self.kyh2).rating, -1)
+        self.assertEqual(UserQuestion.objects.count(), 1)
+
+    def test_rate_question_query_count(self):
+        url = f"/api/rate/question/{self.question.id}/"
+        with CaptureQueriesContext(connection) as queries:
+            self.rate(url, 1)
+        query_count = len(queries)
+
+        for name in ("react", "javascript", "css"):
+            tag = Tag.objects.create(name=name)
+            QuestionTag.objects.create(question=self.question, tag=tag)
+            UserTag.objects.create(user=self.kyh1, tag=tag)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.rate(url, -1)
+        self.assertEqual(len(queries), query_count)
+        self.assertEqual(
+            UserTag.objects.get(user=self.kyh1, tag__name="github").score, -1
+        )
+        self.assertEqual(UserTag.objects.get(user=self.kyh1, tag__name="css").score, -2)
+
+    def test_rate_question_invalid(self):
+        url = f"/api/rate/question/{self.question.id}/"
+
+        response = self.client.put(url, data={"rating": 1})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.rate(url, 1, token=self.kyh1_token)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.rate(url, "")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.rate(f"/api/rate/question/99999/", 1)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(UserQuestion.objects.count(), 0)
+        self.assert_scores(self.kyh1, 0)
+
+
+class RateAnswerTestCase(RateTestSetting):
+    def test_rate_answer(self):
+        url = f"/api/rate/answer/{self.answer.id}/"
+
+        response = self.rate(url, 1, token=self.kyh1_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["vote"], 1)
+        self.assert_scores(self.kyh2, 1)
+        self.assert_scores(self.kyh1, 0)
+
+        response = self.rate(url, -1, token=self.kyh1_token)
+        self.assertEqual(response.json()["vote"], -1)
+        self.assert_scores(self.kyh2, -1)
+
+        self.answer.refresh_from_db()
+        self.assertEqual(self.answer.vote, -1)
+        self.assertEqual(UserAnswer.objects.get(user=self.kyh1).rating, -1)
+
+        response = self.rate(url, 1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RateCommentTestCase(RateTestSetting):
+    def test_rate_comment(self):
+        url = f"/api/rate/comment/{self.comment.id}/"
+
+        response = self.rate(url, 1, token=self.kyh1_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["vote"], 1)
+
+        response = self.rate(url, -1, token=self.kyh1_token)
+        self.assertEqual(response.json()["vote"], -1)
+
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.vote, -1)
+        self.assertEqual(UserComment.objects.get(user=self.kyh1).rating, -1)
+        self.assert_scores(self.kyh2, 0)
+
+        response = self.rate(url, 1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
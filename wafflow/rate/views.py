@@ -1,11 +1,56 @@
+from django.db import transaction
+from django.db.models import F
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from question.models import UserQuestion, Question, QuestionTag
+from comment.views import comment_scopes
+from question.cache import invalidate_responses, question_scope
+from question.models import Question
 from tag.models import UserTag
-from answer.models import UserAnswer, Answer
-from comment.models import UserComment, Comment
+from answer.models import Answer
+from comment.models import Comment
+
+
+def shift_vote(post, amount, question_id=None):
+    """
+    Add `amount` to `post`'s vote and, when `question_id` is given, to its
+    author's UserTag scores for the tags of that question, one UPDATE each.
+    """
+    type(post).objects.filter(pk=post.pk).update(vote=F("vote") + amount)
+    if question_id is not None:
+        UserTag.objects.filter(
+            user_id=post.user_id, tag__question_tags__question_id=question_id
+        ).update(score=F("score") + amount)
+
+
+def auto_now_fields(model):
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+    ]
+
+
+def rate_post(post, user_ratings, user, rating, question_id=None):
+    """
+    Record `user`'s rating of `post` in a single transaction: upsert and lock
+    the user's rating row, then shift the post's vote and its author's tag
+    scores by the difference. Returns the post's vote after the change.
+    """
+    rating_model = user_ratings.model
+    with transaction.atomic():
+        rating_model.objects.bulk_create(
+            [rating_model(user=user, rating=0, **{user_ratings.field.name: post})],
+            ignore_conflicts=True,
+        )
+        user_rating = user_ratings.select_for_update().get(user=user)
+        rating_diff = rating - user_rating.rating
+        if rating_diff:
+            user_rating.rating = rating
+            user_rating.save(update_fields=["rating", *auto_now_fields(rating_model)])
+            shift_vote(post, rating_diff, question_id)
+        return type(post).objects.values_list("vote", flat=True).get(pk=post.pk)
 
 
 class RateViewSet(viewsets.GenericViewSet):
@@ -24,15 +69,11 @@ class RateViewSet(viewsets.GenericViewSet):
                 {"message": "There is no question with the id"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if question.user == user:
+        if question.user_id == user.id:
             return Response(
                 {"message": "Not allowed to rate this question"},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        user_question, created = UserQuestion.objects.get_or_create(
-            user=user, question=question, defaults={"rating": 0}
-        )
-
         rating = request.data.get("rating")
         if not rating:
             return Response(
@@ -41,23 +82,16 @@ class RateViewSet(viewsets.GenericViewSet):
             )
 
         rating = int(rating)
-        rating_diff = rating - user_question.rating
-        question_tags = QuestionTag.objects.filter(question=question)
-        for question_tag in question_tags:
-            user_tag = UserTag.objects.get(user=question.user, tag=question_tag.tag)
-            user_tag.score += rating_diff
-            user_tag.save()
-        question.vote += rating_diff
-        user_question.rating = rating
-
-        question.save()
-        user_question.save()
+        vote = rate_post(
+            question, question.user_questions, user, rating, question_id=question.id
+        )
+        invalidate_responses(question_scope(question.id))
 
         data = {
             "user_id": user.id,
             "question_id": question.id,
-            "vote": question.vote,
-            "rating": user_question.rating,
+            "vote": vote,
+            "rating": rating,
         }
         return Response(data, status=status.HTTP_200_OK)
 
@@ -76,15 +110,11 @@ class RateViewSet(viewsets.GenericViewSet):
                 {"message": "There is no answer with the id"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if answer.user == user:
+        if answer.user_id == user.id:
             return Response(
                 {"message": "Not allowed to rate this answer"},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        user_answer, created = UserAnswer.objects.get_or_create(
-            user=user, answer=answer, defaults={"rating": 0}
-        )
-
         rating = request.data.get("rating")
         if not rating:
             return Response(
@@ -93,23 +123,16 @@ class RateViewSet(viewsets.GenericViewSet):
             )
 
         rating = int(rating)
-        rating_diff = rating - user_answer.rating
-        question_tags = QuestionTag.objects.filter(question=answer.question)
-        for question_tag in question_tags:
-            user_tag = UserTag.objects.get(user=answer.user, tag=question_tag.tag)
-            user_tag.score += rating_diff
-            user_tag.save()
-        answer.vote += rating_diff
-        user_answer.rating = rating
-
-        answer.save()
-        user_answer.save()
+        vote = rate_post(
+            answer, answer.user_answers, user, rating, question_id=answer.question_id
+        )
+        invalidate_responses(question_scope(answer.question_id))
 
         data = {
             "user_id": user.id,
             "answer_id": answer.id,
-            "vote": answer.vote,
-            "rating": user_answer.rating,
+            "vote": vote,
+            "rating": rating,
         }
         return Response(data, status=status.HTTP_200_OK)
 
@@ -128,15 +151,11 @@ class RateViewSet(viewsets.GenericViewSet):
                 {"message": "There is no comment with the id"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if comment.user == user:
+        if comment.user_id == user.id:
             return Response(
                 {"message": "Not allowed to rate this comment"},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        user_comment, created = UserComment.objects.get_or_create(
-            user=user, comment=comment, defaults={"rating": 0}
-        )
-
         rating = request.data.get("rating")
         if not rating:
             return Response(
@@ -145,16 +164,13 @@ class RateViewSet(viewsets.GenericViewSet):
             )
 
         rating = int(rating)
-        comment.vote += rating - user_comment.rating
-        user_comment.rating = rating
-
-        comment.save()
-        user_comment.save()
+        vote = rate_post(comment, comment.user_comments, user, rating)
+        invalidate_responses(*comment_scopes(comment))
 
         data = {
             "user_id": user.id,
             "comment_id": comment.id,
-            "vote": comment.vote,
-            "rating": user_comment.rating,
+            "vote": vote,
+            "rating": rating,
         }
         return Response(data, status=status.HTTP_200_OK)
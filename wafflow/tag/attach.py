@@ -0,0 +1,69 @@
+from rest_framework import serializers
+
+from question.models import QuestionTag, Tag
+from tag.models import TagStatistics
+from tag.statistics import shift_post_counts, shift_tag_statistics
+
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def normalize_tag_names(names):
+    """
+    Strip the given tag names and drop empty and repeated ones, keeping the
+    order they were given in. A single name may be passed as a string.
+    """
+    if not names:
+        return []
+    if isinstance(names, str):
+        names = [names]
+    normalized = []
+    for name in names:
+        name = str(name).strip()
+        if name and name not in normalized:
+            normalized.append(name)
+    too_long = [name for name in normalized if len(name) > TAG_NAME_MAX_LENGTH]
+    if too_long:
+        raise serializers.ValidationError(
+            {"tags": f"Tags are at most {TAG_NAME_MAX_LENGTH} characters: {too_long}"}
+        )
+    return normalized
+
+
+def resolve_tags(names):
+    """
+    Return {name: tag id} for `names`, creating the tags that do not exist
+    yet together with their empty statistics. Tags created concurrently by
+    another request are picked up rather than failing on the unique name.
+    """
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        created = dict(Tag.objects.filter(name__in=missing).values_list("name", "id"))
+        TagStatistics.objects.bulk_create(
+            [TagStatistics(tag_id=tag_id) for tag_id in created.values()],
+            ignore_conflicts=True,
+        )
+        tag_ids.update(created)
+    return tag_ids
+
+
+def attach_tags(question, names):
+    """
+    Tag a new question with `names` and count it in the tag statistics and
+    its author's user tags, in a fixed number of queries however many tags
+    there are. Returns the ids of the tags.
+    """
+    names = normalize_tag_names(names)
+    if not names:
+        return set()
+    tag_ids = resolve_tags(names)
+    QuestionTag.objects.bulk_create(
+        [QuestionTag(question=question, tag_id=tag_ids[name]) for name in names]
+    )
+    tag_ids = set(tag_ids.values())
+    shift_tag_statistics(tag_ids, question.created_at, 1)
+    shift_post_counts([question.user_id], tag_ids, 1)
+    return tag_ids
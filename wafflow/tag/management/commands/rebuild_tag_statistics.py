@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tag.statistics import rebuild_tag_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the question counts of every tag from the active questions; "
+        "run daily to catch changes the incremental updates miss"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tag_ids", nargs="*", type=int)
+
+    def handle(self, *args, **options):
+        tags = rebuild_tag_statistics(options["tag_ids"] or None)
+        self.stdout.write(f"Rebuilt statistics of {tags} tags")
@@ -0,0 +1,35 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+from question import dedupe
+
+
+def dedupe_user_tags(apps, schema_editor):
+    dedupe.dedupe_user_tags(apps.get_model("tag", "UserTag"))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("tag", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="usertag",
+            index=models.Index(
+                fields=["user", "-score", "-id"], name="usertag_user_score_idx"
+            ),
+        ),
+        migrations.RunPython(dedupe_user_tags, migrations.RunPython.noop, atomic=True),
+        migrations.AddConstraint(
+            model_name="usertag",
+            constraint=models.UniqueConstraint(
+                fields=("user", "tag"), name="unique_user_tag"
+            ),
+        ),
+    ]
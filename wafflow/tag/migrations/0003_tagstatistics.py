@@ -0,0 +1,52 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from tag.statistics import rebuild_tag_statistics
+
+
+def count_questions(apps, schema_editor):
+    rebuild_tag_statistics(
+        Tag=apps.get_model("question", "Tag"),
+        QuestionTag=apps.get_model("question", "QuestionTag"),
+        TagStatistics=apps.get_model("tag", "TagStatistics"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("question", "0006_indexes_and_constraints"),
+        ("tag", "0002_indexes_and_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagStatistics",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="statistics",
+                        serialize=False,
+                        to="question.tag",
+                    ),
+                ),
+                ("question_count", models.IntegerField(default=0)),
+                ("week_start", models.DateField(null=True)),
+                ("week_question_count", models.IntegerField(default=0)),
+                ("month_start", models.DateField(null=True)),
+                ("month_question_count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="tagstatistics",
+            index=models.Index(
+                fields=["-question_count", "-tag"], name="tagstatistics_count_idx"
+            ),
+        ),
+        migrations.RunPython(count_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.4 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+from tag.statistics import user_tag_posts_subquery
+
+
+def count_posts(apps, schema_editor):
+    UserTag = apps.get_model("tag", "UserTag")
+    UserTag.objects.update(
+        post_count=user_tag_posts_subquery(apps.get_model("question", "Question"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tag", "0003_tagstatistics"),
+        ("answer", "0003_indexes_and_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usertag",
+            name="post_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -7,3 +7,44 @@ class UserTag(models.Model):
     user = models.ForeignKey(User, related_name="user_tags", on_delete=models.CASCADE)
     tag = models.ForeignKey(Tag, related_name="user_tags", on_delete=models.CASCADE)
     score = models.IntegerField(default=0)
+    # Active questions under the tag that the user asked or answered.
+    post_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "tag"], name="unique_user_tag"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-score", "-id"], name="usertag_user_score_idx"
+            ),
+        ]
+
+
+class TagStatistics(models.Model):
+    """
+    Denormalized question counts of a tag. The week and month counts belong
+    to the periods starting on week_start and month_start; counts of an
+    earlier period read as zero.
+
+    Tagging a new question and deactivating or reactivating one in the admin
+    update them. rebuild_tag_statistics, which the uWSGI cron in
+    wafflow-server_uwsgi.ini runs daily, recounts them from the questions in
+    case anything else changed those.
+    """
+
+    tag = models.OneToOneField(
+        Tag, related_name="statistics", on_delete=models.CASCADE, primary_key=True
+    )
+    question_count = models.IntegerField(default=0)
+    week_start = models.DateField(null=True)
+    week_question_count = models.IntegerField(default=0)
+    month_start = models.DateField(null=True)
+    month_question_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-question_count", "-tag"], name="tagstatistics_count_idx"
+            ),
+        ]
@@ -2,12 +2,12 @@ from rest_framework import serializers
 
 from user.serializers import AuthorSerializer
 from question.models import Tag
-from tag.models import UserTag
-from django.db.models import Q
+from tag.models import TagStatistics, UserTag
+from tag.statistics import period_starts
 
 
 class TagUserSerializer(serializers.ModelSerializer):
-    posts = serializers.SerializerMethodField()
+    posts = serializers.IntegerField(source="post_count")
     id = serializers.IntegerField(source="tag.id")
     name = serializers.CharField(source="tag.name")
 
@@ -15,28 +15,41 @@ class TagUserSerializer(serializers.ModelSerializer):
         model = UserTag
         fields = ("id", "name", "posts", "score")
 
-    def get_posts(self, user_tag):
-        user = user_tag.user
-
-        return (
-            user_tag.tag.question_tags.filter(
-                question__is_active=True, tag=user_tag.tag
-            )
-            .filter(
-                Q(question__user=user)
-                | Q(question__answers__user=user, question__answers__is_active=True)
-            )
-            .distinct()
-            .count()
-        )
-
 
 class TagListSerializer(serializers.ModelSerializer):
     question_count = serializers.SerializerMethodField()
+    week_question_count = serializers.SerializerMethodField()
+    month_question_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Tag
-        fields = ("id", "name", "created_at", "question_count")
+        fields = (
+            "id",
+            "name",
+            "created_at",
+            "question_count",
+            "week_question_count",
+            "month_question_count",
+        )
+
+    def get_statistics(self, tag):
+        try:
+            return tag.statistics
+        except TagStatistics.DoesNotExist:
+            return None
 
     def get_question_count(self, tag):
-        return tag.question_tags.filter(question__is_active=True).count()
+        statistics = self.get_statistics(tag)
+        return statistics.question_count if statistics else 0
+
+    def get_week_question_count(self, tag):
+        statistics = self.get_statistics(tag)
+        if statistics is None or statistics.week_start != period_starts()[0]:
+            return 0
+        return statistics.week_question_count
+
+    def get_month_question_count(self, tag):
+        statistics = self.get_statistics(tag)
+        if statistics is None or statistics.month_start != period_starts()[1]:
+            return 0
+        return statistics.month_question_count
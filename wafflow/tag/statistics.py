@@ -0,0 +1,179 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from answer.models import Answer
+from question.models import Question, QuestionTag, Tag
+from tag.models import TagStatistics, UserTag
+
+
+def period_starts(moment=None):
+    """Return the first days of the week and month containing `moment`."""
+    day = timezone.localdate(moment)
+    return day - timedelta(days=day.weekday()), day.replace(day=1)
+
+
+def period_count(period, start, amount):
+    """
+    Add `amount` to the count of the period starting on `start`. A row still
+    holding an earlier period starts over from zero.
+    """
+    return Case(
+        When(
+            **{f"{period}_start": start},
+            then=F(f"{period}_question_count") + amount,
+        ),
+        default=Value(max(amount, 0)),
+        output_field=IntegerField(),
+    )
+
+
+def shift_tag_statistics(tag_ids, created_at, amount):
+    """
+    Count `amount` active questions created at `created_at` under each of
+    `tag_ids`: 1 when a question is created or gains the tags, -1 when it is
+    deactivated or loses them. Every tag has its statistics row from the
+    moment it is created, see resolve_tags().
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return
+    week, month = period_starts()
+    created_week, created_month = period_starts(created_at)
+
+    TagStatistics.objects.filter(tag_id__in=tag_ids).update(
+        question_count=F("question_count") + amount,
+        week_question_count=period_count(
+            "week", week, amount if created_week == week else 0
+        ),
+        week_start=week,
+        month_question_count=period_count(
+            "month", month, amount if created_month == month else 0
+        ),
+        month_start=month,
+    )
+
+
+def rebuild_tag_statistics(
+    tag_ids=None, Tag=Tag, QuestionTag=QuestionTag, TagStatistics=TagStatistics
+):
+    """
+    Recount the statistics of `tag_ids`, or of every tag, from the active
+    questions. Returns the number of tags rebuilt. The migration creating
+    the statistics passes its historical models.
+    """
+    week, month = period_starts()
+    tags = Tag.objects.all()
+    question_tags = QuestionTag.objects.filter(question__is_active=True)
+    if tag_ids is not None:
+        tags = tags.filter(id__in=tag_ids)
+        question_tags = question_tags.filter(tag_id__in=tag_ids)
+
+    counts = {
+        row["tag_id"]: row
+        for row in question_tags.order_by()
+        .values("tag_id")
+        .annotate(
+            question_count=Count("question_id", distinct=True),
+            week_question_count=Count(
+                "question_id",
+                filter=Q(question__created_at__date__gte=week),
+                distinct=True,
+            ),
+            month_question_count=Count(
+                "question_id",
+                filter=Q(question__created_at__date__gte=month),
+                distinct=True,
+            ),
+        )
+    }
+    statistics = [
+        TagStatistics(
+            tag_id=tag_id,
+            question_count=counts.get(tag_id, {}).get("question_count", 0),
+            week_start=week,
+            week_question_count=counts.get(tag_id, {}).get("week_question_count", 0),
+            month_start=month,
+            month_question_count=counts.get(tag_id, {}).get("month_question_count", 0),
+        )
+        for tag_id in tags.values_list("id", flat=True).iterator()
+    ]
+    with transaction.atomic():
+        stale = TagStatistics.objects.all()
+        if tag_ids is not None:
+            stale = stale.filter(tag_id__in=tag_ids)
+        stale.delete()
+        TagStatistics.objects.bulk_create(statistics, batch_size=1000)
+    return len(statistics)
+
+
+def shift_post_counts(user_ids, tag_ids, amount):
+    """
+    Add `amount` posts of each of `user_ids` under each of `tag_ids`, creating
+    the user tags that do not exist yet.
+    """
+    user_ids = set(user_ids)
+    tag_ids = set(tag_ids)
+    if not user_ids or not tag_ids:
+        return
+    if amount > 0:
+        UserTag.objects.bulk_create(
+            [
+                UserTag(user_id=user_id, tag_id=tag_id)
+                for user_id in user_ids
+                for tag_id in tag_ids
+            ],
+            ignore_conflicts=True,
+        )
+    UserTag.objects.filter(user_id__in=user_ids, tag_id__in=tag_ids).update(
+        post_count=F("post_count") + amount
+    )
+
+
+def shift_question_activity(question, amount):
+    """
+    Count `question` back in (`amount` 1) or out (-1) of the statistics of its
+    tags and the post counts of its author and answerers, when it is
+    reactivated or deactivated.
+    """
+    tag_ids = set(
+        QuestionTag.objects.filter(question=question).values_list("tag_id", flat=True)
+    )
+    shift_tag_statistics(tag_ids, question.created_at, amount)
+    user_ids = set(
+        Answer.objects.filter(question=question, is_active=True).values_list(
+            "user_id", flat=True
+        )
+    )
+    user_ids.add(question.user_id)
+    shift_post_counts(user_ids, tag_ids, amount)
+
+
+def user_tag_posts_subquery(Question=Question):
+    """
+    Count the active questions each user tag's user asked or answered under
+    its tag, a question asked and answered by the user counting once.
+    """
+    user = OuterRef("user")
+    counted = (
+        Question.objects.filter(is_active=True, question_tags__tag=OuterRef("tag"))
+        .filter(Q(user=user) | Q(answers__user=user, answers__is_active=True))
+        .order_by()
+        .values("question_tags__tag")
+        .annotate(count=Count("pk", distinct=True))
+        .values("count")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
@@ -1,3 +1,270 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.authtoken.models import Token
+
+from question.models import Question, QuestionTag, Tag
+from tag.attach import normalize_tag_names, resolve_tags
+from tag.models import TagStatistics, UserTag
+from tag.statistics import period_starts, shift_tag_statistics
+from user.models import UserProfile
+
+
+class TagTestSetting(TestCase):
+    client = Client()
+
+    def setUp(self):
+        self.kyh1 = User.objects.create(username="kyh1", password="password")
+        UserProfile.objects.create(user=self.kyh1, nickname="yh1")
+        self.kyh1_token = "Token " + Token.objects.create(user=self.kyh1).key
+
+    def post_question(self, *tags):
+        response = self.client.post(
+            "/api/question/",
+            json.dumps({"title": "hello", "content": "world", "tags": list(tags)}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Question.objects.get(pk=response.json()["id"])
+
+    def get_popular_tags(self):
+        response = self.client.get("/api/tags/?sorted_by=popular&page=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["tags"]
+
+
+class TagStatisticsTestCase(TagTestSetting):
+    def test_popular_tags(self):
+        self.post_question("python", "django")
+        self.post_question("python", "react")
+        self.post_question("python", "django")
+
+        tags = self.get_popular_tags()
+        self.assertEqual(
+            [(tag["name"], tag["question_count"]) for tag in tags],
+            [("python", 3), ("django", 2), ("react", 1)],
+        )
+        self.assertEqual(tags[0]["week_question_count"], 3)
+        self.assertEqual(tags[0]["month_question_count"], 3)
+
+        # A tag is counted from the moment it is created.
+        unused = resolve_tags(["unused"])["unused"]
+        tags = self.get_popular_tags()
+        self.assertEqual(tags[-1]["id"], unused)
+        self.assertEqual(tags[-1]["question_count"], 0)
+        Tag.objects.filter(pk=unused).delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get_popular_tags()
+        query_count = len(queries)
+        self.post_question("css", "javascript", "github")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.get_popular_tags()), 6)
+        self.assertEqual(len(queries), query_count)
+
+    def test_shift_tag_statistics(self):
+        question = self.post_question("python", "django")
+        python = Tag.objects.get(name="python")
+        django = Tag.objects.get(name="django")
+
+        last_year = timezone.now() - timedelta(days=400)
+        shift_tag_statistics([python.id], last_year, 1)
+        statistics = TagStatistics.objects.get(tag=python)
+        self.assertEqual(statistics.question_count, 2)
+        self.assertEqual(statistics.week_question_count, 1)
+        self.assertEqual(statistics.month_question_count, 1)
+
+        shift_tag_statistics([python.id, django.id], question.created_at, -1)
+        self.assertEqual(TagStatistics.objects.get(tag=python).question_count, 1)
+        self.assertEqual(TagStatistics.objects.get(tag=django).week_question_count, 0)
+
+        # A row left over from an earlier week starts the new week over.
+        week, month = period_starts()
+        TagStatistics.objects.filter(tag=django).update(
+            week_start=week - timedelta(days=7), week_question_count=5
+        )
+        shift_tag_statistics([django.id], question.created_at, 1)
+        statistics = TagStatistics.objects.get(tag=django)
+        self.assertEqual(statistics.week_start, week)
+        self.assertEqual(statistics.week_question_count, 1)
+
+    def test_rebuild_tag_statistics(self):
+        self.post_question("python", "django")
+        question = self.post_question("python")
+        Question.objects.filter(pk=question.pk).update(is_active=False)
+        react = Tag.objects.create(name="react")
+        old_question = Question.objects.create(
+            user=self.kyh1, title="old", content="old"
+        )
+        Question.objects.filter(pk=old_question.pk).update(
+            created_at=timezone.now() - timedelta(days=400)
+        )
+        QuestionTag.objects.create(question=old_question, tag=react)
+
+        stdout = StringIO()
+        call_command("rebuild_tag_statistics", stdout=stdout)
+        self.assertIn("Rebuilt statistics of 3 tags", stdout.getvalue())
+
+        tags = self.get_popular_tags()
+        self.assertEqual(
+            [
+                (tag["name"], tag["question_count"], tag["week_question_count"])
+                for tag in tags
+            ],
+            [("react", 1, 0), ("django", 1, 1), ("python", 1, 1)],
+        )
+
+
+class UserTagPostCountTestCase(TagTestSetting):
+    def setUp(self):
+        super().setUp()
+        self.kyh2 = User.objects.create(username="kyh2", password="password")
+        UserProfile.objects.create(user=self.kyh2, nickname="yh2")
+        self.kyh2_token = "Token " + Token.objects.create(user=self.kyh2).key
+
+    def post_answer(self, question, token):
+        response = self.client.post(
+            f"/api/answer/question/{question.id}/",
+            json.dumps({"content": "answer"}),
+            HTTP_AUTHORIZATION=token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()["id"]
+
+    def delete_answer(self, answer_id, token):
+        response = self.client.delete(
+            f"/api/answer/{answer_id}/", HTTP_AUTHORIZATION=token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def get_posts(self, user):
+        response = self.client.get(f"/api/tag/user/{user.id}/?sorted_by=name&page=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {tag["name"]: tag["posts"] for tag in response.json()["tags"]}
+
+    def test_post_counts(self):
+        question = self.post_question("python", "django")
+        self.post_question("python")
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 1, "python": 2})
+
+        # A question counts once, however many times the user answers it.
+        first = self.post_answer(question, self.kyh2_token)
+        second = self.post_answer(question, self.kyh2_token)
+        self.assertEqual(self.get_posts(self.kyh2), {"django": 1, "python": 1})
+
+        self.delete_answer(first, self.kyh2_token)
+        self.assertEqual(self.get_posts(self.kyh2), {"django": 1, "python": 1})
+        self.delete_answer(second, self.kyh2_token)
+        self.assertEqual(self.get_posts(self.kyh2), {})
+        self.assertFalse(UserTag.objects.filter(user=self.kyh2).exists())
+
+        own = self.post_answer(question, self.kyh1_token)
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 1, "python": 2})
+        self.delete_answer(own, self.kyh1_token)
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 1, "python": 2})
+
+    def set_active_in_admin(self, question, is_active):
+        admin = site._registry[Question]
+        request = RequestFactory().post("/")
+        request.user = User.objects.create_superuser(f"admin{is_active}")
+        form = admin.get_form(request, question, change=True)(
+            {"is_active": "on"} if is_active else {}, instance=question
+        )
+        self.assertTrue(form.is_valid())
+        admin.save_model(request, form.save(commit=False), form, True)
+
+    def test_deactivate_question_in_admin(self):
+        question = self.post_question("python", "django")
+        self.post_question("python")
+        self.post_answer(question, self.kyh2_token)
+        python = TagStatistics.objects.get(tag__name="python")
+
+        self.set_active_in_admin(question, False)
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 0, "python": 1})
+        self.assertEqual(self.get_posts(self.kyh2), {"django": 0, "python": 0})
+        python.refresh_from_db()
+        self.assertEqual(python.question_count, 1)
+        self.assertEqual(python.week_question_count, 1)
+
+        self.set_active_in_admin(question, True)
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 1, "python": 2})
+        self.assertEqual(self.get_posts(self.kyh2), {"django": 1, "python": 1})
+        python.refresh_from_db()
+        self.assertEqual(python.question_count, 2)
+        call_command("check_counters", stdout=StringIO())
+
+    def test_get_posts_query_count(self):
+        self.post_question("python")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_posts(self.kyh1)
+        query_count = len(queries)
+
+        self.post_question("django", "react", "css")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.get_posts(self.kyh1)), 4)
+        self.assertEqual(len(queries), query_count)
+
+    def test_reconcile_post_counts(self):
+        question = self.post_question("python", "django")
+        self.post_question("python")
+        self.post_answer(question, self.kyh2_token)
+        self.post_answer(question, self.kyh2_token)
+        self.post_answer(question, self.kyh1_token)
+        UserTag.objects.update(post_count=0)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self.get_posts(self.kyh1), {"django": 1, "python": 2})
+        self.assertEqual(self.get_posts(self.kyh2), {"django": 1, "python": 1})
+
+
+class AttachTagsTestCase(TagTestSetting):
+    def test_normalize_tag_names(self):
+        self.assertEqual(
+            normalize_tag_names([" python", "django", "python ", "", "C++"]),
+            ["python", "django", "C++"],
+        )
+        self.assertEqual(normalize_tag_names("python"), ["python"])
+        self.assertEqual(normalize_tag_names(None), [])
+        with self.assertRaises(ValidationError):
+            normalize_tag_names(["x" * 21])
+
+    def test_post_question_tags(self):
+        Tag.objects.create(name="python")
+        question = self.post_question("python", " django", "python", "react")
+        self.assertEqual(
+            sorted(question.question_tags.values_list("tag__name", flat=True)),
+            ["django", "python", "react"],
+        )
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(UserTag.objects.filter(user=self.kyh1).count(), 3)
+
+        response = self.client.post(
+            "/api/question/",
+            json.dumps({"title": "hello", "content": "world", "tags": ["x" * 21]}),
+            HTTP_AUTHORIZATION=self.kyh1_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Question.objects.count(), 1)
+
+    def test_post_question_query_count(self):
+        self.post_question("python")
+        with CaptureQueriesContext(connection) as queries:
+            self.post_question("a", "b")
+        query_count = len(queries)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post_question("c", "d", "e", "f", "g", "a")
+        self.assertEqual(len(queries), query_count)
@@ -1,10 +1,11 @@
 from django.contrib.auth.models import User
+from django.db.models import F
 from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny
 
-from django.db.models import Count, Q
+from question.cache import cache_response
 from question.models import Tag
-from question.views import paginate_objects
+from question.views import add_next_cursor, paginate_objects
 from tag.serializers import TagListSerializer, TagUserSerializer
 from tag.constants import *
 from tag.models import UserTag
@@ -31,7 +32,7 @@ class TagViewSet(viewsets.GenericViewSet):
                     {"message": "There is no user with that id"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-        user_tags = UserTag.objects.filter(user=user)
+        user_tags = UserTag.objects.filter(user=user).select_related("tag")
         user_tags = sort_user_tag(request, user_tags)
 
         if user_tags is None:
@@ -45,7 +46,11 @@ class TagViewSet(viewsets.GenericViewSet):
                 {"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        return Response({"tags": self.get_serializer(user_tags, many=True).data})
+        return Response(
+            add_next_cursor(
+                {"tags": self.get_serializer(user_tags, many=True).data}, user_tags
+            )
+        )
 
 
 class TagListViewSet(viewsets.GenericViewSet):
@@ -53,8 +58,11 @@ class TagListViewSet(viewsets.GenericViewSet):
     serializer_class = TagListSerializer
     permission_classes = (AllowAny,)
 
+    @cache_response("tags", "tags")
     def list(self, request):
-        tags = search_tag_list(request, self.get_queryset())
+        tags = search_tag_list(
+            request, self.get_queryset().select_related("statistics")
+        )
         tags = sort_tags_list(request, tags)
         if tags is None:
             return Response(
@@ -67,14 +75,16 @@ class TagListViewSet(viewsets.GenericViewSet):
                 {"error": "Invalid page"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        return Response({"tags": self.get_serializer(tags, many=True).data})
+        return Response(
+            add_next_cursor({"tags": self.get_serializer(tags, many=True).data}, tags)
+        )
 
 
 def search_tag_list(request, tags):
     search = request.query_params.get("search")
     if search is None or search == "":
         return tags
-    return Tag.objects.filter(name__icontains=search)
+    return tags.filter(name__icontains=search)
 
 
 def sort_tags_list(request, tags):
@@ -82,11 +92,13 @@ def sort_tags_list(request, tags):
     if not (sorted_by in (POPULAR, NAME, NEWEST)):
         return None
     if sorted_by == POPULAR:
-        return tags.annotate(
-            question_count=Count(
-                "question_tags", filter=Q(question_tags__question__is_active=True)
-            )
-        ).order_by("-question_count")
+        # Every tag has a statistics row, so the inner join drops none and
+        # the pages are read off tagstatistics_count_idx.
+        return (
+            tags.filter(statistics__isnull=False)
+            .annotate(popularity=F("statistics__question_count"))
+            .order_by("-popularity", "-id")
+        )
     elif sorted_by == NAME:
         return tags.order_by("name")
     elif sorted_by == NEWEST:
@@ -0,0 +1,156 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from user.lru import LRUCache
+
+TOKEN_CACHE_PREFIX = "token"
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+# The fields of request.user the API reads; the password hash and the rest
+# stay out of the cache and are loaded on access.
+USER_FIELDS = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+tokens = LRUCache(
+    "TOKEN_LOCAL_CACHE_SIZE", "TOKEN_LOCAL_CACHE_TIMEOUT", size=10000, timeout=5
+)
+
+
+def token_cache_key(key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"{TOKEN_CACHE_PREFIX}:{digest}"
+
+
+def shared_token_cache():
+    """
+    Return the Django cache that token entries are shared through, or None
+    when TOKEN_CACHE_ALIAS is unset or names a cache local to this process.
+    """
+    alias = getattr(settings, "TOKEN_CACHE_ALIAS", None)
+    if not alias or settings.CACHES[alias]["BACKEND"] in LOCAL_CACHE_BACKENDS:
+        return None
+    return caches[alias]
+
+
+def token_expired(created):
+    expire_after = getattr(settings, "TOKEN_EXPIRE_AFTER", None)
+    if not expire_after:
+        return False
+    return created < timezone.now() - timedelta(seconds=expire_after)
+
+
+def token_entry(token):
+    user = token.user
+    return {
+        "user": {field: getattr(user, field) for field in USER_FIELDS},
+        "created": token.created,
+    }
+
+
+def token_from_entry(key, entry):
+    # Every request gets its own instances, as views modify request.user. The
+    # fields missing from the entry are deferred, so saving the user only
+    # writes the fields that were loaded or set.
+    field_names = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in entry["user"]
+    ]
+    user = User.from_db(
+        "default", field_names, [entry["user"][name] for name in field_names]
+    )
+    return Token(key=key, user=user, created=entry["created"])
+
+
+def drop_tokens(keys):
+    tokens.invalidate(*keys)
+    shared = shared_token_cache()
+    if shared is not None:
+        shared.delete_many([token_cache_key(key) for key in keys])
+
+
+def invalidate_tokens(*keys):
+    """
+    Forget the users resolved from the given token keys, e.g. after logout,
+    deactivation or a change of the user's fields. Inside a transaction they
+    are forgotten again on commit so that a racing request cannot cache the
+    old rows.
+    """
+    keys = [key for key in keys if key]
+    if not keys:
+        return
+    drop_tokens(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: drop_tokens(keys))
+
+
+def invalidate_user_tokens(user):
+    invalidate_tokens(*Token.objects.filter(user=user).values_list("key", flat=True))
+
+
+def fresh_token(user):
+    """Return the token of `user`, replacing it when it has expired."""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token_expired(token.created):
+        key = token.key
+        token.delete()
+        invalidate_tokens(key)
+        token = Token.objects.create(user=user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers which user a key resolves to for
+    TOKEN_CACHE_TIMEOUT seconds, in the cache named by TOKEN_CACHE_ALIAS.
+
+    When that cache is local to the process, logout and deactivation would
+    not reach the other workers, so keys are kept in an LRU of
+    TOKEN_LOCAL_CACHE_SIZE keys for only TOKEN_LOCAL_CACHE_TIMEOUT seconds
+    instead, which bounds how long those workers still accept them.
+
+    With TOKEN_EXPIRE_AFTER set, tokens older than that many seconds are
+    rejected; the clear_expired_tokens command deletes them.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = self.cached_entry(key)
+        if not entry["user"]["is_active"]:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        if token_expired(entry["created"]):
+            raise exceptions.AuthenticationFailed("Token has expired.")
+
+        token = token_from_entry(key, entry)
+        return (token.user, token)
+
+    def load_entry(self, key):
+        try:
+            token = Token.objects.select_related("user").get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        return token_entry(token)
+
+    def cached_entry(self, key):
+        shared = shared_token_cache()
+        if shared is None:
+            entry = tokens.get(key)
+            if entry is None:
+                entry = self.load_entry(key)
+                tokens.put(key, entry)
+            return entry
+        cache_key = token_cache_key(key)
+        entry = shared.get(cache_key)
+        if entry is None:
+            entry = self.load_entry(key)
+            shared.set(cache_key, entry, getattr(settings, "TOKEN_CACHE_TIMEOUT", 60))
+        return entry
@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from rest_framework import serializers
+
+from user.lru import LRUCache
+from user.serializers import AuthorSerializer
+
+
+class AuthorCardCache(LRUCache):
+    """
+    Bounded LRU of AuthorSerializer output keyed by user id, so that pages
+    showing the same authors over and over neither load nor serialize them
+    again.
+
+    AUTHOR_CARD_CACHE_SIZE bounds the number of cards, zero disabling the
+    cache. Cards expire after AUTHOR_CARD_CACHE_TIMEOUT seconds, which bounds
+    how stale other processes can be, since invalidate() only reaches the
+    current one.
+    """
+
+    def __init__(self):
+        super().__init__("AUTHOR_CARD_CACHE_SIZE", "AUTHOR_CARD_CACHE_TIMEOUT")
+
+    def set(self, user):
+        """Serialize `user`, whose profile should be loaded, and cache the card."""
+        card = dict(AuthorSerializer(user).data)
+        self.put(user.id, card)
+        return card
+
+    def get_many(self, user_ids):
+        """
+        Return {user id: card} for `user_ids`, loading the users missing from
+        the cache with their profiles in one query.
+        """
+        cards = {}
+        missing = set()
+        for user_id in set(user_ids):
+            card = self.get(user_id)
+            if card is None:
+                missing.add(user_id)
+            else:
+                cards[user_id] = card
+        if missing:
+            for user in User.objects.select_related("profile").filter(id__in=missing):
+                cards[user.id] = self.set(user)
+        return cards
+
+
+author_cards = AuthorCardCache()
+
+
+def author_card(post):
+    """Return the author card of a question, answer or comment."""
+    card = author_cards.get(post.user_id)
+    if card is None:
+        card = author_cards.set(post.user)
+    return card
+
+
+def invalidate_author_cards(*user_ids):
+    """
+    Drop the cards of users whose profile or reputation changed. Inside a
+    transaction they are dropped again on commit, so that a reader racing
+    the write cannot cache the old profile.
+    """
+    author_cards.invalidate(*user_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: author_cards.invalidate(*user_ids))
+
+
+class AuthorCardListSerializer(serializers.ListSerializer):
+    """
+    Loads the author cards of a whole page before serializing its rows:
+    authors already loaded with the rows are cached from them, the rest are
+    fetched in one query.
+    """
+
+    def to_representation(self, data):
+        posts = data.all() if isinstance(data, models.Manager) else data
+        if not isinstance(posts, (list, tuple)):
+            posts = list(posts)
+        if author_cards.max_size > 0:
+            missing = set()
+            for post in posts:
+                if author_cards.get(post.user_id) is not None:
+                    continue
+                if type(post).user.is_cached(post):
+                    author_cards.set(post.user)
+                else:
+                    missing.add(post.user_id)
+            author_cards.get_many(missing)
+        return super().to_representation(posts)
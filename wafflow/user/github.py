@@ -0,0 +1,144 @@
+import hashlib
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from rest_framework import status
+
+from user.constants import GITHUB_URL
+
+GITHUB_CACHE_PREFIX = "github"
+
+
+class GitHubUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing service for a while. After the number of
+    consecutive failures in the `failures_setting` setting the circuit opens
+    and calls fail fast for `reset_timeout_setting` seconds, after which a
+    single trial call is let through: its success closes the circuit, its
+    failure opens it again.
+    """
+
+    def __init__(self, failures_setting, reset_timeout_setting):
+        self.failures_setting = failures_setting
+        self.reset_timeout_setting = reset_timeout_setting
+        self.lock = threading.Lock()
+        self.failure_count = 0
+        self.opened_at = None
+
+    @property
+    def failures(self):
+        return getattr(settings, self.failures_setting, 5)
+
+    @property
+    def reset_timeout(self):
+        return getattr(settings, self.reset_timeout_setting, 30)
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # Half open: let this call through and hold the others back.
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failure_count = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failure_count += 1
+            if self.failure_count >= self.failures:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class GitHubClient:
+    """
+    Fetches GitHub users over one pooled keep-alive session, giving up after
+    GITHUB_CONNECT_TIMEOUT and GITHUB_READ_TIMEOUT seconds. Connection
+    errors, timeouts and server errors count towards the circuit breaker;
+    while it is open GitHubUnavailable is raised without calling GitHub.
+
+    Users are cached for GITHUB_TOKEN_CACHE_TIMEOUT seconds under a hash of
+    the token, so signing up right after a failed login reuses the answer.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=getattr(settings, "GITHUB_POOL_SIZE", 4),
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"Accept": "application/json", "Content-Type": "application/json"}
+        )
+        self.breaker = CircuitBreaker(
+            "GITHUB_CIRCUIT_FAILURES", "GITHUB_CIRCUIT_RESET_TIMEOUT"
+        )
+
+    def get_user(self, github_token):
+        """Return the GitHub user owning `github_token`, or None if it is invalid."""
+        key = github_cache_key(github_token)
+        data = cache.get(key)
+        if data is None:
+            data = self.fetch_user(github_token)
+            if data is not None:
+                cache.set(
+                    key, data, getattr(settings, "GITHUB_TOKEN_CACHE_TIMEOUT", 60)
+                )
+        return data
+
+    def fetch_user(self, github_token):
+        if not self.breaker.allow():
+            raise GitHubUnavailable("GitHub is unavailable")
+        try:
+            response = self.session.get(
+                getattr(settings, "GITHUB_API_URL", GITHUB_URL),
+                headers={"Authorization": f"token {github_token}"},
+                timeout=(
+                    getattr(settings, "GITHUB_CONNECT_TIMEOUT", 2),
+                    getattr(settings, "GITHUB_READ_TIMEOUT", 5),
+                ),
+            )
+        except requests.RequestException as error:
+            self.breaker.record_failure()
+            raise GitHubUnavailable("GitHub is unavailable") from error
+        if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            self.breaker.record_failure()
+            raise GitHubUnavailable("GitHub is unavailable")
+        self.breaker.record_success()
+
+        if response.status_code != status.HTTP_200_OK:
+            return None
+        data = response.json()
+        return {field: data.get(field) for field in ("id", "login", "email")}
+
+
+def github_cache_key(github_token):
+    digest = hashlib.sha256(str(github_token).encode()).hexdigest()
+    return f"{GITHUB_CACHE_PREFIX}:{digest}"
+
+
+github = GitHubClient()
+
+
+def get_github_data(github_token):
+    return github.get_user(github_token)
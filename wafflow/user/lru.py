@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU whose entries expire after a timeout.
+
+    The size and timeout are read from the named settings on every call so
+    that they can be overridden at runtime; a size of zero or less disables
+    the cache.
+    """
+
+    def __init__(self, size_setting, timeout_setting, size=1000, timeout=60):
+        self.size_setting = size_setting
+        self.timeout_setting = timeout_setting
+        self.default_size = size
+        self.default_timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    @property
+    def max_size(self):
+        return getattr(settings, self.size_setting, self.default_size)
+
+    @property
+    def timeout(self):
+        return getattr(settings, self.timeout_setting, self.default_timeout)
+
+    def get(self, key):
+        """Return the value cached under `key`, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        max_size = self.max_size
+        if max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete authentication tokens older than TOKEN_EXPIRE_AFTER seconds"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            help="Age in seconds past which tokens are deleted, instead of "
+            "TOKEN_EXPIRE_AFTER",
+        )
+
+    def handle(self, *args, **options):
+        max_age = options["max_age"] or getattr(settings, "TOKEN_EXPIRE_AFTER", None)
+        if not max_age:
+            raise CommandError("Tokens do not expire; set TOKEN_EXPIRE_AFTER")
+
+        expired = Token.objects.filter(
+            created__lt=timezone.now() - timedelta(seconds=max_age)
+        )
+        deleted = 0
+        while True:
+            keys = list(expired.values_list("key", flat=True)[: options["batch_size"]])
+            if not keys:
+                break
+            deleted += Token.objects.filter(key__in=keys).delete()[0]
+            invalidate_tokens(*keys)
+
+        self.stdout.write(f"Deleted {deleted} expired tokens")
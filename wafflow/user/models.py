@@ -1,5 +1,30 @@
 from django.db import models
 from django.contrib.auth.models import User
+from answer.models import Answer
+from question.models import Question, UserQuestion, count_subquery
+from tag.models import UserTag
+
+
+class UserProfileQuerySet(models.QuerySet):
+    def with_statistics(self):
+        """
+        Load the user and annotate the answer, question, bookmark and tag
+        counts shown on a profile, so that rendering one costs one query.
+        """
+        return self.select_related("user").annotate(
+            answer_count=count_subquery(
+                Answer.objects.filter(is_active=True), "user", "user"
+            ),
+            question_count=count_subquery(
+                Question.objects.filter(is_active=True), "user", "user"
+            ),
+            bookmark_count=count_subquery(
+                UserQuestion.objects.filter(bookmark=True, question__is_active=True),
+                "user",
+                "user",
+            ),
+            tag_count=count_subquery(UserTag.objects.all(), "user", "user"),
+        )
 
 
 class UserProfile(models.Model):
@@ -13,3 +38,5 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     github_id = models.IntegerField(null=True)
+
+    objects = UserProfileQuerySet.as_manager()
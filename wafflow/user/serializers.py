@@ -4,9 +4,6 @@ from django.db import transaction
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from user.models import UserProfile
-from answer.models import Answer
-from question.models import Question, UserQuestion
-from tag.models import UserTag
 from rest_framework.validators import UniqueValidator
 from user.constants import *
 
@@ -120,14 +117,21 @@ class UserProfileProduceSerializer(serializers.ModelSerializer):
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    """
+    Renders profiles loaded with UserProfile.objects.with_statistics(). Other
+    profiles get their counts from one extra query.
+    """
+
+    statistics = ("answer_count", "bookmark_count", "question_count", "tag_count")
+
     id = serializers.IntegerField(read_only=True, source="user.id")
     username = serializers.CharField(source="user.username")
     email = serializers.EmailField(read_only=True, source="user.email")
     last_login = serializers.DateTimeField(read_only=True, source="user.last_login")
-    answer_count = serializers.SerializerMethodField()
-    bookmark_count = serializers.SerializerMethodField()
-    question_count = serializers.SerializerMethodField()
-    tag_count = serializers.SerializerMethodField()
+    answer_count = serializers.IntegerField(read_only=True)
+    bookmark_count = serializers.IntegerField(read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+    tag_count = serializers.IntegerField(read_only=True)
 
     # only for drf
     password = serializers.CharField(write_only="True")
@@ -155,19 +159,17 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "tag_count",
         )
 
-    def get_answer_count(self, user_profile):
-        return Answer.objects.filter(user=user_profile.user, is_active=True).count()
-
-    def get_question_count(self, user_profile):
-        return Question.objects.filter(user=user_profile.user, is_active=True).count()
-
-    def get_bookmark_count(self, user_profile):
-        return UserQuestion.objects.filter(
-            user=user_profile.user, bookmark=True, question__is_active=True
-        ).count()
-
-    def get_tag_count(self, user_profile):
-        return UserTag.objects.filter(user=user_profile.user).count()
+    def to_representation(self, user_profile):
+        if not hasattr(user_profile, "answer_count"):
+            counts = (
+                UserProfile.objects.with_statistics()
+                .filter(pk=user_profile.pk)
+                .values(*self.statistics)
+                .get()
+            )
+            for field, count in counts.items():
+                setattr(user_profile, field, count)
+        return super(UserProfileSerializer, self).to_representation(user_profile)
 
     def validate(self, attrs):
         raise serializers.ValidationError(
@@ -1,12 +1,34 @@
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
 from django.contrib.auth.models import User
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
 from answer.models import Answer, UserAnswer
 from comment.models import Comment
 from question.models import Question, UserQuestion
+from user.authentication import (
+    invalidate_user_tokens,
+    shared_token_cache,
+    token_cache_key,
+    tokens,
+)
+from user.author_cards import author_cards
+from user.github import GitHubClient, GitHubUnavailable, github
 from user.models import UserProfile
+from user.serializers import UserProfileSerializer
 
 import json
 
@@ -437,6 +459,54 @@ class GetUserUserIDTestCase(UserTestSetting):
         data = response.json()
         self.check_YeonghyeonKo_after_activites(data)
 
+    def test_get_user_user_id_conditional(self):
+        response = self.client.get(f"/api/user/{self.guzus.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        response = self.client.get(
+            f"/api/user/{self.guzus.id}/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            f"/api/user/{self.guzus.id}/",
+            HTTP_IF_NONE_MATCH=etag,
+            HTTP_AUTHORIZATION=self.guzus_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        self.set_up_user_activites()
+        response = self.client.get(
+            f"/api/user/{self.guzus.id}/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.check_guzus_after_activites(response.json())
+
+    def test_get_user_user_id_query_count(self):
+        self.set_up_user_activites()
+        # The profile with its counts, which its ETag is taken from.
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/user/{self.guzus.id}/")
+        self.check_guzus_after_activites(response.json())
+
+        # Plus the token.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                "/api/user/me/", HTTP_AUTHORIZATION=self.guzus_token
+            )
+        self.check_guzus_after_activites(response.json())
+
+    def test_serialize_profile_without_statistics(self):
+        self.set_up_user_activites()
+        profile = UserProfile.objects.select_related("user").get(user=self.guzus)
+        # The counts the profile was not loaded with.
+        with self.assertNumQueries(1):
+            data = UserProfileSerializer(profile).data
+        self.check_guzus_after_activites(data)
+
 
 class PutUserMeTestCase(UserTestSetting):
     def setUp(self):
@@ -655,3 +725,418 @@ class PostUserLogoutTestCase(UserTestSetting):
         )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(AUTHOR_CARD_CACHE_SIZE=100, AUTHOR_CARD_CACHE_TIMEOUT=60)
+class AuthorCardCacheTestCase(UserTestSetting):
+    def setUp(self):
+        self.set_up_users()
+        author_cards.clear()
+
+    def tearDown(self):
+        author_cards.clear()
+
+    def get_question_authors(self):
+        response = self.client.get("/api/question/tagged/?sorted_by=newest&page=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [question["author"] for question in response.json()["questions"]]
+
+    @override_settings(AUTHOR_CARD_CACHE_SIZE=2)
+    def test_least_recently_used_card_is_evicted(self):
+        author_cards.set(self.guzus)
+        author_cards.set(self.eldpswp99)
+        self.assertIsNotNone(author_cards.get(self.guzus.id))
+        author_cards.set(self.YeonghyeonKo)
+
+        self.assertIsNone(author_cards.get(self.eldpswp99.id))
+        self.assertEqual(author_cards.get(self.guzus.id)["nickname"], "audrn31")
+        self.assertIsNotNone(author_cards.get(self.YeonghyeonKo.id))
+
+    @override_settings(AUTHOR_CARD_CACHE_TIMEOUT=-1)
+    def test_expired_card(self):
+        author_cards.set(self.guzus)
+        self.assertIsNone(author_cards.get(self.guzus.id))
+
+    @override_settings(AUTHOR_CARD_CACHE_SIZE=0)
+    def test_disabled(self):
+        self.assertEqual(author_cards.set(self.guzus)["nickname"], "audrn31")
+        self.assertIsNone(author_cards.get(self.guzus.id))
+
+    def test_get_many(self):
+        user_ids = [self.guzus.id, self.eldpswp99.id, self.YeonghyeonKo.id]
+        with self.assertNumQueries(1):
+            cards = author_cards.get_many(user_ids)
+        self.assertEqual(cards[self.eldpswp99.id]["nickname"], "MyungHoon Park")
+        with self.assertNumQueries(0):
+            self.assertEqual(author_cards.get_many(user_ids), cards)
+
+    def test_invalidate_on_profile_update(self):
+        Question.objects.create(user=self.guzus, title="hello", content="world")
+        self.assertEqual(self.get_question_authors()[0]["nickname"], "audrn31")
+
+        response = self.client.put(
+            "/api/user/me/",
+            json.dumps({"nickname": "Django"}),
+            HTTP_AUTHORIZATION=self.guzus_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_question_authors()[0]["nickname"], "Django")
+
+    def test_invalidate_on_acception(self):
+        question = Question.objects.create(
+            user=self.guzus, title="hello", content="world"
+        )
+        answer = Answer.objects.create(
+            user=self.eldpswp99, question=question, content="answer"
+        )
+        self.assertEqual(self.get_question_authors()[0]["reputation"], 0)
+        author_cards.set(self.eldpswp99)
+
+        response = self.client.post(
+            f"/api/answer/{answer.id}/acception/",
+            HTTP_AUTHORIZATION=self.guzus_token,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f"/api/answer/{answer.id}/")
+        self.assertEqual(response.json()["author"]["reputation"], 15)
+        self.assertEqual(self.get_question_authors()[0]["reputation"], 2)
+
+    def test_question_list_query_count(self):
+        for user in (self.guzus, self.eldpswp99, self.YeonghyeonKo):
+            Question.objects.create(user=user, title="hello", content="world")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_question_authors()
+        query_count = len(queries)
+
+        for user in (self.guzus, self.eldpswp99, self.YeonghyeonKo):
+            Question.objects.create(user=user, title="hello", content="world")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.get_question_authors()), 6)
+        self.assertLessEqual(len(queries), query_count)
+
+
+class GetUsersTestCase(UserTestSetting):
+    def setUp(self):
+        self.set_up_users()
+
+    def test_get_users_user_count(self):
+        response = self.client.get("/api/users/?sorted_by=reputation&page=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["user_count"], User.objects.filter(is_active=True).count()
+        )
+        user_ids = {user["id"] for user in response.json()["users"]}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/users/?sorted_by=reputation&cursor=")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual({user["id"] for user in data["users"]}, user_ids)
+        self.assertNotIn("user_count", data)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+
+class CachedTokenAuthenticationTestCase(UserTestSetting):
+    def setUp(self):
+        # A file cache stands in for a cache shared between processes.
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "tokens": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.directory.name,
+                },
+            },
+            TOKEN_CACHE_ALIAS="tokens",
+            TOKEN_CACHE_TIMEOUT=60,
+        )
+        self.settings.enable()
+        self.set_up_users()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+        tokens.clear()
+
+    def get_me(self, token):
+        return self.client.get("/api/user/me/", HTTP_AUTHORIZATION=token)
+
+    def age_token(self, user, days):
+        Token.objects.filter(user=user).update(
+            created=timezone.now() - timedelta(days=days)
+        )
+
+    def test_cached_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        query_count = len(queries)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], self.guzus.id)
+        self.assertEqual(len(queries), query_count - 1)
+
+        response = self.get_me("Token invalid")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_entry_fields(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        key = self.guzus_token.split()[1]
+        entry = shared_token_cache().get(token_cache_key(key))
+        self.assertEqual(entry["user"]["id"], self.guzus.id)
+        self.assertNotIn("password", entry["user"])
+        self.assertNotIn("email", entry["user"])
+
+        # Saving the cached user leaves the fields it did not load alone.
+        response = self.client.put(
+            "/api/user/me/",
+            json.dumps({"nickname": "guzus2"}),
+            HTTP_AUTHORIZATION=self.guzus_token,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.guzus.refresh_from_db()
+        self.assertTrue(self.guzus.check_password("password"))
+        self.assertEqual(self.guzus.email, "guzus@naver.com")
+
+    @override_settings(
+        TOKEN_CACHE_ALIAS="default",
+        TOKEN_LOCAL_CACHE_SIZE=10,
+        TOKEN_LOCAL_CACHE_TIMEOUT=60,
+    )
+    def test_local_cache(self):
+        self.assertIsNone(shared_token_cache())
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+
+        # A logout in another process is only seen once the entry expires.
+        Token.objects.filter(user=self.guzus).delete()
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+
+    @override_settings(
+        TOKEN_CACHE_ALIAS="default",
+        TOKEN_LOCAL_CACHE_SIZE=10,
+        TOKEN_LOCAL_CACHE_TIMEOUT=0,
+    )
+    def test_local_cache_expires(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        Token.objects.filter(user=self.guzus).delete()
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_CACHE_ALIAS="default", TOKEN_LOCAL_CACHE_SIZE=10)
+    def test_local_cache_logout(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        response = self.client.post(
+            "/api/user/logout/", HTTP_AUTHORIZATION=self.guzus_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidate_user_tokens(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        User.objects.filter(pk=self.guzus.pk).update(is_active=False)
+        # Still authenticated from the cache, though the profile is hidden.
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 404)
+
+        invalidate_user_tokens(self.guzus)
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        response = self.client.post(
+            "/api/user/logout/", HTTP_AUTHORIZATION=self.guzus_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivate(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        response = self.client.delete(
+            "/api/user/me/", HTTP_AUTHORIZATION=self.guzus_token
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_EXPIRE_AFTER=24 * 60 * 60)
+    def test_expired_token(self):
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 200)
+        self.age_token(self.guzus, 2)
+        invalidate_user_tokens(self.guzus)
+        response = self.get_me(self.guzus_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.put(
+            "/api/user/login/",
+            json.dumps({"username": "guzus", "password": "password"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = "Token " + response.json()["token"]
+        self.assertNotEqual(token, self.guzus_token)
+        self.assertEqual(self.get_me(token).status_code, 200)
+        self.assertEqual(self.get_me(self.guzus_token).status_code, 401)
+
+    def test_clear_expired_tokens(self):
+        with self.assertRaises(CommandError):
+            call_command("clear_expired_tokens", stdout=StringIO())
+
+        self.age_token(self.guzus, 2)
+        self.age_token(self.eldpswp99, 2)
+        stdout = StringIO()
+        with override_settings(TOKEN_EXPIRE_AFTER=24 * 60 * 60):
+            call_command("clear_expired_tokens", batch_size=1, stdout=stdout)
+        self.assertIn("Deleted 2 expired tokens", stdout.getvalue())
+        self.assertFalse(Token.objects.filter(user=self.guzus).exists())
+        self.assertTrue(Token.objects.filter(user=self.YeonghyeonKo).exists())
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    """Answers like api.github.com/user for the tokens "valid" and "slow"."""
+
+    def do_GET(self):
+        self.server.hits += 1
+        token = self.headers.get("Authorization", "")
+        if token == "token slow":
+            time.sleep(0.5)
+        if token == "token broken":
+            self.send_response(502)
+            self.end_headers()
+            return
+        if token not in ("token valid", "token slow"):
+            self.send_response(401)
+            self.end_headers()
+            return
+        body = json.dumps({"id": 4321, "login": "octocat", "email": None})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body.encode())
+        except BrokenPipeError:
+            # The client timed out.
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class GitHubClientTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStubHandler)
+        cls.server.hits = 0
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/user"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.settings = override_settings(
+            GITHUB_API_URL=self.url,
+            GITHUB_READ_TIMEOUT=0.2,
+            GITHUB_CIRCUIT_FAILURES=2,
+            GITHUB_CIRCUIT_RESET_TIMEOUT=60,
+        )
+        self.settings.enable()
+        self.server.hits = 0
+        github.breaker.record_success()
+        cache.clear()
+
+    def tearDown(self):
+        self.settings.disable()
+        github.breaker.record_success()
+        cache.clear()
+
+    def test_get_user(self):
+        client = GitHubClient()
+        data = {"id": 4321, "login": "octocat", "email": None}
+        self.assertEqual(client.get_user("valid"), data)
+        self.assertEqual(client.get_user("valid"), data)
+        self.assertEqual(self.server.hits, 1)
+
+        self.assertIsNone(client.get_user("invalid"))
+        self.assertIsNone(client.get_user("invalid"))
+        self.assertEqual(self.server.hits, 3)
+        self.assertFalse(client.breaker.is_open)
+
+    def test_circuit_breaker(self):
+        client = GitHubClient()
+        start = time.monotonic()
+        with self.assertRaises(GitHubUnavailable):
+            client.get_user("slow")
+        self.assertLess(time.monotonic() - start, 0.5)
+        with self.assertRaises(GitHubUnavailable):
+            client.get_user("broken")
+        self.assertTrue(client.breaker.is_open)
+
+        hits = self.server.hits
+        with self.assertRaises(GitHubUnavailable):
+            client.get_user("valid")
+        self.assertEqual(self.server.hits, hits)
+
+        with override_settings(GITHUB_CIRCUIT_RESET_TIMEOUT=0):
+            self.assertEqual(client.get_user("valid")["id"], 4321)
+        self.assertFalse(client.breaker.is_open)
+
+    def test_github_login_signs_up_with_one_call(self):
+        response = self.client.put(
+            "/api/user/login/",
+            json.dumps({"github_token": "valid"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["nickname"], "octocat")
+        self.assertEqual(self.server.hits, 1)
+
+        response = self.client.put(
+            "/api/user/login/",
+            json.dumps({"github_token": "valid"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_github_login_invalid_token_with_one_call(self):
+        response = self.client.put(
+            "/api/user/login/",
+            json.dumps({"github_token": "invalid"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Invalid github token")
+        self.assertEqual(self.server.hits, 1)
+
+    def test_github_unavailable(self):
+        for _ in range(2):
+            response = self.client.post(
+                "/api/user/",
+                json.dumps({"github_token": "broken"}),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.server.hits, 2)
+
+        response = self.client.put(
+            "/api/user/login/",
+            json.dumps({"github_token": "valid"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.server.hits, 2)
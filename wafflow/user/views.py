@@ -13,10 +13,24 @@ from user.serializers import (
     UserProfileProduceSerializer,
     AuthorSerializer,
 )
-from user.token import get_github_data
+from user.authentication import fresh_token, invalidate_tokens, invalidate_user_tokens
+from user.author_cards import invalidate_author_cards
+from user.github import GitHubUnavailable, get_github_data
 from user.models import UserProfile
 from user.constants import *
-from question.views import paginate_objects
+from question.conditional import data_response
+from question.views import CursorPage, add_next_cursor, paginate_objects
+
+
+def get_profile(user):
+    return UserProfile.objects.with_statistics().get(user=user)
+
+
+def github_unavailable():
+    return Response(
+        {"message": "GitHub is unavailable, try again later"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
 
 
 class UserViewSet(viewsets.GenericViewSet):
@@ -33,9 +47,15 @@ class UserViewSet(viewsets.GenericViewSet):
             return UserSerializer
         return UserProfileSerializer
 
-    @transaction.atomic
     def create_github_user(self, request):
-        github_data = get_github_data(request.data.get("github_token"))
+        try:
+            github_data = get_github_data(request.data.get("github_token"))
+        except GitHubUnavailable:
+            return github_unavailable()
+        return self.sign_up_github_user(request, github_data)
+
+    @transaction.atomic
+    def sign_up_github_user(self, request, github_data):
         if github_data is None or github_data.get("id") is None:
             return Response(
                 {"message": "Invalid github token"}, status=status.HTTP_400_BAD_REQUEST
@@ -61,7 +81,7 @@ class UserViewSet(viewsets.GenericViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
-        data = UserProfileSerializer(user.profile).data
+        data = UserProfileSerializer(get_profile(user)).data
         data["token"] = user.auth_token.key
         return Response(data, status=status.HTTP_201_CREATED)
 
@@ -78,7 +98,7 @@ class UserViewSet(viewsets.GenericViewSet):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        data = UserProfileSerializer(user.profile).data
+        data = UserProfileSerializer(get_profile(user)).data
         data["token"] = user.auth_token.key
         return Response(data, status=status.HTTP_201_CREATED)
 
@@ -96,15 +116,17 @@ class UserViewSet(viewsets.GenericViewSet):
                 )
             user = authenticate(request, username=username, password=password)
         else:
-            github_data = get_github_data(github_token)
+            try:
+                github_data = get_github_data(github_token)
+            except GitHubUnavailable:
+                return github_unavailable()
             try:
                 user = UserProfile.objects.get(github_id=github_data.get("id")).user
             except (UserProfile.DoesNotExist, AttributeError):
-                return self.create_github_user(request)
+                return self.sign_up_github_user(request, github_data)
         if user and user.is_active:
-            data = self.get_serializer(user.profile).data
-            token, created = Token.objects.get_or_create(user=user)
-            data["token"] = token.key
+            data = self.get_serializer(get_profile(user)).data
+            data["token"] = fresh_token(user).key
             return Response(data)
 
         return Response(
@@ -114,7 +136,9 @@ class UserViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=["POST"])
     def logout(self, request):
         try:
+            key = request.user.auth_token.key
             request.user.auth_token.delete()
+            invalidate_tokens(key)
         except (AttributeError, ObjectDoesNotExist):
             return Response(
                 {"message:token not exist"}, status=status.HTTP_400_BAD_REQUEST
@@ -127,17 +151,20 @@ class UserViewSet(viewsets.GenericViewSet):
                 return Response(
                     {"message": "Invalid Token"}, status=status.HTTP_401_UNAUTHORIZED
                 )
-            user = request.user
-        else:
-            try:
-                user = User.objects.get(pk=pk, is_active=True)
-            except (User.DoesNotExist, ValueError):
-                return Response(
-                    {"message": "There is no user with that id"},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+            pk = request.user.id
+        try:
+            profile = UserProfile.objects.with_statistics().get(
+                user_id=pk, user__is_active=True
+            )
+        except (UserProfile.DoesNotExist, ValueError):
+            return Response(
+                {"message": "There is no user with that id"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-        return Response(self.get_serializer(user.profile).data)
+        # The profile's counts cost as much to fingerprint as to load, so
+        # its ETag is taken from the body itself.
+        return data_response(request, self.get_serializer(profile).data)
 
     def update(self, request, pk=None):
         if pk != "me":
@@ -152,8 +179,10 @@ class UserViewSet(viewsets.GenericViewSet):
         serializer = self.get_serializer(user, data=data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_author_cards(user.id)
+        invalidate_user_tokens(user)
 
-        data = UserProfileSerializer(user.profile).data
+        data = UserProfileSerializer(get_profile(user)).data
         return Response(data, status=status.HTTP_200_OK)
 
     def destroy(self, request, pk=None):
@@ -167,6 +196,7 @@ class UserViewSet(viewsets.GenericViewSet):
         if user.is_active:
             user.is_active = False
             user.save()
+            invalidate_user_tokens(user)
             logout(request)
             return Response({}, status=status.HTTP_200_OK)
         else:
@@ -202,12 +232,11 @@ class UserListViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response(
-            {
-                "users": self.get_serializer(users, many=True).data,
-                "user_count": User.objects.filter(is_active=True).count(),
-            }
-        )
+        data = {"users": self.get_serializer(users, many=True).data}
+        # Cursor pages never count the users, as they never count the rows.
+        if not isinstance(users, CursorPage):
+            data["user_count"] = User.objects.filter(is_active=True).count()
+        return Response(add_next_cursor(data, users))
 
 
 def sort_users(request, users):
@@ -0,0 +1,210 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SALT = "wafflow.middleware.profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "profile"
+PROFILE_SUFFIX = ".prof"
+PATH_CHARACTERS = re.compile(r"[^A-Za-z0-9]+")
+
+IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+NUMBER = re.compile(r"\b\d+\b")
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def normalize_sql(sql):
+    """
+    Reduce a query to its shape. The ORM already passes values as params,
+    so only IN lists of varying length and inlined LIMIT/OFFSET numbers
+    need collapsing.
+    """
+    return NUMBER.sub("N", IN_LIST.sub("(%s, ...)", sql))
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[normalize_sql(sql)] += 1
+
+    def repeated(self, threshold):
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Count the queries of every request and their total time, and send them
+    as X-Query-Count and X-SQL-Time (milliseconds) headers. Query shapes run
+    more than SQL_N_PLUS_ONE_THRESHOLD times are logged, and raise
+    NPlusOneError when SQL_N_PLUS_ONE_RAISE is set.
+
+    With SQL_INSTRUMENTATION off the middleware removes itself from the
+    chain when it is loaded.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+        self.raise_on_repeat = getattr(settings, "SQL_N_PLUS_ONE_RAISE", False)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        sql_time = recorder.duration * 1000
+        response["X-Query-Count"] = str(recorder.count)
+        response["X-SQL-Time"] = f"{sql_time:.2f}"
+        logger.info(
+            "%s %s: %d queries in %.2f ms",
+            request.method,
+            request.path,
+            recorder.count,
+            sql_time,
+        )
+
+        repeated = recorder.repeated(self.threshold)
+        for shape, count in repeated:
+            logger.warning(
+                "%s %s: query ran %d times: %s",
+                request.method,
+                request.path,
+                count,
+                shape,
+            )
+        if repeated and self.raise_on_repeat:
+            shape, count = repeated[0]
+            raise NPlusOneError(
+                f"{request.method} {request.path} ran the same query {count} "
+                f"times: {shape}"
+            )
+        return response
+
+
+def sign_profile_token():
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign("profile")
+
+
+def is_valid_profile_token(token, max_age):
+    try:
+        signing.TimestampSigner(salt=PROFILE_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_files(directory):
+    """Return the paths of the captured profiles, newest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    paths = [
+        os.path.join(directory, name) for name in names if name.endswith(PROFILE_SUFFIX)
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def rotate_profiles(directory, max_files, max_bytes):
+    """Delete the oldest profiles beyond `max_files` or `max_bytes` in total."""
+    total = 0
+    for index, path in enumerate(profile_files(directory)):
+        try:
+            total += os.path.getsize(path)
+            if index >= max_files or total > max_bytes:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware:
+    """
+    Run requests under cProfile and write one pstats file per request to
+    PROFILING_DIR, named after the time, method, path and duration.
+
+    A request is profiled when it carries a token from sign_profile_token()
+    in the X-Profile header or the `profile` query parameter, or, with
+    PROFILING_SAMPLE_RATE = N, for one in N requests. The directory keeps
+    at most PROFILING_MAX_FILES files and PROFILING_MAX_BYTES bytes.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = settings.PROFILING_DIR
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+        self.token_max_age = getattr(settings, "PROFILING_TOKEN_MAX_AGE", 86400)
+        self.max_files = getattr(settings, "PROFILING_MAX_FILES", 100)
+        self.max_bytes = getattr(settings, "PROFILING_MAX_BYTES", 50 * 1024 * 1024)
+
+    def should_profile(self, request):
+        token = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM)
+        if token:
+            return is_valid_profile_token(token, self.token_max_age)
+        return self.sample_rate > 0 and random.randrange(self.sample_rate) == 0
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this thread.
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        # The random part keeps files written in the same second apart.
+        name = "{}-{:04x}-{}-{}-{:.0f}ms{}".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            random.getrandbits(16),
+            request.method,
+            PATH_CHARACTERS.sub("_", request.path).strip("_")[:80],
+            elapsed,
+            PROFILE_SUFFIX,
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.directory, name))
+        rotate_profiles(self.directory, self.max_files, self.max_bytes)
+        response["X-Profile"] = name
+        return response
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "corsheaders",
@@ -64,6 +65,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "wafflow.middleware.ProfilingMiddleware",
+    "wafflow.middleware.SQLInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,13 +78,54 @@ MIDDLEWARE = [
 ]
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ORIGIN_WHITELIST = ["http://localhost:8000", "http://localhost:3000"]
+CORS_EXPOSE_HEADERS = ["X-Query-Count", "X-SQL-Time", "X-Profile"]
+
+# Query count and SQL time headers on every response. Query shapes repeated
+# more than the threshold within one request are logged as likely N+1
+# patterns, and raise outside prod when SQL_N_PLUS_ONE_RAISE is set.
+SQL_INSTRUMENTATION = os.getenv(
+    "SQL_INSTRUMENTATION", "true" if ENV_MODE == "dev" else "false"
+) in ("true", "True", "TRUE")
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+SQL_N_PLUS_ONE_RAISE = ENV_MODE != "prod" and os.getenv("SQL_N_PLUS_ONE_RAISE") in (
+    "true",
+    "True",
+    "TRUE",
+)
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.CachedTokenAuthentication",
     )
 }
 
+# Token keys resolve to users through the TOKEN_CACHE_ALIAS cache for
+# TOKEN_CACHE_TIMEOUT seconds, when its backend is shared between processes
+# so that logouts reach every worker. Otherwise they resolve through an LRU
+# of TOKEN_LOCAL_CACHE_SIZE keys per process, zero disabling it, and other
+# workers accept a revoked token for up to TOKEN_LOCAL_CACHE_TIMEOUT seconds.
+# Tokens older than TOKEN_EXPIRE_AFTER seconds are rejected when it is set;
+# run clear_expired_tokens to delete them.
+TOKEN_CACHE_TIMEOUT = int(os.getenv("TOKEN_CACHE_TIMEOUT", 60))
+TOKEN_LOCAL_CACHE_SIZE = int(
+    os.getenv("TOKEN_LOCAL_CACHE_SIZE", 0 if ENV_MODE == "test" else 10000)
+)
+TOKEN_LOCAL_CACHE_TIMEOUT = int(os.getenv("TOKEN_LOCAL_CACHE_TIMEOUT", 5))
+TOKEN_CACHE_ALIAS = "default"
+TOKEN_EXPIRE_AFTER = int(os.getenv("TOKEN_EXPIRE_AFTER", 0)) or None
+
+# GitHub logins go through one keep-alive session per process with strict
+# timeouts (seconds). After GITHUB_CIRCUIT_FAILURES consecutive failures
+# GitHub is not called for GITHUB_CIRCUIT_RESET_TIMEOUT seconds. Users are
+# cached by token hash for GITHUB_TOKEN_CACHE_TIMEOUT seconds.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com/user")
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", 2))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", 5))
+GITHUB_POOL_SIZE = 4
+GITHUB_CIRCUIT_FAILURES = 5
+GITHUB_CIRCUIT_RESET_TIMEOUT = 30
+GITHUB_TOKEN_CACHE_TIMEOUT = 60
+
 DEBUG_TOOLBAR = os.getenv("DEBUG_TOOLBAR") in ("true", "True", "TRUE")
 
 if DEBUG_TOOLBAR:
@@ -89,6 +133,57 @@ if DEBUG_TOOLBAR:
     MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")
     INTERNAL_IPS = ("127.0.0.1",)
 
+# Requests carrying a token from `manage.py profiles --sign` in the
+# X-Profile header or `profile` query parameter, plus one in
+# PROFILING_SAMPLE_RATE requests (zero disables sampling), are run under
+# cProfile and written to PROFILING_DIR, keeping the newest files within
+# PROFILING_MAX_FILES and PROFILING_MAX_BYTES.
+PROFILING = os.getenv("PROFILING") in ("true", "True", "TRUE")
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILING_SAMPLE_RATE = int(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_TOKEN_MAX_AGE = 24 * 60 * 60
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 100))
+PROFILING_MAX_BYTES = int(os.getenv("PROFILING_MAX_BYTES", 50 * 1024 * 1024))
+
+# Question views are buffered in memory and written back every N seconds;
+# zero or less writes each view through. On exit the buffer is either
+# flushed ("flush") or dropped ("discard").
+QUESTION_VIEW_COUNT_FLUSH_INTERVAL = int(
+    os.getenv("QUESTION_VIEW_COUNT_FLUSH_INTERVAL", 0 if ENV_MODE == "test" else 10)
+)
+QUESTION_VIEW_COUNT_DRAIN = os.getenv("QUESTION_VIEW_COUNT_DRAIN", "flush")
+
+# Author cards (nickname, picture, reputation) are kept in a per-process LRU
+# of AUTHOR_CARD_CACHE_SIZE users, zero disabling it. Edits invalidate the
+# current process only, so AUTHOR_CARD_CACHE_TIMEOUT bounds how stale the
+# other processes can be.
+AUTHOR_CARD_CACHE_SIZE = int(
+    os.getenv("AUTHOR_CARD_CACHE_SIZE", 0 if ENV_MODE == "test" else 1000)
+)
+AUTHOR_CARD_CACHE_TIMEOUT = int(os.getenv("AUTHOR_CARD_CACHE_TIMEOUT", 60))
+
+# Any Django cache backend works; locmem only invalidates within one process,
+# so multi-process deployments should point this at a shared backend.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "wafflow"),
+    }
+}
+
+# Seconds anonymous responses of each read endpoint are cached for.
+# Endpoints that are missing or set to zero are not cached.
+if ENV_MODE == "test":
+    RESPONSE_CACHE_TIMEOUTS = {}
+else:
+    RESPONSE_CACHE_TIMEOUTS = {
+        "question": 60,
+        "answers": 60,
+        "comments": 60,
+        "tags": 300,
+    }
 
 ROOT_URLCONF = "wafflow.urls"
 
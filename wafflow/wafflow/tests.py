@@ -0,0 +1,113 @@
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+
+from question.models import Question
+from user.models import UserProfile
+from wafflow.middleware import (
+    NPlusOneError,
+    normalize_sql,
+    profile_files,
+    sign_profile_token,
+)
+
+
+class SQLInstrumentationTestCase(TestCase):
+    url = "/api/question/tagged/?sorted_by=newest&page=1"
+
+    def setUp(self):
+        user = User.objects.create(username="kyh1", password="password")
+        UserProfile.objects.create(user=user, nickname="yh1")
+        for index in range(3):
+            Question.objects.create(user=user, title=f"hello{index}", content="world")
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql('SELECT "id" FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21'),
+            'SELECT "id" FROM "t" WHERE "id" IN (%s, ...) LIMIT N',
+        )
+        self.assertEqual(
+            normalize_sql('SELECT "T2"."id" FROM "t" WHERE "id" IN (%s, %s)'),
+            normalize_sql('SELECT "T2"."id" FROM "t" WHERE "id" IN (%s, %s, %s, %s)'),
+        )
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled(self):
+        response = Client().get(self.url)
+        self.assertFalse(response.has_header("X-Query-Count"))
+        self.assertFalse(response.has_header("X-SQL-Time"))
+
+    @override_settings(SQL_INSTRUMENTATION=True, SQL_N_PLUS_ONE_RAISE=False)
+    def test_headers(self):
+        with self.assertLogs("wafflow.middleware", "INFO") as logs:
+            response = Client().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        self.assertGreaterEqual(float(response["X-SQL-Time"]), 0)
+        self.assertIn(f"{response['X-Query-Count']} queries", logs.output[0])
+
+    @override_settings(
+        SQL_INSTRUMENTATION=True,
+        SQL_N_PLUS_ONE_THRESHOLD=0,
+        SQL_N_PLUS_ONE_RAISE=True,
+    )
+    def test_raise_on_repeated_queries(self):
+        with self.assertLogs("wafflow.middleware", "WARNING"):
+            with self.assertRaises(NPlusOneError):
+                Client().get(self.url)
+
+
+class ProfilingTestCase(TestCase):
+    url = "/api/question/tagged/?sorted_by=newest&page=1"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(
+            PROFILING=True,
+            PROFILING_DIR=self.directory.name,
+            PROFILING_SAMPLE_RATE=0,
+        )
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_profile_signed_request(self):
+        client = Client()
+        response = client.get(self.url)
+        self.assertFalse(response.has_header("X-Profile"))
+
+        response = client.get(self.url, HTTP_X_PROFILE="invalid")
+        self.assertFalse(response.has_header("X-Profile"))
+
+        response = client.get(self.url, HTTP_X_PROFILE=sign_profile_token())
+        self.assertEqual(response.status_code, 200)
+        name = response["X-Profile"]
+        self.assertTrue(name.endswith(".prof"))
+        self.assertIn("GET-api_question_tagged", name)
+
+        response = client.get(f"{self.url}&profile={sign_profile_token()}")
+        self.assertTrue(response.has_header("X-Profile"))
+        self.assertEqual(len(profile_files(self.directory.name)), 2)
+
+        stdout = StringIO()
+        call_command("profiles", stdout=stdout)
+        self.assertIn(name, stdout.getvalue())
+
+        stdout = StringIO()
+        call_command("profiles", name, limit=5, stdout=stdout)
+        self.assertIn("function calls", stdout.getvalue())
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_FILES=2)
+    def test_sampled_profiles_rotate(self):
+        client = Client()
+        for _ in range(3):
+            response = client.get(self.url)
+            self.assertTrue(response.has_header("X-Profile"))
+        paths = profile_files(self.directory.name)
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(paths[0].endswith(response["X-Profile"]))